@@ -0,0 +1,125 @@
+"""
+Throughput / latency / memory of the fp32, int8 and onnx inference backends.
+
+Usage:
+    python bench_backends.py [tickets.jsonl] [--models zero_shot,sentiment,embedder]
+                             [--backends fp32,int8,onnx] [--batch-size 16]
+
+tickets.jsonl holds one {"text": ...} object per line; without it the seed tickets
+of the embedding heads are used. Each (model, backend) pair runs in a fresh process
+so peak RSS is measured in isolation. Reports tickets/sec (batched), p95 single-ticket
+latency, peak RSS, and agreement with fp32: top label for the two pipelines, and mean
+cosine similarity plus dedup-decision agreement (pairs above 0.9) for the embedder.
+"""
+import sys
+import json
+import time
+import argparse
+import resource
+import multiprocessing
+import numpy as np
+
+from m2_advanced.inference_backends import INFERENCE_BACKENDS, MODEL_KEYS
+
+MODELS = {
+    "zero_shot": ("zero-shot-classification", "facebook/bart-large-mnli"),
+    "sentiment": ("sentiment-analysis", "distilbert-base-uncased-finetuned-sst-2-english"),
+    "embedder": (None, "all-MiniLM-L6-v2"),
+}
+CANDIDATE_LABELS = ["Billing", "Technical", "Legal"]
+DEDUP_THRESHOLD = 0.9
+
+def load_texts(path):
+    if path is None:
+        from m2_advanced.embedding_heads import URGENT_EXAMPLES, NORMAL_EXAMPLES
+        return URGENT_EXAMPLES + NORMAL_EXAMPLES
+    with open(path) as f:
+        return [json.loads(line)["text"] for line in f if line.strip()]
+
+def make_predictor(model_key, backend):
+    from m2_advanced.inference_backends import build_pipeline, load_sentence_transformer
+    task, model_id = MODELS[model_key]
+    if model_key == "embedder":
+        model = load_sentence_transformer(model_id, backend)
+        return lambda batch: np.asarray(model.encode(batch, normalize_embeddings=True), dtype=np.float32)
+    pipe = build_pipeline(task, model_id, backend)
+    if model_key == "zero_shot":
+        def predict(batch):
+            results = pipe(batch, CANDIDATE_LABELS, batch_size=len(batch))
+            return [r["labels"][0] for r in ([results] if isinstance(results, dict) else results)]
+        return predict
+    return lambda batch: [r["label"] for r in pipe(batch, batch_size=len(batch))]
+
+def run_backend(model_key, backend, texts, batch_size):
+    """Runs in a child process. Returns stats and the outputs used for agreement."""
+    start = time.perf_counter()
+    predict = make_predictor(model_key, backend)
+    load_seconds = time.perf_counter() - start
+    predict(texts[:1])  # Warm-up
+
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        predict([text])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    outputs = []
+    for i in range(0, len(texts), batch_size):
+        batch_outputs = predict(texts[i:i + batch_size])
+        outputs.extend(batch_outputs if isinstance(batch_outputs, list) else list(batch_outputs))
+    throughput = len(texts) / (time.perf_counter() - start)
+
+    return {
+        "load_seconds": load_seconds,
+        "throughput": throughput,
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # KiB on Linux
+        "outputs": outputs
+    }
+
+def agreement(model_key, outputs, reference):
+    if model_key != "embedder":
+        return f"label agreement={np.mean([a == b for a, b in zip(outputs, reference)]):6.1%}"
+    embeddings, reference = np.stack(outputs), np.stack(reference)
+    cosine = float(np.mean(np.sum(embeddings * reference, axis=1)))
+    pairs = np.triu_indices(len(embeddings), k=1)
+    decisions = (embeddings @ embeddings.T)[pairs] > DEDUP_THRESHOLD
+    reference_decisions = (reference @ reference.T)[pairs] > DEDUP_THRESHOLD
+    return f"cosine to fp32={cosine:.4f}  dedup agreement={np.mean(decisions == reference_decisions):6.2%}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", help="JSONL file with text records")
+    parser.add_argument("--models", default=",".join(MODEL_KEYS))
+    parser.add_argument("--backends", default=",".join(INFERENCE_BACKENDS))
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    texts = load_texts(args.path)
+    backends = args.backends.split(",")
+    if "fp32" not in backends:
+        backends.insert(0, "fp32")  # Reference for agreement
+    print(f"{len(texts)} tickets, batch size {args.batch_size}\n")
+
+    # One process per run so RSS and thread pools don't leak between backends
+    context = multiprocessing.get_context("spawn")
+    for model_key in args.models.split(","):
+        reference = None
+        for backend in backends:
+            with context.Pool(1) as pool:
+                try:
+                    stats = pool.apply(run_backend, (model_key, backend, texts, args.batch_size))
+                except Exception as e:
+                    print(f"{model_key:10s} {backend:5s} failed: {e}")
+                    continue
+            if backend == "fp32":
+                reference = stats["outputs"]
+            compared = agreement(model_key, stats["outputs"], reference) if reference is not None else ""
+            print(f"{model_key:10s} {backend:5s} {stats['throughput']:8.1f} tickets/s  "
+                  f"p95={stats['p95_ms']:8.2f}ms  rss={stats['rss_mb']:7.0f}MB  "
+                  f"load={stats['load_seconds']:5.1f}s  {compared}")
+        print()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Accuracy / latency comparison of the category classifiers on a labelled file.
+
+Usage:
+    python bench_classifier_modes.py tickets.jsonl [--batch-size 16]
+
+tickets.jsonl holds one {"text": ..., "label": ...} object per line, with labels
+in Billing / Technical / Legal. Compares BART zero-shot, the label-embedding
+and shared-embedding modes and the TF-IDF baseline, and reports how often the
+fast modes agree with BART.
+"""
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+from m1_mvr.ml_baseline import BaselineClassifier
+from m2_advanced.ml_transformers import AdvancedClassifier
+
+def load_labelled(path):
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return [r["text"] for r in records], [r["label"] for r in records]
+
+def run_mode(predict_batch, texts, batch_size):
+    """Returns (predictions, per-ticket latencies in ms, batched tickets/sec)."""
+    # Single-ticket latency, as seen by one request
+    latencies = []
+    predictions = []
+    for text in texts:
+        start = time.perf_counter()
+        predictions.extend(predict_batch([text]))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    # Batched throughput
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        predict_batch(texts[i:i + batch_size])
+    throughput = len(texts) / (time.perf_counter() - start)
+    return predictions, latencies, throughput
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="JSONL file with text/label records")
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    texts, labels = load_labelled(args.path)
+    print(f"Loaded {len(texts)} labelled tickets from {args.path}\n")
+
+    baseline = BaselineClassifier()
+    modes = {
+        "zero_shot": AdvancedClassifier(mode="zero_shot"),
+        "label_embedding": AdvancedClassifier(mode="label_embedding"),
+        "shared_embedding": AdvancedClassifier(mode="shared_embedding"),
+    }
+    predictors = {
+        name: (lambda batch, clf=clf: [r["labels"][0] for r in clf.classify_categories(batch)])
+        for name, clf in modes.items()
+    }
+    predictors["baseline"] = baseline.predict_many
+
+    results = {}
+    for name, predict_batch in predictors.items():
+        predict_batch(texts[:1])  # Warm-up
+        predictions, latencies, throughput = run_mode(predict_batch, texts, args.batch_size)
+        results[name] = predictions
+        accuracy = np.mean([p == l for p, l in zip(predictions, labels)])
+        agreement = np.mean([p == z for p, z in zip(predictions, results["zero_shot"])])
+        print(f"{name:16s} accuracy={accuracy:6.1%}  agree_with_bart={agreement:6.1%}  "
+              f"p50={np.percentile(latencies, 50):8.2f}ms  p95={np.percentile(latencies, 95):8.2f}ms  "
+              f"batched={throughput:8.1f} tickets/s")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Tickets/sec of one worker: the per-ticket Celery task against the batched consumer.
+
+Usage:
+    python bench_consumer.py [--redis-url redis://localhost:6379/15] [--tickets 2000]
+                             [--batch-sizes 8,32,64] [--max-wait-ms 50]
+                             [--call-ms 40] [--item-ms 3] [--webhook-ms 50]
+                             [--urgent-share 0.2] [--real-model]
+
+Both paths start with --tickets tickets already waiting in Redis and drain them on
+one worker thread.
+- "per ticket" mirrors process_ticket_task over Celery's Redis transport: one BRPOP
+  of the message, classification of that one ticket, a SET of the result, and the
+  webhook awaited inline for urgent tickets.
+- "batched" runs BatchConsumer.drain() (process_ticket_batch_task) at each batch size.
+
+Without --real-model, classification is a stand-in costing --call-ms per call plus
+--item-ms per ticket, roughly a CPU transformer forward pass on a padded batch. With
+--real-model, the AdvancedClassifier is used, which needs torch and transformers.
+Webhooks take --webhook-ms. Without --redis-url, fakeredis (an in-process emulator)
+is used, which has no network round trips; a real Redis widens the gap.
+The benchmark keys are deleted before and after the run.
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+
+from m2_advanced.batch_consumer import BatchConsumer
+
+PENDING_KEY = "bench:consumer:pending"
+MESSAGE_KEY = "bench:consumer:celery"
+RESULT_PREFIX = "bench:consumer:result:"
+
+TEXTS = ["Server is down, nothing loads", "I was charged twice this month",
+         "Please review the attached contract", "The API returns 500 errors since the deploy"]
+
+def make_client(url):
+    if url:
+        import redis
+        return redis.Redis.from_url(url)
+    import fakeredis
+    print("No --redis-url: using fakeredis (in-process emulation)\n")
+    return fakeredis.FakeRedis()
+
+def make_classify(args):
+    if args.real_model:
+        from m2_advanced.ml_transformers import get_classifier
+        classifier = get_classifier()
+        return classifier.analyze_batch
+    rng = random.Random(0)
+
+    def classify(texts):
+        time.sleep((args.call_ms + args.item_ms * len(texts)) / 1000)
+        return [{"category": "Technical", "urgency_score": 0.95 if rng.random() < args.urgent_share else 0.3}
+                for _ in texts]
+    return classify
+
+def make_webhook(webhook_ms):
+    async def webhook(ticket_id, urgency_score, category):
+        await asyncio.sleep(webhook_ms / 1000)
+    return webhook
+
+def clear(client):
+    client.delete(PENDING_KEY, MESSAGE_KEY, f"{PENDING_KEY}:scheduled")
+    for key in client.scan_iter(f"{RESULT_PREFIX}*"):
+        client.delete(key)
+
+def fill(client, key, tickets):
+    pipe = client.pipeline(transaction=False)
+    for i in range(tickets):
+        pipe.rpush(key, json.dumps({"ticket_id": f"t{i}", "text": TEXTS[i % len(TEXTS)], "user_id": "u1"}))
+    pipe.execute()
+
+def per_ticket(client, classify, webhook, tickets):
+    fill(client, MESSAGE_KEY, tickets)
+    start = time.perf_counter()
+    for _ in range(tickets):
+        ticket = json.loads(client.brpop([MESSAGE_KEY], timeout=1)[1])
+        result = classify([ticket["text"]])[0]
+        client.set(f"{RESULT_PREFIX}{ticket['ticket_id']}", json.dumps(result), ex=3600)
+        if result["urgency_score"] > 0.8:
+            asyncio.run(webhook(ticket["ticket_id"], result["urgency_score"], result["category"]))
+    return tickets / (time.perf_counter() - start)
+
+def batched(client, classify, webhook, tickets, batch_size, max_wait_ms):
+    consumer = BatchConsumer(client, classify, max_batch=batch_size, max_wait_ms=max_wait_ms,
+                             pending_key=PENDING_KEY, result_prefix=RESULT_PREFIX, result_ttl=3600,
+                             webhook_fn=webhook)
+    fill(client, PENDING_KEY, tickets)
+    start = time.perf_counter()
+    processed = 0
+    while processed < tickets:
+        processed += len(consumer.drain())
+    return tickets / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url")
+    parser.add_argument("--tickets", type=int, default=2000)
+    parser.add_argument("--batch-sizes", default="8,32,64")
+    parser.add_argument("--max-wait-ms", type=float, default=50)
+    parser.add_argument("--call-ms", type=float, default=40)
+    parser.add_argument("--item-ms", type=float, default=3)
+    parser.add_argument("--webhook-ms", type=float, default=50)
+    parser.add_argument("--urgent-share", type=float, default=0.2)
+    parser.add_argument("--real-model", action="store_true")
+    args = parser.parse_args()
+
+    client = make_client(args.redis_url)
+    classify = make_classify(args)
+    webhook = make_webhook(args.webhook_ms)
+    clear(client)
+    try:
+        # The per-ticket path is slow: time it on fewer tickets
+        single = per_ticket(client, classify, webhook, min(args.tickets, 200))
+        print(f"{'per ticket':14s} {single:8.1f} tickets/s")
+        for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+            rate = batched(client, classify, webhook, args.tickets, batch_size, args.max_wait_ms)
+            print(f"{'batched x' + str(batch_size):14s} {rate:8.1f} tickets/s  ({rate / single:.1f}x)")
+    finally:
+        clear(client)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Throughput of the MVR ticket queue under concurrent producers and consumers.
+
+Usage:
+    python bench_queue.py [--tickets 200000] [--producers 4] [--consumers 4] [--pop-n 1,32]
+
+Compares the sharded TicketQueueManager against the previous design (one heapq
+list) wrapped in a single lock, which is the minimum needed to share it between
+threads. Producers push tickets spread over three categories with continuous
+urgency scores; consumers pop until every ticket has been consumed.
+"""
+import time
+import heapq
+import random
+import argparse
+import threading
+
+from m1_mvr.queue_manager import TicketQueueManager
+
+CATEGORIES = ["Billing", "Technical", "Legal"]
+
+class SingleLockQueue:
+    """The previous single-heap queue, plus the lock it was missing."""
+    def __init__(self):
+        self.queue = []
+        self.counter = 0
+        self.not_empty = threading.Condition(threading.Lock())
+
+    def add_ticket(self, ticket_id, urgency, data):
+        with self.not_empty:
+            heapq.heappush(self.queue, (-float(urgency), self.counter, ticket_id, data))
+            self.counter += 1
+            self.not_empty.notify()
+
+    def pop_n(self, n, block=False, timeout=None):
+        with self.not_empty:
+            if block and not self.queue:
+                self.not_empty.wait(timeout)
+            return [heapq.heappop(self.queue)[3] for _ in range(min(n, len(self.queue)))]
+
+def run(queue, tickets, producers, consumers, pop_n):
+    per_producer = tickets // producers
+    consumed = [0] * consumers
+    done = threading.Event()
+
+    def produce(worker):
+        rng = random.Random(worker)
+        for i in range(per_producer):
+            queue.add_ticket(f"{worker}-{i}", rng.random(), {"category": CATEGORIES[i % 3]})
+
+    def consume(index):
+        while not done.is_set():
+            batch = queue.pop_n(pop_n, block=True, timeout=0.01)
+            consumed[index] += len(batch)
+            if sum(consumed) >= per_producer * producers:
+                done.set()
+
+    threads = [threading.Thread(target=produce, args=(w,)) for w in range(producers)]
+    threads += [threading.Thread(target=consume, args=(c,)) for c in range(consumers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    # One push and one pop per ticket
+    return 2 * per_producer * producers / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=200000)
+    parser.add_argument("--producers", type=int, default=4)
+    parser.add_argument("--consumers", type=int, default=4)
+    parser.add_argument("--pop-n", default="1,32")
+    args = parser.parse_args()
+
+    print(f"{args.tickets} tickets, {args.producers} producers, {args.consumers} consumers\n")
+    for pop_n in [int(n) for n in args.pop_n.split(",")]:
+        for name, factory in [("single lock", SingleLockQueue), ("sharded", TicketQueueManager)]:
+            ops = run(factory(), args.tickets, args.producers, args.consumers, pop_n)
+            print(f"{name:12s} pop_n={pop_n:<3d} {ops:10.0f} ops/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Enqueue / dequeue throughput of the Redis-backed MVR queue.
+
+Usage:
+    python bench_redis_queue.py [--redis-url redis://localhost:6379/15] [--tickets 50000]
+                                [--rate 10000] [--seconds 5]
+
+Measures single enqueue/pop round trips, pipelined bulk enqueue and ZPOPMIN
+batches, then runs a producer at a fixed target rate (default 10k tickets/s)
+against a consumer popping batches, and reports the achieved rate and p99
+enqueue-to-dequeue latency. Without --redis-url it runs against fakeredis, an
+in-process emulator: useful for a smoke run, not for real numbers.
+The benchmark key is deleted before and after the run.
+"""
+import time
+import argparse
+import threading
+import numpy as np
+
+from m1_mvr.redis_queue import RedisTicketQueueManager
+
+KEY = "bench:mvr:queue"
+
+def make_client(url):
+    if url:
+        import redis
+        return redis.Redis.from_url(url)
+    import fakeredis
+    print("No --redis-url: using fakeredis (in-process emulation)\n")
+    return fakeredis.FakeRedis()
+
+def ticket(i):
+    return {"ticket_id": f"t{i}", "category": "Technical", "text": "The API is returning 500 errors", "enqueued_at": 0.0}
+
+def rate(name, count, seconds):
+    print(f"{name:28s} {count / seconds:10.0f} ops/s")
+
+def bench_primitives(queue, tickets):
+    start = time.perf_counter()
+    for i in range(tickets // 10):
+        queue.add_ticket(f"t{i}", i % 3 == 0, ticket(i))
+    rate("enqueue (one at a time)", tickets // 10, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    while queue.get_next_ticket() is not None:
+        pass
+    rate("dequeue (one at a time)", tickets // 10, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for offset in range(0, tickets, 1000):
+        queue.add_tickets((f"t{i}", i % 3 == 0, ticket(i)) for i in range(offset, offset + 1000))
+    rate("enqueue (bulk, pipelined)", tickets, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    while queue.pop_n(100):
+        pass
+    rate("dequeue (pop_n=100)", tickets, time.perf_counter() - start)
+
+def bench_sustained(queue, target_rate, seconds):
+    """Producer paced at target_rate in 10ms bulk slices; consumer pops batches."""
+    latencies = []
+    produced = [0]
+    stop = threading.Event()
+
+    def produce():
+        per_slice = max(1, target_rate // 100)
+        next_slice = time.perf_counter()
+        while not stop.is_set():
+            now = time.time()
+            queue.add_tickets((f"t{produced[0] + i}", i % 3 == 0, {"enqueued_at": now}) for i in range(per_slice))
+            produced[0] += per_slice
+            next_slice += 0.01
+            time.sleep(max(0.0, next_slice - time.perf_counter()))
+
+    def consume():
+        while not stop.is_set() or len(queue):
+            batch = queue.pop_n(500, block=True, timeout=0.1)
+            now = time.time()
+            latencies.extend(now - t["enqueued_at"] for t in batch)
+
+    threads = [threading.Thread(target=produce), threading.Thread(target=consume)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    print(f"\nsustained target={target_rate}/s: produced {produced[0] / seconds:.0f}/s, "
+          f"consumed {len(latencies) / elapsed:.0f}/s, "
+          f"latency p50={np.percentile(latencies, 50) * 1000:.1f}ms p99={np.percentile(latencies, 99) * 1000:.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url")
+    parser.add_argument("--tickets", type=int, default=50000)
+    parser.add_argument("--rate", type=int, default=10000)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    queue = RedisTicketQueueManager(make_client(args.redis_url), key=KEY)
+    queue.clear()
+    try:
+        bench_primitives(queue, args.tickets)
+        bench_sustained(queue, args.rate, args.seconds)
+    finally:
+        queue.clear()
+        queue.redis.delete(queue.sequence_key)
+
+if __name__ == "__main__":
+    main()
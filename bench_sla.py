@@ -0,0 +1,90 @@
+"""
+SLA-violation rates of the MVR queue's schedulers under load, by discrete-event simulation.
+
+Usage:
+    python bench_sla.py [--hours 48] [--agents 20] [--service-minutes 10]
+                        [--loads 0.8,0.95,1.1] [--urgent-share 0.3] [--seed 0]
+
+Tickets arrive as a Poisson stream (categories mixed Technical/Billing/Legal;
+--urgent-share of them with urgency scores in [0.7, 1], the rest in [0, 0.5]) at
+`load` times what the agents can serve, and each agent works one ticket at a time
+with exponential service times. The same arrivals are replayed through
+TicketQueueManager with scheduling="priority" and "sla" on a simulated clock.
+Reported per class: share of tickets that started after their SLA deadline
+(default SLAPolicy) and wait percentiles. Arrivals stop after --hours and the
+backlog is drained, so under overload starved tickets show up as violations.
+"""
+import heapq
+import random
+import argparse
+import numpy as np
+
+from m1_mvr.queue_manager import TicketQueueManager
+from m1_mvr.sla import SLAPolicy
+
+CATEGORIES = ["Technical", "Billing", "Legal"]
+
+def arrivals(hours, rate_per_second, urgent_share, seed):
+    rng = random.Random(seed)
+    now, tickets = 0.0, []
+    while True:
+        now += rng.expovariate(rate_per_second)
+        if now > hours * 3600:
+            return tickets
+        urgent = rng.random() < urgent_share
+        urgency = rng.uniform(0.7, 1.0) if urgent else rng.uniform(0.0, 0.5)
+        tickets.append((now, rng.choice(CATEGORIES), urgency, urgent))
+
+def simulate(scheduling, tickets, agents, service_seconds, policy, seed):
+    rng = random.Random(seed)
+    queue = TicketQueueManager(scheduling=scheduling, sla_policy=policy)
+    busy = []  # Finish times
+    idle = agents
+    results = {True: [], False: []}  # urgent -> [(wait, violated)]
+    i = 0
+    while i < len(tickets) or busy:
+        if i < len(tickets) and (not busy or tickets[i][0] <= busy[0]):
+            now, category, urgency, urgent = tickets[i]
+            queue.add_ticket(f"t{i}", urgency, {"category": category, "enqueued_at": now, "urgent": urgent,
+                                                "deadline": now + policy.sla(category, urgency)})
+            i += 1
+        else:
+            now = heapq.heappop(busy)
+            idle += 1
+        while idle and len(queue):
+            ticket = queue.get_next_ticket()
+            results[ticket["urgent"]].append((now - ticket["enqueued_at"], now > ticket["deadline"]))
+            heapq.heappush(busy, now + rng.expovariate(1 / service_seconds))
+            idle -= 1
+    return results
+
+def report(scheduling, results):
+    for urgent in (True, False):
+        waits = np.array([wait for wait, _ in results[urgent]]) / 60
+        violations = np.mean([violated for _, violated in results[urgent]])
+        print(f"  {scheduling:8s} {'urgent' if urgent else 'normal':6s} {len(waits):7d} tickets  "
+              f"violations {violations * 100:5.1f}%  wait p50 {np.percentile(waits, 50):7.1f}m  "
+              f"p99 {np.percentile(waits, 99):7.1f}m  max {waits.max():7.1f}m")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=48)
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--service-minutes", type=float, default=10)
+    parser.add_argument("--loads", default="0.8,0.95,1.1")
+    parser.add_argument("--urgent-share", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    policy = SLAPolicy()
+    service_seconds = args.service_minutes * 60
+    print(f"SLA seconds {policy.sla_seconds}, urgent fraction {policy.urgent_fraction}")
+    for load in [float(x) for x in args.loads.split(",")]:
+        rate = load * args.agents / service_seconds
+        tickets = arrivals(args.hours, rate, args.urgent_share, args.seed)
+        print(f"\nload {load:.2f}: {len(tickets)} tickets over {args.hours:g}h, {args.agents} agents")
+        for scheduling in ("priority", "sla"):
+            report(scheduling, simulate(scheduling, tickets, args.agents, service_seconds, policy, args.seed))
+
+if __name__ == "__main__":
+    main()
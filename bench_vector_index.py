@@ -0,0 +1,82 @@
+"""
+Recall vs. latency of the dedup index backends (exact brute force vs. LSH).
+
+Usage:
+    python bench_vector_index.py [--window 100000] [--queries 200]
+
+The window is filled with 384-dim unit vectors: mostly random background traffic
+plus a few "storm" clusters whose members have cosine similarities spread across
+the 0.85-0.99 range, so pairs near the 0.9 threshold are well represented.
+Recall is measured against the exact index's range query results.
+"""
+import time
+import argparse
+import numpy as np
+
+from m3_orchestrator.vector_index import BruteForceIndex, LSHIndex
+
+DIM = 384
+THRESHOLD = 0.9
+
+def make_window(rng, size, storms=20, storm_fraction=0.3):
+    n_storm = int(size * storm_fraction)
+    background = rng.standard_normal((size - n_storm, DIM))
+    centers = rng.standard_normal((storms, DIM))
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    members = centers[rng.integers(0, storms, n_storm)]
+    # Per-member noise level so similarity to the centre varies around the threshold
+    noise = rng.uniform(0.1, 0.45, (n_storm, 1)) / np.sqrt(DIM)
+    members = members + noise * rng.standard_normal((n_storm, DIM))
+    vectors = np.concatenate([background, members]).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    rng.shuffle(vectors)
+    return vectors
+
+def bench(name, index, vectors, queries, truth):
+    start = time.perf_counter()
+    for i, vector in enumerate(vectors):
+        index.add(f"t{i}", vector, float(i))
+    insert_us = (time.perf_counter() - start) / len(vectors) * 1e6
+
+    latencies, found, expected = [], 0, 0
+    for query, true_ids in zip(queries, truth):
+        start = time.perf_counter()
+        hits = index.range_query(query, THRESHOLD)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found += len(set(hits) & true_ids)
+        expected += len(true_ids)
+
+    recall = found / expected if expected else 1.0
+    print(f"{name:24s} recall={recall:6.1%}  query p50={np.percentile(latencies, 50):8.3f}ms  "
+          f"p95={np.percentile(latencies, 95):8.3f}ms  insert={insert_us:7.1f}us")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--window", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = make_window(rng, args.window)
+    exact = BruteForceIndex(capacity=args.window)
+    for i, vector in enumerate(vectors):
+        exact.add(f"t{i}", vector, float(i))
+
+    # Query with storm members (the case dedup cares about): window vectors that have neighbours besides themselves
+    queries, truth = [], []
+    for vector in vectors:
+        neighbours = set(exact.range_query(vector, THRESHOLD))
+        if len(neighbours) > 1:
+            queries.append(vector)
+            truth.append(neighbours)
+            if len(queries) == args.queries:
+                break
+    print(f"window={args.window}  queries={len(queries)}  mean true neighbours={np.mean([len(t) for t in truth]):.1f}\n")
+
+    bench("exact", BruteForceIndex(capacity=args.window), vectors, queries, truth)
+    for tables, bits in [(8, 12), (12, 10), (16, 10), (24, 8)]:
+        bench(f"lsh tables={tables} bits={bits}", LSHIndex(capacity=args.window, num_tables=tables, num_bits=bits),
+              vectors, queries, truth)
+
+if __name__ == "__main__":
+    main()
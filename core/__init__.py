@@ -0,0 +1 @@
+# Shared infrastructure used by all three milestones
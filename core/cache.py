@@ -0,0 +1,203 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import numpy as np
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    """Case-fold and collapse whitespace, so near-verbatim storm tickets share a key."""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+def content_key(text: str) -> str:
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=16).hexdigest()
+
+# Codecs for the Redis tier (the local tier keeps decoded values)
+def encode_embedding(value: np.ndarray) -> bytes:
+    return np.asarray(value, dtype=np.float32).tobytes()
+
+def decode_embedding(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.float32)
+
+def encode_json(value: Any) -> bytes:
+    return json.dumps(value).encode("utf-8")
+
+def decode_json(data: bytes) -> Any:
+    return json.loads(data)
+
+class ContentCache:
+    """
+    Content-addressed cache: normalized ticket text -> value.
+    - Local tier: an LRU OrderedDict bounded by `max_entries`, entries expire after `ttl` seconds.
+    - Optional Redis tier (`redis_client`, a sync client) shared by all API replicas and
+      Celery workers; local misses are looked up with one MGET and filled with SET EX.
+    Redis errors are logged and treated as misses, so the cache never fails a request.
+    """
+    def __init__(self, namespace: str,
+                 max_entries: int = 10000,
+                 ttl: float = 3600,
+                 redis_client=None,
+                 encode: Callable[[Any], bytes] = encode_json,
+                 decode: Callable[[bytes], Any] = decode_json):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.redis_client = redis_client
+        self.encode = encode
+        self.decode = decode
+
+        # key -> (expires_at, value), least recently used first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.redis_errors = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _redis_key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    def _get_local(self, key: str, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _set_local(self, key: str, value: Any, now: float):
+        self._entries[key] = (now + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[Any]]:
+        """Cached values for each text, None where missing."""
+        keys = [content_key(t) for t in texts]
+        now = time.time()
+        with self._lock:
+            values = [self._get_local(k, now) for k in keys]
+
+        missing = [i for i, v in enumerate(values) if v is None]
+        if missing and self.redis_client is not None:
+            try:
+                stored = self.redis_client.mget([self._redis_key(keys[i]) for i in missing])
+            except Exception as e:
+                print(f"Cache '{self.namespace}': Redis read failed ({e})")
+                self.redis_errors += 1
+                stored = [None] * len(missing)
+            with self._lock:
+                for i, data in zip(missing, stored):
+                    if data is not None:
+                        values[i] = self.decode(data)
+                        self._set_local(keys[i], values[i], now)
+                        self.redis_hits += 1
+
+        with self._lock:
+            found = sum(v is not None for v in values)
+            self.hits += found
+            self.misses += len(values) - found
+        return values
+
+    def set_many(self, texts: Sequence[str], values: Sequence[Any]):
+        keys = [content_key(t) for t in texts]
+        now = time.time()
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._set_local(key, value, now)
+        if self.redis_client is not None and keys:
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key, value in zip(keys, values):
+                    pipe.set(self._redis_key(key), self.encode(value), ex=max(int(self.ttl), 1))
+                pipe.execute()
+            except Exception as e:
+                print(f"Cache '{self.namespace}': Redis write failed ({e})")
+                self.redis_errors += 1
+
+    def get_or_compute(self, texts: Sequence[str], compute: Callable[[List[str]], Sequence[Any]]) -> List[Any]:
+        """
+        Values for every text, calling `compute` once on the (deduplicated) misses.
+        Repeated texts within one batch are only computed once.
+        """
+        values = self.get_many(texts)
+        pending: Dict[str, List[int]] = {}
+        for i, value in enumerate(values):
+            if value is None:
+                pending.setdefault(normalize_text(texts[i]), []).append(i)
+        if pending:
+            to_compute = [texts[indices[0]] for indices in pending.values()]
+            computed = list(compute(to_compute))
+            self.set_many(to_compute, computed)
+            for indices, value in zip(pending.values(), computed):
+                for i in indices:
+                    values[i] = value
+        return values
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "redis_enabled": self.redis_client is not None,
+            "redis_errors": self.redis_errors
+        }
+
+# Global instances, one per kind of cached value
+_caches: Dict[str, ContentCache] = {}
+_caches_lock = threading.Lock()
+
+def cache_enabled() -> bool:
+    return os.getenv("CACHE_ENABLED", "true").lower() == "true"
+
+def _redis_tier():
+    url = os.getenv("CACHE_REDIS_URL")
+    if not url:
+        return None
+    import redis
+    return redis.Redis.from_url(url, socket_timeout=0.1)
+
+def get_cache(namespace: str, encode: Callable[[Any], bytes] = encode_json,
+              decode: Callable[[bytes], Any] = decode_json) -> ContentCache:
+    with _caches_lock:
+        if namespace not in _caches:
+            _caches[namespace] = ContentCache(
+                namespace,
+                max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "10000")),
+                ttl=float(os.getenv("CACHE_TTL_SECONDS", "3600")),
+                redis_client=_redis_tier(),
+                encode=encode,
+                decode=decode
+            )
+        return _caches[namespace]
+
+def get_embedding_cache() -> ContentCache:
+    return get_cache("embedding", encode=encode_embedding, decode=decode_embedding)
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    with _caches_lock:
+        caches = dict(_caches)
+    return {namespace: cache.get_stats() for namespace, cache in caches.items()}
@@ -0,0 +1,381 @@
+import os
+import time
+import asyncio
+import threading
+from typing import Awaitable, Callable, Any, Dict, Optional
+from enum import Enum
+import numpy as np
+
+class CircuitState(Enum):
+    CLOSED = "closed"  # Normal operation
+    OPEN = "open"      # Failing, use fallback
+    HALF_OPEN = "half_open"  # Testing if service recovered
+
+class RollingWindow:
+    """
+    Call outcomes over the last `window_seconds`, in `bucket_seconds` time buckets.
+    Each bucket holds a call count, an error count and a latency histogram with
+    log-spaced bins (1ms .. ~65s), so recording is O(1) and percentiles are read
+    from the merged histogram without keeping individual samples.
+    """
+    BIN_EDGES_MS = np.geomspace(1.0, 65536.0, 65)
+
+    def __init__(self, window_seconds: float = 60, bucket_seconds: float = 5):
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = max(1, int(round(window_seconds / bucket_seconds)))
+        self._epochs = np.full(self.num_buckets, -1, dtype=np.int64)  # Bucket start, in bucket units
+        self._calls = np.zeros(self.num_buckets, dtype=np.int64)
+        self._errors = np.zeros(self.num_buckets, dtype=np.int64)
+        self._histograms = np.zeros((self.num_buckets, len(self.BIN_EDGES_MS) + 1), dtype=np.int64)
+
+    def record(self, latency: float, error: bool, now: float):
+        epoch = int(now // self.bucket_seconds)
+        slot = epoch % self.num_buckets
+        if self._epochs[slot] != epoch:
+            # The slot still holds a bucket from a previous lap of the ring
+            self._epochs[slot] = epoch
+            self._calls[slot] = 0
+            self._errors[slot] = 0
+            self._histograms[slot] = 0
+        self._calls[slot] += 1
+        self._errors[slot] += error
+        self._histograms[slot, np.searchsorted(self.BIN_EDGES_MS, latency * 1000)] += 1
+
+    def _live(self, now: float) -> np.ndarray:
+        return self._epochs > int(now // self.bucket_seconds) - self.num_buckets
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        live = self._live(now)
+        calls = int(self._calls[live].sum())
+        errors = int(self._errors[live].sum())
+        histogram = self._histograms[live].sum(axis=0)
+        cumulative = np.cumsum(histogram)
+
+        def percentile(q: float) -> float:
+            if calls == 0:
+                return 0.0
+            # Bin i holds latencies in [edges[i-1], edges[i]); interpolate inside it
+            rank = q * calls
+            bin_index = int(np.searchsorted(cumulative, rank))
+            edges = self.BIN_EDGES_MS
+            if bin_index == 0:
+                return float(edges[0])
+            if bin_index >= len(edges):
+                return float(edges[-1])
+            below = cumulative[bin_index - 1]
+            fraction = (rank - below) / max(histogram[bin_index], 1)
+            return float(edges[bin_index - 1] + fraction * (edges[bin_index] - edges[bin_index - 1]))
+
+        return {
+            "calls": calls,
+            "errors": errors,
+            "error_rate": errors / calls if calls else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99)
+        }
+
+class CircuitBreaker:
+    """
+    Circuit breaker pattern implementation.
+    If latency exceeds threshold, automatically failover to fallback.
+
+    Outcomes are tracked in a rolling window (see RollingWindow). The circuit opens when
+    - `failure_threshold` calls fail in a row (fast trip at low traffic; 0 disables), or
+    - with at least `min_calls` in the window, the error rate reaches `error_rate_threshold`
+      or the `latency_percentile` latency exceeds `latency_slo`.
+    After `recovery_timeout` it goes half-open and lets at most `half_open_max_probes` calls
+    through at a time; `half_open_successes` successful probes close it, any failure reopens it.
+
+    `call_async` enforces the threshold as a hard deadline: the primary is abandoned
+    when it expires, so a slow request costs the threshold plus the (fast) fallback
+    rather than primary time plus fallback time. Durations use time.monotonic.
+    State is guarded by a lock, so one breaker can be shared by executor threads.
+    """
+    def __init__(self, latency_threshold: float = 0.5,
+                 failure_threshold: int = 3,
+                 recovery_timeout: int = 60,
+                 name: str = "transformer",
+                 window_seconds: float = 60,
+                 bucket_seconds: float = 5,
+                 min_calls: int = 20,
+                 error_rate_threshold: float = 0.5,
+                 latency_percentile: str = "p95",
+                 latency_slo: Optional[float] = None,
+                 half_open_max_probes: int = 1,
+                 half_open_successes: int = 2):
+        self.name = name
+        self.latency_threshold = latency_threshold  # 500ms
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.latency_percentile = latency_percentile
+        self.latency_slo = latency_threshold if latency_slo is None else latency_slo
+        self.half_open_max_probes = half_open_max_probes
+        self.half_open_successes = half_open_successes
+
+        self.window = RollingWindow(window_seconds, bucket_seconds)
+        self._lock = threading.Lock()
+
+        self.state = CircuitState.CLOSED
+        self.failure_count = 0  # Consecutive failures
+        self.last_failure_time = None  # Wall clock, for display
+        self.trip_reason = None
+        self._opened_at = None  # Monotonic
+        self._probes_in_flight = 0
+        self.success_count = 0
+        self.timeout_count = 0
+        self.hedge_count = 0
+        self.hedge_wins = 0
+
+    def call(self, primary_func: Callable, fallback_func: Callable, *args, **kwargs) -> tuple[Any, str]:
+        """
+        Execute primary function with circuit breaker protection.
+        Returns: (result, model_used)
+        """
+        # Try primary function
+        probe = self._acquire()
+        if probe is not None:
+            start_time = time.monotonic()
+            try:
+                result = primary_func(*args, **kwargs)
+            except Exception:
+                self._record(time.monotonic() - start_time, False, probe)
+                return fallback_func(*args, **kwargs), "baseline"
+
+            latency = time.monotonic() - start_time
+            # Check latency threshold
+            if latency > self.latency_threshold:
+                self._record(latency, False, probe)
+                return fallback_func(*args, **kwargs), "baseline"
+            self._record(latency, True, probe)
+            return result, "transformer"
+
+        # Circuit is open, use fallback immediately
+        return fallback_func(*args, **kwargs), "baseline"
+
+    async def call_async(self, primary_func: Callable[[], Awaitable], fallback_func: Callable[[], Awaitable],
+                         hedge_delay: Optional[float] = None) -> tuple[Any, str]:
+        """
+        Async variant of call(). Both arguments are zero-argument callables returning awaitables.
+        - The primary gets at most `latency_threshold` seconds, then is cancelled and the
+          fallback runs.
+        - With `hedge_delay` (seconds, below the threshold), the fallback also starts once the
+          primary has been running that long, and whichever finishes first is returned. A
+          primary that loses the race keeps running until the deadline so its outcome still
+          counts towards the circuit state.
+        Returns: (result, model_used)
+        """
+        probe = self._acquire()
+        if probe is None:
+            return await fallback_func(), "baseline"
+
+        loop = asyncio.get_running_loop()
+        start_time = time.monotonic()
+        primary = asyncio.ensure_future(primary_func())
+        fallback = None
+        # Set once the probe's outcome is recorded (or handed to a done-callback)
+        settled = False
+        try:
+            if hedge_delay is not None and hedge_delay < self.latency_threshold:
+                done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+                if not done:
+                    with self._lock:
+                        self.hedge_count += 1
+                    fallback = asyncio.ensure_future(fallback_func())
+                    done, _ = await asyncio.wait({primary, fallback}, return_when=asyncio.FIRST_COMPLETED)
+                    if primary not in done and not fallback.exception():
+                        # The hedge won; let the primary finish in the background, up to the deadline
+                        with self._lock:
+                            self.hedge_wins += 1
+                        remaining = self.latency_threshold - (time.monotonic() - start_time)
+                        deadline = loop.call_later(max(remaining, 0), primary.cancel)
+
+                        def record_outcome(task):
+                            deadline.cancel()
+                            ok = not task.cancelled() and task.exception() is None
+                            self._record(time.monotonic() - start_time, ok, probe)
+                        settled = True
+                        primary.add_done_callback(record_outcome)
+                        return fallback.result(), "baseline"
+
+            remaining = self.latency_threshold - (time.monotonic() - start_time)
+            try:
+                result = await asyncio.wait_for(primary, timeout=max(remaining, 0))
+            except asyncio.TimeoutError:
+                with self._lock:
+                    self.timeout_count += 1
+                settled = True
+                self._record(time.monotonic() - start_time, False, probe)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                settled = True
+                self._record(time.monotonic() - start_time, False, probe)
+            else:
+                settled = True
+                self._record(time.monotonic() - start_time, True, probe)
+                if fallback is not None:
+                    fallback.cancel()
+                return result, "transformer"
+
+            if fallback is None:
+                fallback = asyncio.ensure_future(fallback_func())
+            return await fallback, "baseline"
+        except asyncio.CancelledError:
+            # The caller went away (client disconnect, outer timeout): stop our tasks and
+            # free the probe slot, or a half-open breaker would never probe again
+            primary.cancel()
+            if fallback is not None:
+                fallback.cancel()
+            if not settled:
+                self._record(time.monotonic() - start_time, False, probe)
+            raise
+
+    def allow(self) -> bool:
+        """For callers that instrument a backend themselves: acquire, then record()."""
+        return self._acquire() is not None
+
+    def record(self, latency: float, ok: bool, probe: bool = False):
+        self._record(latency, ok, probe)
+
+    def _acquire(self) -> Optional[bool]:
+        """
+        Whether to try the primary now: None if not, otherwise whether the call is a
+        half-open probe. Moves OPEN to HALF_OPEN after the recovery timeout.
+        """
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                if time.monotonic() - self._opened_at <= self.recovery_timeout:
+                    return None
+                self.state = CircuitState.HALF_OPEN
+                self.success_count = 0
+                self._probes_in_flight = 0
+            if self.state == CircuitState.HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_max_probes:
+                    return None
+                self._probes_in_flight += 1
+                return True
+            return False
+
+    def _record(self, latency: float, ok: bool, probe: bool):
+        now = time.monotonic()
+        with self._lock:
+            self.window.record(latency, not ok, now)
+            if probe:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if ok:
+                self._record_success(probe)
+            else:
+                self._record_failure(probe, now)
+
+    def _record_failure(self, probe: bool, now: float):
+        """Record a failure and potentially open the circuit. Caller holds the lock."""
+        self.failure_count += 1
+        self.last_failure_time = time.time()
+        if self.state == CircuitState.OPEN:
+            return
+
+        reason = None
+        if probe or self.state == CircuitState.HALF_OPEN:
+            reason = "half-open probe failed"
+        elif self.failure_threshold and self.failure_count >= self.failure_threshold:
+            reason = f"{self.failure_count} consecutive failures"
+        else:
+            reason = self._window_trip_reason(now)
+        if reason:
+            self.state = CircuitState.OPEN
+            self.trip_reason = reason
+            self._opened_at = now
+
+    def _record_success(self, probe: bool):
+        """Record a success and potentially close the circuit. Caller holds the lock."""
+        self.failure_count = 0
+
+        if self.state == CircuitState.HALF_OPEN and probe:
+            self.success_count += 1
+            if self.success_count >= self.half_open_successes:
+                self.state = CircuitState.CLOSED
+                self.trip_reason = None
+        elif self.state == CircuitState.CLOSED:
+            # Slow successes still count towards the latency percentile
+            reason = self._window_trip_reason(time.monotonic())
+            if reason:
+                self.state = CircuitState.OPEN
+                self.trip_reason = reason
+                self._opened_at = time.monotonic()
+
+    def _window_trip_reason(self, now: float) -> Optional[str]:
+        stats = self.window.snapshot(now)
+        if stats["calls"] < self.min_calls:
+            return None
+        if stats["error_rate"] >= self.error_rate_threshold:
+            return f"error rate {stats['error_rate']:.0%} over {stats['calls']} calls"
+        latency_ms = stats[f"{self.latency_percentile}_ms"]
+        if latency_ms > self.latency_slo * 1000:
+            return f"{self.latency_percentile} latency {latency_ms:.0f}ms over SLO"
+        return None
+
+    def get_state(self) -> dict:
+        """Get current circuit breaker state."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self.state.value,
+                "failure_count": self.failure_count,
+                "last_failure_time": self.last_failure_time,
+                "trip_reason": self.trip_reason,
+                "window": self.window.snapshot(time.monotonic()),
+                "timeouts": self.timeout_count,
+                "hedged_calls": self.hedge_count,
+                "hedge_wins": self.hedge_wins
+            }
+
+# Per-backend defaults: (latency threshold in seconds)
+BACKEND_LATENCY_THRESHOLDS = {
+    "transformer": 0.5,  # Classification models
+    "embedding": 0.2,    # MiniLM ticket embedding
+    "webhook": 2.0,      # Slack/Discord notifications
+    "redis": 0.25,       # Idempotency locks, shared agent capacities
+}
+
+def _env_float(name: str, key: str, default: float) -> float:
+    value = os.getenv(f"CIRCUIT_{name.upper()}_{key}")
+    return float(value) if value else default
+
+def _create_breaker(name: str) -> CircuitBreaker:
+    default_ms = BACKEND_LATENCY_THRESHOLDS.get(name, 0.5) * 1000
+    if name == "transformer":
+        # Backwards-compatible name for the classifier threshold
+        default_ms = float(os.getenv("CIRCUIT_LATENCY_THRESHOLD_MS", default_ms))
+    return CircuitBreaker(
+        name=name,
+        latency_threshold=_env_float(name, "LATENCY_THRESHOLD_MS", default_ms) / 1000,
+        failure_threshold=int(_env_float(name, "FAILURE_THRESHOLD", 3)),
+        recovery_timeout=_env_float(name, "RECOVERY_TIMEOUT", 60),
+        window_seconds=_env_float(name, "WINDOW_SECONDS", 60),
+        min_calls=int(_env_float(name, "MIN_CALLS", 20)),
+        error_rate_threshold=_env_float(name, "ERROR_RATE_THRESHOLD", 0.5),
+        half_open_max_probes=int(_env_float(name, "HALF_OPEN_PROBES", 1))
+    )
+
+# Global instances, one per protected backend
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(name: str = "transformer") -> CircuitBreaker:
+    with _circuit_breakers_lock:
+        if name not in _circuit_breakers:
+            _circuit_breakers[name] = _create_breaker(name)
+        return _circuit_breakers[name]
+
+def get_circuit_states() -> Dict[str, dict]:
+    with _circuit_breakers_lock:
+        breakers = dict(_circuit_breakers)
+    return {name: breaker.get_state() for name, breaker in breakers.items()}
+
+def hedge_delay_from_env() -> Optional[float]:
+    """CIRCUIT_HEDGE_DELAY_MS enables hedged calls (unset = wait for the primary up to the deadline)."""
+    delay_ms = os.getenv("CIRCUIT_HEDGE_DELAY_MS")
+    return float(delay_ms) / 1000 if delay_ms else None
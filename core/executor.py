@@ -0,0 +1,114 @@
+import os
+import asyncio
+import functools
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+class ExecutorSaturated(Exception):
+    """Raised when too many inference calls are already queued (mapped to HTTP 429)."""
+
+class InferenceExecutor:
+    """
+    Runs blocking model inference off the event loop.
+    - Thread pool: for torch / sentence-transformers, which release the GIL in their kernels.
+    - Process pool (optional): for the sklearn baseline, which holds the GIL.
+    A cap on in-flight calls provides back-pressure: once `max_pending` calls are
+    queued or running, new calls fail fast instead of growing an unbounded backlog.
+    """
+    def __init__(self, thread_workers: int = 4,
+                 process_workers: int = 0,
+                 max_pending: int = 64):
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self.max_pending = max_pending
+
+        self._thread_pool = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="inference")
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+        # Requests may come from more than one event loop thread (e.g. the test client)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed_count = 0
+        self.rejected_count = 0
+
+    def _get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.process_workers <= 0:
+            return None
+        if self._process_pool is None:
+            # "spawn" so children don't inherit the parent's threads (warm-up, thread pool)
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._process_pool
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected_count += 1
+                raise ExecutorSaturated(f"Inference executor saturated ({self._pending} calls pending)")
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+            self.completed_count += 1
+
+    async def run(self, func: Callable, *args, pool: str = "thread", **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) on the chosen pool and await the result.
+        pool="process" requires a picklable, module-level func; it falls back to
+        the thread pool when no process workers are configured.
+        Raises ExecutorSaturated once max_pending calls are queued or running.
+        """
+        self._acquire()
+        try:
+            executor = self._get_process_pool() if pool == "process" else None
+            if executor is None:
+                executor = self._thread_pool
+            future = executor.submit(functools.partial(func, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # The slot is held until the work itself is done (or cancelled before it started),
+        # not until the caller stops waiting: a cancelled await (deadline, hedge) leaves
+        # the work running in the pool, and it still counts against max_pending
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "thread_workers": self.thread_workers,
+            "process_workers": self.process_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self.completed_count,
+            "rejected": self.rejected_count
+        }
+
+    def shutdown(self):
+        self._thread_pool.shutdown(wait=False, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+# Global instance
+_inference_executor = None
+
+def get_inference_executor():
+    global _inference_executor
+    if _inference_executor is None:
+        _inference_executor = InferenceExecutor(
+            thread_workers=int(os.getenv("INFERENCE_THREAD_WORKERS", "4")),
+            process_workers=int(os.getenv("INFERENCE_PROCESS_WORKERS", "0")),
+            max_pending=int(os.getenv("INFERENCE_MAX_PENDING", "64"))
+        )
+    return _inference_executor
+
+def shutdown_inference_executor():
+    global _inference_executor
+    if _inference_executor is not None:
+        _inference_executor.shutdown()
+        _inference_executor = None
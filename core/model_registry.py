@@ -0,0 +1,115 @@
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+class ModelRegistry:
+    """
+    Central registry of lazily-loaded models.
+    Modules register a loader (a zero-argument callable) at import time, which
+    is cheap; the heavy import and weight loading only happens the first time
+    the model is requested, or when it is warmed up in the background.
+    """
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        self._warmup_targets: List[str] = []
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """Register (or replace) the loader for a model. Does not load it."""
+        with self._registry_lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            self._status.setdefault(name, {"state": "registered", "load_seconds": None, "error": None})
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._loaders
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def get(self, name: str) -> Any:
+        """
+        Return the model instance, loading it on first use.
+        Concurrent callers for the same model wait for a single load.
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        if name not in self._loaders:
+            raise KeyError(f"Model '{name}' is not registered")
+
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            if name in self._instances:
+                return self._instances[name]
+
+            self._status[name].update(state="loading", error=None)
+            start_time = time.monotonic()
+            try:
+                instance = self._loaders[name]()
+            except Exception as e:
+                self._status[name].update(state="failed", error=str(e))
+                raise
+            self._instances[name] = instance
+            self._status[name].update(state="ready", load_seconds=round(time.monotonic() - start_time, 3))
+            return instance
+
+    def unload(self, name: str):
+        """Drop a loaded instance so the next get() reloads it."""
+        with self._locks.get(name, self._registry_lock):
+            self._instances.pop(name, None)
+            if name in self._status:
+                self._status[name].update(state="registered", load_seconds=None)
+
+    def warm_up(self, names: Iterable[str]) -> threading.Thread:
+        """
+        Load the given models in a background daemon thread so the API can
+        start serving (liveness) while models load (readiness).
+        """
+        self._warmup_targets = [n for n in names if n]
+        self._warmup_thread = threading.Thread(target=self._warm_up_worker, name="model-warmup", daemon=True)
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+    def _warm_up_worker(self):
+        for name in self._warmup_targets:
+            if name not in self._loaders:
+                print(f"Warm-up skipped for unknown model '{name}'")
+                continue
+            try:
+                print(f"Warming up model '{name}'...")
+                self.get(name)
+            except Exception as e:
+                print(f"Failed to warm up model '{name}': {e}")
+
+    def is_ready(self) -> bool:
+        """Ready once every model requested for warm-up has loaded."""
+        return all(
+            self.is_loaded(name)
+            for name in self._warmup_targets
+            if name in self._loaders
+        )
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model load state, for the /health endpoint."""
+        return {name: dict(status) for name, status in self._status.items()}
+
+def warmup_models_from_env() -> List[str]:
+    """Models to warm up at startup, from WARMUP_MODELS (comma-separated)."""
+    value = os.getenv("WARMUP_MODELS", "baseline")
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+# Global instance
+_model_registry = None
+
+def get_model_registry():
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = ModelRegistry()
+    return _model_registry
@@ -1,10 +1,14 @@
 import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import make_pipeline
+from typing import List
+from core.model_registry import get_model_registry
 
 class BaselineClassifier:
     def __init__(self):
+        # Deferred so importing the module (and the API) doesn't pull in sklearn
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.naive_bayes import MultinomialNB
+        from sklearn.pipeline import make_pipeline
+
         # We initialize a pipeline with TF-IDF and MultinomialNB
         self.pipeline = make_pipeline(
             TfidfVectorizer(stop_words='english'),
@@ -40,10 +44,41 @@ class BaselineClassifier:
         prediction = self.pipeline.predict([text])
         return prediction[0]
 
+    def predict_many(self, texts: List[str]) -> List[str]:
+        """
+        Vectorized prediction for a batch of tickets.
+        TF-IDF transforms the whole list into one sparse matrix and NB predicts it
+        in a single call, so sklearn's input validation is paid once per batch.
+        """
+        if not texts:
+            return []
+        return self.pipeline.predict(texts).tolist()
+
+# Compiled once at import instead of on every call
+URGENCY_PATTERN = re.compile(r'\b(broken|asap|urgent|down|critical|emergency)\b', re.IGNORECASE)
+
 def check_urgency(text: str) -> bool:
     """
     Regex-based heuristic for urgency.
     Flags keywords like 'broken', 'asap', 'urgent', 'down', 'critical'.
     """
-    pattern = re.compile(r'\b(broken|asap|urgent|down|critical|emergency)\b', re.IGNORECASE)
-    return bool(pattern.search(text))
+    return bool(URGENCY_PATTERN.search(text))
+
+def check_urgency_many(texts: List[str]) -> List[bool]:
+    """Batch version of check_urgency."""
+    search = URGENCY_PATTERN.search
+    return [search(text) is not None for text in texts]
+
+# The baseline model is shared by the MVR and orchestrator routers
+get_model_registry().register("baseline", BaselineClassifier)
+
+def get_baseline_classifier():
+    return get_model_registry().get("baseline")
+
+# Module-level entry points so they can be pickled into the inference process pool;
+# each worker process lazily loads its own copy of the baseline model.
+def classify_baseline(text: str) -> str:
+    return get_baseline_classifier().predict_category(text)
+
+def classify_baseline_many(texts: List[str]) -> List[str]:
+    return get_baseline_classifier().predict_many(texts)
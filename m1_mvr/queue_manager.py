@@ -1,41 +1,337 @@
+import os
+import time
 import heapq
-from typing import Dict, Any
+import itertools
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
+
+from core.wal import open_wal
+from .sla import SLAPolicy
+
+Urgency = Union[bool, float]
+
+def priority_score(urgency: Urgency) -> float:
+    """Continuous priority in [0, 1]: an urgency score, or True/False for 1.0/0.0."""
+    return float(urgency)
+
+# "priority": highest urgency first. "sla": earliest deadline first (see SLAPolicy).
+SCHEDULERS = ("priority", "sla")
+
+class _Shard:
+    """One category's heap and its lock."""
+    __slots__ = ("heap", "lock")
+
+    def __init__(self):
+        self.heap: List[tuple] = []
+        self.lock = threading.Lock()
 
 class TicketQueueManager:
     """
-    In-memory priority queue using heapq.
-    Single-threaded execution for Milestone 1.
+    In-memory priority queue using heapq, safe to share between threads.
+    - Priorities are continuous: higher urgency score first, FIFO among equal scores
+      (a bool urgency maps to 1.0 / 0.0, so the Milestone 1 behaviour is unchanged).
+    - Tickets are sharded by category, each shard a heap with its own lock, so
+      producers for different categories don't contend. A pop takes the best head
+      across shards.
+    - Consumers can block with a timeout. Producers only touch the shared condition
+      when a consumer is actually waiting, so the push path has no global lock.
+    - scheduling="sla" orders by SLA deadline instead, so urgent tickets go first but
+      normal ones still get served before they breach (no starvation).
+    - update_urgency() re-scores a queued ticket in O(log n): the new entry is pushed
+      and the old one is left in the heap, dead, and dropped when it surfaces.
+    The queue is per process; see RedisTicketQueueManager for one shared by replicas,
+    or attach_wal() to keep it across restarts.
     """
-    def __init__(self):
-        # elements in heap will be tuples: (priority, ticket_id, ticket_data)
-        # However, we want high urgency to be popped first. 
-        # heapq is a min-heap. So we will use negative priority or standard ordering:
-        # Priority mapping: High urgency = 1, Normal urgency = 2
-        # Then tie-breaker can be counter (insertion order).
-        self.queue = []
-        self.counter = 0
+    blocking_io = False
+
+    def __init__(self, scheduling: str = "priority", sla_policy: Optional[SLAPolicy] = None):
+        if scheduling not in SCHEDULERS:
+            raise ValueError(f"Unknown scheduling '{scheduling}', expected one of {SCHEDULERS}")
+        self.scheduling = scheduling
+        self.sla_policy = sla_policy or SLAPolicy.from_env()
+        # Each shard's heap holds (rank, sequence, ticket_id, ticket_data, priority), where
+        # rank is -priority or the SLA deadline
+        self._shards: Dict[str, _Shard] = {}
+        self._shards_lock = threading.Lock()
+        # Global insertion order, for FIFO across shards (next() on a count is atomic)
+        self._sequence = itertools.count()
+        self._not_empty = threading.Condition(threading.Lock())
+        self._waiters = 0
+        # ticket_id -> its live heap entry; any other entry for the ticket is dead
+        self._live: Dict[str, tuple] = {}
+        # Optional core.wal.WriteAheadLog; pushes and pops are logged under the shard lock
+        self.wal = None
 
-    def add_ticket(self, ticket_id: str, urgency: bool, data: Dict[str, Any]):
+    def attach_wal(self, wal):
+        """
+        Replay `wal` into the queue, then log every push and pop to it. With fsync="always"
+        a push waits for the disk, so the queue then reports blocking_io.
+        """
+        wal.open(self._restore, self._snapshot_state)
+        self.wal = wal
+        self.blocking_io = wal.fsync == "always"
+
+    def _snapshot_state(self) -> List[list]:
+        entries = []
+        for shard in list(self._shards.values()):
+            with shard.lock:
+                entries.extend(e for e in shard.heap if self._live.get(e[2]) is e)
+        entries.sort(key=lambda entry: entry[1])
+        return [[ticket_id, priority, data] for _, _, ticket_id, data, priority in entries]
+
+    def _restore(self, state: Optional[List[list]], events: Iterable[Tuple[str, Any]]):
+        # Replay is idempotent: the snapshot may already reflect events logged after it
+        queued = {ticket_id: (priority, data) for ticket_id, priority, data in state or []}
+        for event_type, payload in events:
+            if event_type == "push":
+                # A re-added ticket replaces the queued one, as add_ticket does
+                ticket_id, priority, data = payload
+                queued[ticket_id] = (priority, data)
+            elif event_type == "update":
+                ticket_id, priority = payload
+                if ticket_id in queued:
+                    queued[ticket_id] = (priority, queued[ticket_id][1])
+            elif event_type == "pop":
+                queued.pop(payload, None)
+            elif event_type == "clear":
+                queued = {ticket_id: entry for ticket_id, entry in queued.items()
+                          if entry[1].get("category", "default") != payload}
+        self.add_tickets((ticket_id, priority, data) for ticket_id, (priority, data) in queued.items())
+
+    def _shard(self, data: Dict[str, Any]) -> _Shard:
+        key = data.get("category", "default")
+        shard = self._shards.get(key)
+        if shard is None:
+            with self._shards_lock:
+                shard = self._shards.setdefault(key, _Shard())
+        return shard
+
+    def _entry(self, ticket_id: str, urgency: Urgency, data: Dict[str, Any], sequence: Optional[int] = None) -> tuple:
+        priority = priority_score(urgency)
+        rank = self.sla_policy.stamp(data, priority) if self.scheduling == "sla" else -priority
+        return (rank, next(self._sequence) if sequence is None else sequence, ticket_id, data, priority)
+
+    def _is_live(self, entry: tuple) -> bool:
+        """Claim a popped entry; False if it was superseded. Caller holds the shard lock."""
+        if self._live.get(entry[2]) is not entry:
+            return False
+        del self._live[entry[2]]
+        return True
+
+    def add_ticket(self, ticket_id: str, urgency: Urgency, data: Dict[str, Any]):
         """
         Add a ticket to the priority queue.
-        Urgency=True gets priority 1, else priority 2.
+        `urgency` is an urgency score in [0, 1] or a bool (True = 1.0).
+        With SLA scheduling, `data` is stamped with "enqueued_at" and "sla_deadline".
+        Adding a ticket_id that is already queued replaces it.
+        """
+        shard = self._shard(data)
+        entry = self._entry(ticket_id, urgency, data)
+        wal = self.wal
+        with shard.lock:
+            heapq.heappush(shard.heap, entry)
+            self._live[ticket_id] = entry
+            if wal is not None:
+                logged = wal.append("push", [ticket_id, entry[4], data])
+        if wal is not None:
+            wal.commit(logged)
+        self._wake(1)
+
+    def add_tickets(self, tickets: Iterable[Tuple[str, Urgency, Dict[str, Any]]]):
+        """
+        Bulk insert of (ticket_id, urgency, data) tuples.
+        Large batches are appended and heapified in O(n + k) instead of k pushes.
         """
-        priority = 1 if urgency else 2
-        
-        # Tuple: (priority_level, counter, ticket_id, data)
-        # Using counter to preserve order among tickets with same priority (FIFO)
-        heapq.heappush(self.queue, (priority, self.counter, ticket_id, data))
-        self.counter += 1
+        grouped: Dict[int, Tuple[_Shard, List[tuple]]] = {}
+        count = 0
+        for ticket_id, urgency, data in tickets:
+            shard = self._shard(data)
+            grouped.setdefault(id(shard), (shard, []))[1].append(self._entry(ticket_id, urgency, data))
+            count += 1
+
+        wal, logged = self.wal, 0
+        for shard, entries in grouped.values():
+            with shard.lock:
+                if len(entries) > len(shard.heap):
+                    shard.heap.extend(entries)
+                    heapq.heapify(shard.heap)
+                else:
+                    for entry in entries:
+                        heapq.heappush(shard.heap, entry)
+                for entry in entries:
+                    self._live[entry[2]] = entry
+                if wal is not None:
+                    logged = wal.append_many(("push", [e[2], e[4], e[3]]) for e in entries)
+        if wal is not None:
+            wal.commit(logged)
+        self._wake(count)
+
+    def update_urgency(self, ticket_id: str, urgency: Urgency) -> bool:
+        """Re-score a queued ticket (keeping its place among equals); False if it isn't queued."""
+        entry = self._live.get(ticket_id)
+        if entry is None:
+            return False
+        shard = self._shard(entry[3])
+        wal, logged = self.wal, 0
+        with shard.lock:
+            if self._live.get(ticket_id) is not entry:
+                return False  # Popped (or replaced) meanwhile
+            updated = self._entry(ticket_id, urgency, entry[3], sequence=entry[1])
+            heapq.heappush(shard.heap, updated)
+            self._live[ticket_id] = updated
+            if wal is not None:
+                logged = wal.append("update", [ticket_id, updated[4]])
+        if logged:
+            wal.commit(logged)
+        return True
+
+    def _wake(self, count: int):
+        # Consumers register as waiters and re-check the shards under the condition
+        # before sleeping, so reading _waiters without the lock can't lose a wake-up
+        if self._waiters and count:
+            with self._not_empty:
+                self._not_empty.notify(count)
 
-    def get_next_ticket(self) -> Dict[str, Any]:
+    def _pop_best(self) -> Optional[Dict[str, Any]]:
+        """Pop the best head across shards, or None if every shard is empty."""
+        wal = self.wal
+        while True:
+            best, best_entry = None, None
+            for shard in list(self._shards.values()):
+                try:
+                    head = shard.heap[0]  # Lock-free peek; confirmed under the shard lock below
+                except IndexError:
+                    continue
+                if best_entry is None or head < best_entry:
+                    best, best_entry = shard, head
+            if best is None:
+                return None
+            with best.lock:
+                if best.heap and best.heap[0] is best_entry:
+                    heapq.heappop(best.heap)
+                    if self._is_live(best_entry):
+                        logged = wal.append("pop", best_entry[2]) if wal is not None else 0
+                        break
+                    continue  # A dead entry left by update_urgency
+            # Another consumer took that head (or a better ticket arrived); look again
+        if logged:
+            wal.commit(logged)
+        return best_entry[3]
+
+    def _wait(self, deadline: Optional[float]) -> bool:
+        """Sleep until a producer pushes or the deadline passes; False once it has passed."""
+        with self._not_empty:
+            self._waiters += 1
+            try:
+                if len(self):
+                    return True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._not_empty.wait(remaining)
+                return True
+            finally:
+                self._waiters -= 1
+
+    def get_next_ticket(self, block: bool = False, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
         """
         Retrieves the next ticket from the queue with highest priority.
-        Returns None if queue is empty.
+        Returns None if queue is empty (after waiting up to `timeout` seconds when block=True).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            ticket = self._pop_best()
+            if ticket is not None or not block or not self._wait(deadline):
+                return ticket
+
+    def pop_n(self, n: int, block: bool = False, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
         """
-        if not self.queue:
-            return None
-        _, _, ticket_id, data = heapq.heappop(self.queue)
-        return data
+        Up to `n` tickets in priority order. With block=True, waits up to `timeout`
+        for the first one, then takes whatever else is already queued.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while n > 0:
+            tickets = self._pop_many(n)
+            if tickets or not block or not self._wait(deadline):
+                return tickets
+        return []
+
+    def _pop_many(self, n: int) -> List[Dict[str, Any]]:
+        # Lock every shard once (always in the same order) and merge their heads
+        shards = list(self._shards.values())
+        wal, logged = self.wal, 0
+        for shard in shards:
+            shard.lock.acquire()
+        try:
+            heads = [(shard.heap[0], i) for i, shard in enumerate(shards) if shard.heap]
+            heapq.heapify(heads)
+            popped = []
+            while heads and len(popped) < n:
+                _, i = heads[0]
+                heap = shards[i].heap
+                entry = heapq.heappop(heap)
+                if self._is_live(entry):
+                    popped.append(entry)
+                if heap:
+                    heapq.heapreplace(heads, (heap[0], i))
+                else:
+                    heapq.heappop(heads)
+            if wal is not None and popped:
+                logged = wal.append_many(("pop", entry[2]) for entry in popped)
+        finally:
+            for shard in shards:
+                shard.lock.release()
+        if logged:
+            wal.commit(logged)
+        return [entry[3] for entry in popped]
+
+    def clear(self):
+        wal, logged = self.wal, 0
+        for key, shard in list(self._shards.items()):
+            with shard.lock:
+                for entry in shard.heap:
+                    self._is_live(entry)
+                shard.heap.clear()
+                if wal is not None:
+                    logged = wal.append("clear", key)
+        if logged:
+            wal.commit(logged)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {"depth": len(self), "scheduling": self.scheduling,
+                 "shards": {key: len(shard.heap) for key, shard in self._shards.items()}}
+        if self.scheduling == "sla":
+            heads = [shard.heap[0][0] for shard in list(self._shards.values()) if shard.heap]
+            # Seconds until the earliest deadline (negative once breached)
+            stats["next_deadline_in"] = round(min(heads) - time.time(), 1) if heads else None
+        if self.wal is not None:
+            stats["wal"] = self.wal.get_stats()
+        return stats
 
     def __len__(self):
-        return len(self.queue)
+        return len(self._live)
+
+QUEUE_BACKENDS = ("memory", "redis")
+
+def create_queue_manager(backend: Optional[str] = None, scheduling: Optional[str] = None):
+    """
+    MVR_QUEUE_BACKEND=memory (default, per process; durable with WAL_DIR) or redis
+    (MVR_QUEUE_REDIS_URL, else REDIS_URL). MVR_QUEUE_SCHEDULER=priority (default) or sla.
+    """
+    backend = backend or os.getenv("MVR_QUEUE_BACKEND", "memory")
+    scheduling = scheduling or os.getenv("MVR_QUEUE_SCHEDULER", "priority")
+    if backend not in QUEUE_BACKENDS:
+        raise ValueError(f"Unknown queue backend '{backend}', expected one of {QUEUE_BACKENDS}")
+    if backend == "memory":
+        queue = TicketQueueManager(scheduling)
+        # WAL_DIR set: the queue is logged and replayed on startup
+        wal = open_wal("queue")
+        if wal is not None:
+            queue.attach_wal(wal)
+        return queue
+
+    import redis
+    from .redis_queue import RedisTicketQueueManager
+    url = os.getenv("MVR_QUEUE_REDIS_URL") or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    return RedisTicketQueueManager(redis.Redis.from_url(url), key=os.getenv("MVR_QUEUE_KEY", "mvr:queue"),
+                                   scheduling=scheduling)
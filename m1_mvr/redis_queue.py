@@ -0,0 +1,94 @@
+import json
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from .queue_manager import SCHEDULERS, Urgency, priority_score
+from .sla import SLAPolicy
+
+class RedisTicketQueueManager:
+    """
+    Priority queue on a Redis sorted set, shared by every API replica and durable
+    across restarts. Same interface as TicketQueueManager.
+    - Score is 1 - urgency score, so ZPOPMIN returns the most urgent ticket; with
+      scheduling="sla" it is the SLA deadline (epoch seconds), earliest first.
+    - The member is "<16-digit sequence>:<ticket JSON>". Equal scores are ordered by
+      member, i.e. by sequence (FIFO), and the ticket travels inside the member, so a
+      pop is a single atomic ZPOPMIN / BZPOPMIN with no second lookup.
+    - Bulk enqueue reserves a block of sequence numbers with one INCRBY and adds the
+      batch in pipelined ZADD chunks.
+    """
+    # Blocking network calls: async callers should run these in a thread
+    blocking_io = True
+
+    def __init__(self, redis_client, key: str = "mvr:queue", chunk_size: int = 1000,
+                 scheduling: str = "priority", sla_policy: Optional[SLAPolicy] = None):
+        if scheduling not in SCHEDULERS:
+            raise ValueError(f"Unknown scheduling '{scheduling}', expected one of {SCHEDULERS}")
+        self.redis = redis_client
+        self.key = key
+        self.sequence_key = f"{key}:seq"
+        self.chunk_size = chunk_size
+        self.scheduling = scheduling
+        self.sla_policy = sla_policy or SLAPolicy.from_env()
+
+    def _score(self, urgency: Urgency, data: Dict[str, Any]) -> float:
+        if self.scheduling == "sla":
+            return self.sla_policy.stamp(data, priority_score(urgency))
+        return 1.0 - priority_score(urgency)
+
+    @staticmethod
+    def _member(sequence: int, data: Dict[str, Any]) -> str:
+        return f"{sequence:016d}:{json.dumps(data, separators=(',', ':'))}"
+
+    @staticmethod
+    def _decode(member) -> Dict[str, Any]:
+        if isinstance(member, bytes):
+            member = member.decode("utf-8")
+        return json.loads(member.split(":", 1)[1])
+
+    def add_ticket(self, ticket_id: str, urgency: Urgency, data: Dict[str, Any]):
+        sequence = self.redis.incr(self.sequence_key)
+        score = self._score(urgency, data)
+        self.redis.zadd(self.key, {self._member(sequence, data): score})
+
+    def add_tickets(self, tickets: Iterable[Tuple[str, Urgency, Dict[str, Any]]]):
+        tickets = list(tickets)
+        if not tickets:
+            return
+        first = self.redis.incrby(self.sequence_key, len(tickets)) - len(tickets) + 1
+        pipe = self.redis.pipeline(transaction=False)
+        for start in range(0, len(tickets), self.chunk_size):
+            chunk = tickets[start:start + self.chunk_size]
+            members = {}
+            for i, (_, urgency, data) in enumerate(chunk):
+                score = self._score(urgency, data)  # Stamps data first under SLA scheduling
+                members[self._member(first + start + i, data)] = score
+            pipe.zadd(self.key, members)
+        pipe.execute()
+
+    def get_next_ticket(self, block: bool = False, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        if block:
+            # BZPOPMIN treats 0 as "wait forever"
+            popped = self.redis.bzpopmin(self.key, timeout=timeout or 0)
+            return self._decode(popped[1]) if popped else None
+        popped = self.redis.zpopmin(self.key, 1)
+        return self._decode(popped[0][0]) if popped else None
+
+    def pop_n(self, n: int, block: bool = False, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        if n <= 0:
+            return []
+        popped = [self._decode(member) for member, _ in self.redis.zpopmin(self.key, n)]
+        if popped or not block:
+            return popped
+        first = self.get_next_ticket(block=True, timeout=timeout)
+        if first is None:
+            return []
+        return [first] + self.pop_n(n - 1)
+
+    def clear(self):
+        self.redis.delete(self.key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"depth": len(self), "backend": "redis", "key": self.key, "scheduling": self.scheduling}
+
+    def __len__(self):
+        return self.redis.zcard(self.key)
@@ -1,15 +1,28 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, status
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from typing import List
+import os
 import uuid
 
-from .ml_baseline import BaselineClassifier, check_urgency
-from .queue_manager import TicketQueueManager
+from core.executor import get_inference_executor
+from .ml_baseline import classify_baseline, classify_baseline_many, check_urgency, check_urgency_many
+from .queue_manager import create_queue_manager
 
 router = APIRouter(prefix="/mvr", tags=["Milestone 1 - MVR"])
 
-# Initialize ML Model and Queue
-classifier = BaselineClassifier()
-queue_manager = TicketQueueManager()
+# Initialize Queue (the ML model is loaded on first use via the model registry).
+# MVR_QUEUE_BACKEND=redis shares it between uvicorn workers / replicas.
+queue_manager = create_queue_manager()
+
+async def queue_call(func, *args):
+    """The Redis backend does network I/O and a WAL with fsync=always waits on the disk, so keep them off the event loop."""
+    if queue_manager.blocking_io:
+        return await run_in_threadpool(func, *args)
+    return func(*args)
+
+# Upper bound on tickets per batch request, to keep a single request's latency bounded
+MAX_BATCH_SIZE = int(os.getenv("MVR_MAX_BATCH_SIZE", "10000"))
 
 class TicketRequest(BaseModel):
     text: str
@@ -21,14 +34,21 @@ class TicketResponse(BaseModel):
     urgency: bool
     status: str
 
+class BatchTicketRequest(BaseModel):
+    tickets: List[TicketRequest]
+
+class BatchTicketResponse(BaseModel):
+    count: int
+    tickets: List[TicketResponse]
+
 @router.post("/ticket", response_model=TicketResponse)
 async def process_ticket(request: TicketRequest):
     """
-    Synchronous baseline ticket processing endpoint.
+    Baseline ticket processing endpoint.
     Categorizes the ticket, evaluates urgency, and pushes to a priority queue.
     """
-    # 1. Classification
-    category = classifier.predict_category(request.text)
+    # 1. Classification (sklearn holds the GIL, so it goes to the process pool when one is configured)
+    category = await get_inference_executor().run(classify_baseline, request.text, pool="process")
     
     # 2. Urgency detection
     urgency = check_urgency(request.text)
@@ -44,7 +64,7 @@ async def process_ticket(request: TicketRequest):
         "category": category,
         "urgency": urgency
     }
-    queue_manager.add_ticket(ticket_id, urgency, ticket_data)
+    await queue_call(queue_manager.add_ticket, ticket_id, urgency, ticket_data)
     
     return TicketResponse(
         ticket_id=ticket_id,
@@ -53,12 +73,65 @@ async def process_ticket(request: TicketRequest):
         status="queued"
     )
 
+@router.post("/tickets:batch", response_model=BatchTicketResponse)
+async def process_ticket_batch(request: BatchTicketRequest):
+    """
+    Batch ticket processing endpoint for backfills (e.g. importing an email backlog).
+    Classifies the whole batch in one vectorized call, evaluates urgency over the
+    batch, and bulk-inserts into the priority queue.
+    """
+    if len(request.tickets) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch of {len(request.tickets)} tickets exceeds the limit of {MAX_BATCH_SIZE}."
+        )
+
+    texts = [ticket.text for ticket in request.tickets]
+
+    # 1. Classification (single sparse-matrix transform + predict)
+    categories = await get_inference_executor().run(classify_baseline_many, texts, pool="process")
+
+    # 2. Urgency detection
+    urgencies = check_urgency_many(texts)
+
+    # 3. Bulk queue insertion
+    responses = []
+    queue_entries = []
+    for ticket, category, urgency in zip(request.tickets, categories, urgencies):
+        ticket_id = str(uuid.uuid4())
+        queue_entries.append((ticket_id, urgency, {
+            "ticket_id": ticket_id,
+            "user_id": ticket.user_id,
+            "text": ticket.text,
+            "category": category,
+            "urgency": urgency
+        }))
+        responses.append(TicketResponse(
+            ticket_id=ticket_id,
+            category=category,
+            urgency=urgency,
+            status="queued"
+        ))
+    await queue_call(queue_manager.add_tickets, queue_entries)
+
+    return BatchTicketResponse(count=len(responses), tickets=responses)
+
 @router.get("/queue/next")
-async def get_next_ticket():
+async def get_next_ticket(wait: float = Query(0, ge=0, le=30)):
     """
     Helper endpoint to pop the most urgent ticket from the queue.
+    With `wait`, long-polls up to that many seconds for a ticket to arrive.
     """
-    ticket = queue_manager.get_next_ticket()
+    if wait > 0:
+        # Blocking pop runs in the threadpool so it doesn't stall the event loop
+        ticket = await run_in_threadpool(queue_manager.get_next_ticket, True, wait)
+    else:
+        ticket = await queue_call(queue_manager.get_next_ticket)
     if not ticket:
         return {"message": "Queue is empty"}
     return ticket
+
+@router.get("/queue/stats")
+async def get_queue_stats():
+    """Queue depth (per category shard for the in-memory backend)."""
+    return await queue_call(queue_manager.get_stats)
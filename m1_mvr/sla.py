@@ -0,0 +1,45 @@
+import os
+import time
+from typing import Any, Dict, Optional
+
+# Resolution targets per category, in seconds, for a ticket with urgency score 0
+DEFAULT_SLA_SECONDS = {"Technical": 4 * 3600, "Billing": 8 * 3600, "Legal": 24 * 3600, "default": 8 * 3600}
+
+class SLAPolicy:
+    """
+    Deadline for a ticket from its category and urgency score: the category's SLA,
+    scaled down linearly to `urgent_fraction` of it at urgency 1.0.
+
+    Scheduling earliest deadline first is aging: every queued ticket's effective
+    priority (now - deadline) rises at the same rate, so tickets never reorder among
+    themselves and the heap key can stay static. A normal ticket's deadline eventually
+    falls before those of newly arriving urgent tickets, so nothing starves.
+    """
+    def __init__(self, sla_seconds: Optional[Dict[str, float]] = None, urgent_fraction: float = 0.1):
+        self.sla_seconds = {**DEFAULT_SLA_SECONDS, **(sla_seconds or {})}
+        self.urgent_fraction = urgent_fraction
+
+    @classmethod
+    def from_env(cls) -> "SLAPolicy":
+        """MVR_SLA_SECONDS="Technical=14400,Billing=28800,..." and MVR_SLA_URGENT_FRACTION (0.1)."""
+        overrides = {}
+        for item in os.getenv("MVR_SLA_SECONDS", "").split(","):
+            if "=" in item:
+                category, seconds = item.split("=", 1)
+                overrides[category.strip()] = float(seconds)
+        return cls(overrides, float(os.getenv("MVR_SLA_URGENT_FRACTION", "0.1")))
+
+    def sla(self, category: str, priority: float) -> float:
+        base = self.sla_seconds.get(category, self.sla_seconds["default"])
+        return base * (1.0 - (1.0 - self.urgent_fraction) * priority)
+
+    def stamp(self, data: Dict[str, Any], priority: float) -> float:
+        """
+        Set data["sla_deadline"] (epoch seconds) and return it. The deadline counts from
+        data["enqueued_at"], which is stamped with the current time if missing, so a
+        replayed or re-scored ticket keeps its original clock.
+        """
+        enqueued_at = data.setdefault("enqueued_at", time.time())
+        deadline = enqueued_at + self.sla(data.get("category", "default"), priority)
+        data["sla_deadline"] = deadline
+        return deadline
@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .webhook import trigger_webhook
+
+PENDING_KEY = os.getenv("CONSUMER_PENDING_KEY", "advanced:pending")
+
+def scheduled_key(pending_key: str) -> str:
+    """Set while a drain task is queued or running for `pending_key`."""
+    return f"{pending_key}:scheduled"
+
+def encode_ticket(ticket_id: str, text: str, user_id: str) -> str:
+    return json.dumps({"ticket_id": ticket_id, "text": text, "user_id": user_id}, separators=(",", ":"))
+
+class BatchConsumer:
+    """
+    Processes tickets from a Redis list in batches instead of one Celery message each.
+    - pull(): up to `max_batch` pending tickets, waiting at most `max_wait_ms` for the
+      batch to fill (LPOP with a count, BLPOP to wait).
+    - process(): one `classify_fn` call over the whole batch, every result written with a
+      single pipeline (SET "<result_prefix><ticket_id>" with `result_ttl`), and the
+      webhooks of urgent tickets fired concurrently.
+    Drains are chained through the `scheduled` flag key (see handoff()), so producers
+    only enqueue a Celery message when no drain is already queued. Tickets that were
+    popped but not stored (an error in pull, classify_fn or the result pipeline) are
+    pushed back to the head of the list in their original order.
+    """
+    def __init__(self, redis_client,
+                 classify_fn: Callable[[List[str]], List[Dict[str, Any]]],
+                 max_batch: int = 32,
+                 max_wait_ms: float = 50,
+                 pending_key: str = PENDING_KEY,
+                 result_prefix: str = "advanced:result:",
+                 result_ttl: int = 86400,
+                 webhook_fn: Callable[[str, float, str], Awaitable] = trigger_webhook,
+                 urgency_threshold: float = 0.8):
+        self.redis = redis_client
+        self.classify_fn = classify_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.pending_key = pending_key
+        self.scheduled_key = scheduled_key(pending_key)
+        self.result_prefix = result_prefix
+        self.result_ttl = result_ttl
+        self.webhook_fn = webhook_fn
+        self.urgency_threshold = urgency_threshold
+
+    def enqueue(self, ticket_id: str, text: str, user_id: str):
+        """Sync producer side (the API uses its async client with the same keys)."""
+        self.redis.rpush(self.pending_key, encode_ticket(ticket_id, text, user_id))
+
+    def pull(self) -> List[Dict[str, Any]]:
+        """Up to max_batch tickets; [] if none arrived within max_wait."""
+        items = self.redis.lpop(self.pending_key, self.max_batch) or []
+        deadline = time.monotonic() + self.max_wait
+        while len(items) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                popped = self.redis.blpop([self.pending_key], timeout=remaining)
+                if popped is None:
+                    break
+                items.append(popped[1])
+                items.extend(self.redis.lpop(self.pending_key, self.max_batch - len(items)) or [])
+            except Exception:
+                self.requeue(items)
+                raise
+        return [json.loads(item) for item in items]
+
+    def requeue(self, items: List[str]):
+        """Put popped items back at the head of the list, in their original order."""
+        if items:
+            self.redis.lpush(self.pending_key, *reversed(items))
+
+    def process(self, tickets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not tickets:
+            return []
+        try:
+            analyses = self.classify_fn([t["text"] for t in tickets])
+            if len(analyses) != len(tickets):
+                raise RuntimeError(f"classify_fn returned {len(analyses)} results for {len(tickets)} tickets")
+            results = [
+                {
+                    "ticket_id": ticket["ticket_id"],
+                    "user_id": ticket["user_id"],
+                    "category": analysis["category"],
+                    "urgency_score": analysis["urgency_score"],
+                    "status": "processed"
+                }
+                for ticket, analysis in zip(tickets, analyses)
+            ]
+
+            pipe = self.redis.pipeline(transaction=False)
+            for result in results:
+                pipe.set(f"{self.result_prefix}{result['ticket_id']}", json.dumps(result), ex=self.result_ttl)
+            pipe.execute()
+        except Exception:
+            # Nothing was stored for this batch: give it back instead of dropping it
+            self.requeue([encode_ticket(t["ticket_id"], t["text"], t["user_id"]) for t in tickets])
+            raise
+
+        urgent = [r for r in results if r["urgency_score"] > self.urgency_threshold]
+        if urgent:
+            print(f"{len(urgent)} of {len(results)} tickets have high urgency. Triggering webhooks...")
+            asyncio.run(self._fire_webhooks(urgent))
+        return results
+
+    async def _fire_webhooks(self, results: List[Dict[str, Any]]):
+        await asyncio.gather(*(self.webhook_fn(r["ticket_id"], r["urgency_score"], r["category"]) for r in results))
+
+    def handoff(self, schedule: Callable[[], Any]) -> bool:
+        """
+        Clear the scheduled flag, then `schedule()` another drain if tickets are still
+        pending. Called once the batch is pulled, so the next drain overlaps with this
+        batch's inference on another worker. A producer pushes before setting the flag and
+        the flag is cleared before checking the list, so a ticket is never left without a
+        drain. Returns whether one was scheduled.
+        """
+        self.redis.delete(self.scheduled_key)
+        if self.redis.llen(self.pending_key) and self.redis.set(self.scheduled_key, 1, nx=True, ex=60):
+            schedule()
+            return True
+        return False
+
+    def drain(self, schedule: Optional[Callable[[], Any]] = None) -> List[Dict[str, Any]]:
+        """Pull one batch, hand off to the next drain, process the batch."""
+        try:
+            tickets = self.pull()
+        finally:
+            # Even if the pull failed: a flag left set would stop producers scheduling drains
+            if schedule is not None:
+                self.handoff(schedule)
+        try:
+            return self.process(tickets)
+        except Exception:
+            # The batch went back onto the list: make sure a drain picks it up
+            if schedule is not None:
+                self.handoff(schedule)
+            raise
+
+# Global instance (per worker process)
+_batch_consumer = None
+
+def get_batch_consumer():
+    """CONSUMER_MAX_BATCH (32), CONSUMER_MAX_WAIT_MS (50), CONSUMER_RESULT_TTL_SECONDS (86400)."""
+    global _batch_consumer
+    if _batch_consumer is None:
+        import redis
+        from .ml_transformers import get_classifier
+        _batch_consumer = BatchConsumer(
+            redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")),
+            lambda texts: get_classifier().analyze_batch(texts),
+            max_batch=int(os.getenv("CONSUMER_MAX_BATCH", "32")),
+            max_wait_ms=float(os.getenv("CONSUMER_MAX_WAIT_MS", "50")),
+            result_ttl=int(os.getenv("CONSUMER_RESULT_TTL_SECONDS", "86400")),
+        )
+    return _batch_consumer
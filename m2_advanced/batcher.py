@@ -0,0 +1,190 @@
+import os
+import time
+import queue
+import bisect
+import asyncio
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .ml_transformers import get_classifier
+from .features import as_features
+from .preprocess import count_tokens, token_budget
+
+class MicroBatcher:
+    """
+    Dynamic micro-batching in front of a batch inference function.
+    Callers submit single items from any thread (API executor threads, Celery
+    tasks) or from async code; a background thread collects up to
+    `max_batch_size` items, or whatever arrived within `max_wait_ms` of the
+    first one, runs one batched call, and fans the results back out.
+
+    With a `length_fn` (e.g. token count) and `length_buckets` boundaries, a batch only
+    holds items from the length bucket of the oldest waiting item, so one pasted stack
+    trace doesn't pad a batch of one-liners. Items from other buckets wait for their own
+    batch (at most max_wait after they arrived, like everything else).
+    """
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 16,
+                 max_wait_ms: float = 10.0,
+                 length_fn: Optional[Callable[[Any], int]] = None,
+                 length_buckets: Sequence[int] = ()):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.length_fn = length_fn
+        self.length_buckets = sorted(length_buckets)
+
+        # Items are (payload, future, enqueue_time, length)
+        self._queue: "queue.Queue" = queue.Queue()
+        # Items taken off the queue but left for a later batch (other length buckets)
+        self._pending: List[tuple] = []
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        # Stats for tuning N/T
+        self.batch_size_histogram: Counter = Counter()
+        self.queue_wait_ms = deque(maxlen=1000)  # Recent samples
+        self.batch_latency_ms = deque(maxlen=1000)
+        self.items_processed = 0
+        self.tokens_processed = 0
+        self.recent_token_batches = deque(maxlen=1000)  # (tokens, padded tokens, seconds)
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                    self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        """Queue one item; the returned future resolves with its result."""
+        self._ensure_started()
+        future = Future()
+        length = self.length_fn(item) if self.length_fn else 0
+        self._queue.put((item, future, time.monotonic(), length))
+        return future
+
+    def analyze(self, item: Any) -> Any:
+        """Blocking helper for sync callers (e.g. Celery tasks)."""
+        return self.submit(item).result()
+
+    async def analyze_async(self, item: Any) -> Any:
+        """Awaitable helper for async callers; doesn't block the event loop."""
+        return await asyncio.wrap_future(self.submit(item))
+
+    def _bucket(self, length: int) -> int:
+        return bisect.bisect_left(self.length_buckets, length)
+
+    def _collect_batch(self) -> List[tuple]:
+        """
+        Block for the first item, then gather more until the batch is full or T expires.
+        Only items in the oldest item's length bucket join the batch.
+        """
+        if not self._pending:
+            self._pending.append(self._queue.get())
+        bucket = self._bucket(self._pending[0][3])
+        deadline = self._pending[0][2] + self.max_wait
+        batch, rest = [], []
+        for entry in self._pending:
+            (batch if self._bucket(entry[3]) == bucket and len(batch) < self.max_batch_size else rest).append(entry)
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    # Still take anything that's already waiting
+                    entry = self._queue.get_nowait()
+                else:
+                    entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            (batch if self._bucket(entry[3]) == bucket else rest).append(entry)
+        self._pending = rest
+        return batch
+
+    def _run(self):
+        while True:
+            # Drop items whose caller gave up (e.g. a cancelled await)
+            batch = [entry for entry in self._collect_batch() if entry[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            start_time = time.monotonic()
+            for _, _, enqueued_at, _ in batch:
+                self.queue_wait_ms.append((start_time - enqueued_at) * 1000)
+
+            try:
+                results = self.batch_fn([item for item, _, _, _ in batch])
+                if len(results) != len(batch):
+                    # zip() would leave the extra callers waiting forever
+                    raise RuntimeError(f"Batch function returned {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                for _, future, _, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            elapsed = time.monotonic() - start_time
+            self.batch_latency_ms.append(elapsed * 1000)
+            self.batch_size_histogram[len(batch)] += 1
+            self.items_processed += len(batch)
+            if self.length_fn:
+                lengths = [length for _, _, _, length in batch]
+                self.tokens_processed += sum(lengths)
+                # Padded batches cost roughly len(batch) x the longest item
+                self.recent_token_batches.append((sum(lengths), len(batch) * max(lengths), elapsed))
+            for (_, future, _, _), result in zip(batch, results):
+                future.set_result(result)
+
+    @staticmethod
+    def _percentiles(samples) -> Dict[str, float]:
+        if not samples:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+        ordered = sorted(samples)
+        pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+        return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        batches = sum(self.batch_size_histogram.values())
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": batches,
+            "items": self.items_processed,
+            "mean_batch_size": round(self.items_processed / batches, 2) if batches else 0.0,
+            "batch_size_histogram": {str(size): count for size, count in sorted(self.batch_size_histogram.items())},
+            "queue_wait_ms": self._percentiles(self.queue_wait_ms),
+            "batch_latency_ms": self._percentiles(self.batch_latency_ms),
+            "queue_depth": self._queue.qsize() + len(self._pending),
+            **self._token_stats()
+        }
+
+    def _token_stats(self) -> Dict[str, Any]:
+        if not self.length_fn:
+            return {}
+        recent = list(self.recent_token_batches)
+        tokens = sum(t for t, _, _ in recent)
+        padded = sum(p for _, p, _ in recent)
+        seconds = sum(s for _, _, s in recent)
+        return {
+            "length_buckets": self.length_buckets,
+            "tokens_processed": self.tokens_processed,
+            "tokens_per_second": round(tokens / seconds, 1) if seconds else 0.0,
+            "padding_efficiency": round(tokens / padded, 3) if padded else 1.0
+        }
+
+# Global instance
+_batcher = None
+
+def get_batcher():
+    global _batcher
+    if _batcher is None:
+        _batcher = MicroBatcher(
+            # Items are ticket texts or TicketFeatures carrying a precomputed embedding
+            lambda items: get_classifier().analyze_features([as_features(item) for item in items]),
+            max_batch_size=int(os.getenv("MICROBATCH_MAX_SIZE", "16")),
+            max_wait_ms=float(os.getenv("MICROBATCH_MAX_WAIT_MS", "10")),
+            # Model inputs are truncated to the token budget, so that caps the length
+            length_fn=lambda item: min(count_tokens(as_features(item).text), token_budget()),
+            length_buckets=[int(b) for b in os.getenv("MICROBATCH_LENGTH_BUCKETS", "32,64,128").split(",") if b]
+        )
+    return _batcher
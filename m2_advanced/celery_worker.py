@@ -1,7 +1,10 @@
 import os
 import asyncio
 from celery import Celery
-from .ml_transformers import get_classifier
+from celery.signals import worker_process_init
+from core.model_registry import get_model_registry
+from .batcher import get_batcher
+from .batch_consumer import get_batch_consumer
 from .webhook import trigger_webhook
 
 # Configure Redis as the broker and backend
@@ -13,9 +16,15 @@ celery_app = Celery(
     backend=REDIS_URL
 )
 
-# Load the ML model pipeline once when the worker starts
-# (We assume it will be lazy-loaded on the first task, which is fine for this hackathon)
-classifier = get_classifier()
+# The ML model pipeline is lazy-loaded on the first task (or warmed up when the
+# worker process starts, see warm_up_worker below), so importing this module from
+# the API process to call `.delay()` never loads the transformer models.
+
+@worker_process_init.connect
+def warm_up_worker(**kwargs):
+    """Start loading the classifier in the background as each worker process boots."""
+    # Loading in a thread keeps us under Celery's process-init timeout
+    get_model_registry().warm_up(["advanced"])
 
 @celery_app.task(name="process_ticket_task")
 def process_ticket_task(ticket_id: str, text: str, user_id: str):
@@ -25,7 +34,8 @@ def process_ticket_task(ticket_id: str, text: str, user_id: str):
     print(f"Processing ticket {ticket_id} for user {user_id}...")
     
     # 1. Classification & Urgency Model Inference
-    result = classifier.analyze_ticket(text)
+    # Goes through the micro-batcher so that concurrent tasks (threads/gevent pool) share a batch
+    result = get_batcher().analyze(text)
     
     category = result["category"]
     urgency_score = result["urgency_score"]
@@ -44,3 +54,14 @@ def process_ticket_task(ticket_id: str, text: str, user_id: str):
         "urgency_score": urgency_score,
         "status": "processed"
     }
+
+@celery_app.task(name="process_ticket_batch_task")
+def process_ticket_batch_task():
+    """
+    Batched consumer (TICKET_CONSUMER=batch): the API pushes tickets onto a Redis list
+    and this task drains up to CONSUMER_MAX_BATCH of them per message, classifying them
+    in one call. Before classifying it queues the next drain if tickets are still waiting.
+    """
+    results = get_batch_consumer().drain(schedule=process_ticket_batch_task.delay)
+    print(f"Finished processing a batch of {len(results)} tickets")
+    return {"processed": len(results)}
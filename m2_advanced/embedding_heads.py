@@ -0,0 +1,163 @@
+import os
+import sys
+import json
+import numpy as np
+from typing import Callable, List, Optional, Sequence
+from core.model_registry import get_model_registry
+from .embeddings import encode_texts
+from .label_embedding import DEFAULT_EXEMPLARS, DEFAULT_LABEL_DESCRIPTIONS
+
+# Seed examples for the urgency head, used when no trained heads file is configured
+URGENT_EXAMPLES = [
+    "Production is down and all our customers are affected, fix this ASAP!",
+    "URGENT: the payment system is broken and we are losing money.",
+    "Critical outage, nobody can log in to the dashboard.",
+    "Emergency: our data was deleted and the API is returning 500 errors.",
+    "This is blocking our launch today, we need help immediately.",
+]
+NORMAL_EXAMPLES = [
+    "Could you send me a copy of last month's invoice when you get a chance?",
+    "How do I change the email address on my account?",
+    "I have a question about the terms of service.",
+    "Is there a way to export my reports to CSV?",
+    "Thanks for the help yesterday, everything works now.",
+]
+
+class LinearHead:
+    """
+    Small softmax-regression head trained on top of frozen sentence embeddings.
+    Inference is one (N x dim) @ (dim x labels) product.
+    """
+    def __init__(self, labels: Sequence[str], dim: int = 384):
+        self.labels = list(labels)
+        self.weights = np.zeros((dim, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+
+    def fit(self, embeddings: np.ndarray, targets: Sequence[str],
+            epochs: int = 300, learning_rate: float = 1.0, l2: float = 1e-3) -> "LinearHead":
+        """Full-batch gradient descent on cross-entropy (the training sets here are small)."""
+        X = np.asarray(embeddings, dtype=np.float32)
+        y = np.zeros((len(targets), len(self.labels)), dtype=np.float32)
+        y[np.arange(len(targets)), [self.labels.index(t) for t in targets]] = 1.0
+
+        self.weights = np.zeros((X.shape[1], len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+        for _ in range(epochs):
+            grad = (self.predict_proba(X) - y) / len(X)
+            self.weights -= learning_rate * (X.T @ grad + l2 * self.weights)
+            self.bias -= learning_rate * grad.sum(axis=0)
+        return self
+
+    def predict_proba(self, embeddings: np.ndarray) -> np.ndarray:
+        logits = np.atleast_2d(embeddings) @ self.weights + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def predict(self, embeddings: np.ndarray) -> List[str]:
+        return [self.labels[i] for i in self.predict_proba(embeddings).argmax(axis=1)]
+
+    def state(self, prefix: str) -> dict:
+        return {f"{prefix}_weights": self.weights, f"{prefix}_bias": self.bias,
+                f"{prefix}_labels": np.array(self.labels)}
+
+    @classmethod
+    def from_state(cls, state, prefix: str) -> "LinearHead":
+        head = cls([str(label) for label in state[f"{prefix}_labels"]])
+        head.weights = state[f"{prefix}_weights"].astype(np.float32)
+        head.bias = state[f"{prefix}_bias"].astype(np.float32)
+        return head
+
+class EmbeddingHeads:
+    """
+    Category and urgency heads sharing one ticket embedding.
+    The category head returns zero-shot-shaped results so it is a drop-in for
+    the other classifier modes; the urgency head gives P(urgent) as S in [0, 1].
+    """
+    def __init__(self, category_head: LinearHead, urgency_head: LinearHead):
+        self.category_head = category_head
+        self.urgency_head = urgency_head
+
+    def classify_embeddings(self, embeddings: np.ndarray) -> List[dict]:
+        results = []
+        for row in self.category_head.predict_proba(embeddings):
+            order = np.argsort(-row)
+            results.append({
+                "labels": [self.category_head.labels[i] for i in order],
+                "scores": [float(row[i]) for i in order]
+            })
+        return results
+
+    def urgency_scores(self, embeddings: np.ndarray) -> List[float]:
+        urgent_index = self.urgency_head.labels.index("urgent")
+        return [float(p) for p in self.urgency_head.predict_proba(embeddings)[:, urgent_index]]
+
+    def save(self, path: str):
+        np.savez(path, **self.category_head.state("category"), **self.urgency_head.state("urgency"))
+
+    @classmethod
+    def load(cls, path: str) -> "EmbeddingHeads":
+        state = np.load(path)
+        return cls(LinearHead.from_state(state, "category"), LinearHead.from_state(state, "urgency"))
+
+    @classmethod
+    def train(cls, encode: Callable[[List[str]], np.ndarray],
+              texts: List[str], categories: List[str], urgent: List[bool]) -> "EmbeddingHeads":
+        """Train both heads from one embedding pass over the labelled tickets."""
+        embeddings = encode(texts)
+        dim = embeddings.shape[1]
+        category_head = LinearHead(sorted(set(categories)), dim).fit(embeddings, categories)
+        urgency_head = LinearHead(["normal", "urgent"], dim).fit(
+            embeddings, ["urgent" if u else "normal" for u in urgent]
+        )
+        return cls(category_head, urgency_head)
+
+def train_seed_heads(encode: Callable[[List[str]], np.ndarray]) -> EmbeddingHeads:
+    """
+    Bootstrap heads used when no trained heads file is configured: the category
+    head learns from the label descriptions and exemplars, the urgency head from
+    the seed lists (category examples count as normal urgency).
+    """
+    category_texts, categories = [], []
+    for label, description in DEFAULT_LABEL_DESCRIPTIONS.items():
+        for text in [description] + DEFAULT_EXEMPLARS.get(label, []):
+            category_texts.append(text)
+            categories.append(label)
+    urgency_texts = URGENT_EXAMPLES + NORMAL_EXAMPLES
+
+    # One encoder pass over everything
+    embeddings = encode(category_texts + urgency_texts)
+    category_embeddings = embeddings[:len(category_texts)]
+
+    category_head = LinearHead(list(DEFAULT_LABEL_DESCRIPTIONS), embeddings.shape[1]).fit(
+        category_embeddings, categories
+    )
+    urgency_targets = ["normal"] * len(category_texts) + \
+        ["urgent"] * len(URGENT_EXAMPLES) + ["normal"] * len(NORMAL_EXAMPLES)
+    urgency_head = LinearHead(["normal", "urgent"], embeddings.shape[1]).fit(embeddings, urgency_targets)
+    return EmbeddingHeads(category_head, urgency_head)
+
+def _load_embedding_heads(path: Optional[str] = None):
+    path = path or os.getenv("EMBEDDING_HEADS_PATH")
+    if path and os.path.exists(path):
+        return EmbeddingHeads.load(path)
+    return train_seed_heads(encode_texts)
+
+get_model_registry().register("embedding_heads", _load_embedding_heads)
+
+if __name__ == "__main__":
+    # Train heads from a labelled JSONL file of {"text", "label", "urgent"} records:
+    #   python -m m2_advanced.embedding_heads train tickets.jsonl heads.npz
+    if len(sys.argv) != 4 or sys.argv[1] != "train":
+        print("usage: python -m m2_advanced.embedding_heads train <tickets.jsonl> <heads.npz>")
+        sys.exit(1)
+    with open(sys.argv[2]) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    heads = EmbeddingHeads.train(
+        encode_texts,
+        [r["text"] for r in records],
+        [r["label"] for r in records],
+        [bool(r.get("urgent", False)) for r in records]
+    )
+    heads.save(sys.argv[3])
+    print(f"Trained heads on {len(records)} tickets -> {sys.argv[3]}")
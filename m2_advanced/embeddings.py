@@ -0,0 +1,30 @@
+import numpy as np
+from typing import List
+from core.model_registry import get_model_registry
+from core.cache import cache_enabled, get_embedding_cache
+from .inference_backends import backend_for, load_sentence_transformer
+from .preprocess import preprocess_texts
+
+def _load_embedder():
+    """Load the sentence embedding model (sentence-transformers is imported on first load)."""
+    return load_sentence_transformer('all-MiniLM-L6-v2', backend_for("embedder"))  # Lightweight model
+
+# Shared by semantic deduplication, the label-embedding classifier and the embedding heads
+get_model_registry().register("embedder", _load_embedder)
+
+def get_embedder():
+    return get_model_registry().get("embedder")
+
+def _encode(texts: List[str]) -> np.ndarray:
+    embeddings = get_embedder().encode(preprocess_texts(texts), normalize_embeddings=True)
+    return np.asarray(embeddings, dtype=np.float32)
+
+def encode_texts(texts: List[str]) -> np.ndarray:
+    """
+    One batched MiniLM pass; returns L2-normalized float32 rows (N x 384).
+    Texts already in the embedding cache (e.g. repeats during a storm) are not re-encoded.
+    """
+    texts = list(texts)
+    if not cache_enabled():
+        return _encode(texts)
+    return np.stack(get_embedding_cache().get_or_compute(texts, _encode))
@@ -0,0 +1,33 @@
+import numpy as np
+from typing import List, Optional, Union
+from .embeddings import encode_texts
+
+class TicketFeatures:
+    """
+    Per-request feature context. The ticket is tokenized and embedded at most
+    once; dedup, the category head and the urgency head all read the cached
+    embedding instead of running their own transformer forward pass.
+    """
+    __slots__ = ("text", "embedding")
+
+    def __init__(self, text: str, embedding: Optional[np.ndarray] = None):
+        self.text = text
+        self.embedding = embedding
+
+def as_features(item: Union[str, TicketFeatures]) -> TicketFeatures:
+    return item if isinstance(item, TicketFeatures) else TicketFeatures(item)
+
+def extract_features(text: str) -> TicketFeatures:
+    """Embed a single ticket once, up front."""
+    return TicketFeatures(text, encode_texts([text])[0])
+
+def ensure_embeddings(features: List[TicketFeatures]) -> np.ndarray:
+    """
+    Fill in missing embeddings with one batched encoder pass and return the
+    (N x dim) embedding matrix for the whole batch.
+    """
+    missing = [f for f in features if f.embedding is None]
+    if missing:
+        for f, embedding in zip(missing, encode_texts([f.text for f in missing])):
+            f.embedding = embedding
+    return np.stack([f.embedding for f in features])
@@ -0,0 +1,69 @@
+import os
+from typing import Optional
+
+# Per-model CPU inference backends:
+# - "fp32": the transformers / sentence-transformers defaults.
+# - "int8": torch dynamic quantization of every nn.Linear (weights int8, activations
+#   quantized on the fly). No export step, typically ~2x faster and ~4x smaller linears.
+# - "onnx": the model exported to ONNX and run with onnxruntime (needs requirements-onnx.txt).
+#   Exported graphs are cached under ONNX_CACHE_DIR so the export only happens once.
+INFERENCE_BACKENDS = ("fp32", "int8", "onnx")
+
+# Model keys, each configurable with INFERENCE_BACKEND_<KEY>
+MODEL_KEYS = ("zero_shot", "sentiment", "embedder")
+
+def backend_for(model_key: str) -> str:
+    """INFERENCE_BACKEND_<MODEL_KEY>, falling back to INFERENCE_BACKEND (default fp32)."""
+    backend = os.getenv(f"INFERENCE_BACKEND_{model_key.upper()}") or os.getenv("INFERENCE_BACKEND", "fp32")
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}' for {model_key}, expected one of {INFERENCE_BACKENDS}")
+    return backend
+
+def _onnx_dir(model_id: str) -> str:
+    cache_dir = os.getenv("ONNX_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ticket-router-onnx"))
+    return os.path.join(cache_dir, model_id.replace("/", "--"))
+
+def _quantize(module):
+    import torch
+    return torch.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+
+def build_pipeline(task: str, model_id: str, backend: Optional[str] = None):
+    """A transformers pipeline for `task` running on the chosen backend."""
+    from transformers import AutoTokenizer, pipeline
+    backend = backend or "fp32"
+
+    if backend == "fp32":
+        return pipeline(task, model=model_id)
+
+    if backend == "int8":
+        pipe = pipeline(task, model=model_id)
+        pipe.model = _quantize(pipe.model)
+        return pipe
+
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError as e:
+        raise ImportError("The onnx backend needs `pip install -r requirements-onnx.txt`") from e
+    export_dir = _onnx_dir(model_id)
+    if os.path.isdir(export_dir):
+        model = ORTModelForSequenceClassification.from_pretrained(export_dir)
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    else:
+        print(f"Exporting {model_id} to ONNX ({export_dir})...")
+        model = ORTModelForSequenceClassification.from_pretrained(model_id, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_id)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+    return pipeline(task, model=model, tokenizer=tokenizer)
+
+def load_sentence_transformer(model_id: str, backend: Optional[str] = None):
+    """A SentenceTransformer running on the chosen backend."""
+    from sentence_transformers import SentenceTransformer
+    backend = backend or "fp32"
+
+    if backend == "fp32":
+        return SentenceTransformer(model_id)
+    if backend == "int8":
+        return _quantize(SentenceTransformer(model_id, device="cpu"))
+    # sentence-transformers >= 3.2 exports and runs the ONNX graph itself
+    return SentenceTransformer(model_id, device="cpu", backend="onnx")
@@ -0,0 +1,110 @@
+import os
+import json
+import numpy as np
+from typing import Callable, Dict, List, Optional
+from core.model_registry import get_model_registry
+from .embeddings import encode_texts
+
+# One descriptive sentence per label; encoded once at startup
+DEFAULT_LABEL_DESCRIPTIONS = {
+    "Billing": "A billing question about invoices, payments, charges, refunds or subscriptions.",
+    "Technical": "A technical problem such as errors, crashes, outages, bugs, login or API failures.",
+    "Legal": "A legal request about contracts, terms of service, privacy, GDPR or compliance.",
+}
+
+# A few exemplar tickets per label sharpen the label prototypes
+DEFAULT_EXEMPLARS = {
+    "Billing": [
+        "I need help with my invoice and billing details.",
+        "My credit card was charged twice.",
+        "Can I change my payment method?",
+    ],
+    "Technical": [
+        "The system keeps crashing when I login.",
+        "I am getting a 500 internal server error.",
+        "The API endpoint is returning timeout errors.",
+    ],
+    "Legal": [
+        "I need a copy of the terms of service.",
+        "We want to discuss the GDPR compliance and privacy policy.",
+        "Our legal team wants to review the contract.",
+    ],
+}
+
+def load_exemplars(path: str) -> Dict[str, List[str]]:
+    """Load exemplar tickets from a JSONL file of {"text": ..., "label": ...} records."""
+    exemplars: Dict[str, List[str]] = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                exemplars.setdefault(record["label"], []).append(record["text"])
+    return exemplars
+
+class LabelEmbeddingClassifier:
+    """
+    Classifies tickets by a single encoder pass plus a dot product.
+    Each label gets a prototype vector: the normalized mean embedding of its
+    description and exemplar tickets, computed once at construction. A ticket
+    is scored against all prototypes with one matrix product, instead of one
+    full NLI forward pass per candidate label as in zero-shot BART.
+    """
+    def __init__(self, encode: Callable[[List[str]], np.ndarray],
+                 label_descriptions: Optional[Dict[str, str]] = None,
+                 exemplars: Optional[Dict[str, List[str]]] = None,
+                 temperature: float = 0.05):
+        self.encode = encode
+        self.temperature = temperature
+        label_descriptions = label_descriptions or DEFAULT_LABEL_DESCRIPTIONS
+        exemplars = DEFAULT_EXEMPLARS if exemplars is None else exemplars
+
+        self.labels = list(label_descriptions)
+        prototypes = []
+        for label in self.labels:
+            texts = [label_descriptions[label]] + list(exemplars.get(label, []))
+            vectors = self._normalize(np.asarray(self.encode(texts), dtype=np.float32))
+            prototypes.append(vectors.mean(axis=0))
+        # (num_labels x dim), rows L2-normalized
+        self.prototypes = self._normalize(np.stack(prototypes))
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def classify_embeddings(self, embeddings: np.ndarray) -> List[dict]:
+        """
+        Score precomputed ticket embeddings (N x dim) against the label prototypes.
+        Returns zero-shot-pipeline-shaped results: {"labels": [...], "scores": [...]}, best first.
+        """
+        embeddings = self._normalize(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+        similarities = embeddings @ self.prototypes.T
+        # Softmax over cosine similarities so scores are comparable to zero-shot probabilities
+        logits = similarities / self.temperature
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+        results = []
+        for row in probabilities:
+            order = np.argsort(-row)
+            results.append({
+                "labels": [self.labels[i] for i in order],
+                "scores": [float(row[i]) for i in order]
+            })
+        return results
+
+    def classify(self, texts: List[str]) -> List[dict]:
+        """Encode a batch of tickets in one pass and classify them."""
+        if not texts:
+            return []
+        return self.classify_embeddings(self.encode(texts))
+
+def _load_label_embedding_classifier():
+    exemplars_path = os.getenv("LABEL_EXEMPLARS_PATH")
+    return LabelEmbeddingClassifier(
+        encode_texts,
+        exemplars=load_exemplars(exemplars_path) if exemplars_path else None
+    )
+
+get_model_registry().register("label_embedding", _load_label_embedding_classifier)
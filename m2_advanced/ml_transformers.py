@@ -1,7 +1,16 @@
 import os
 os.environ["USE_TF"] = "0"
 os.environ["USE_TORCH"] = "1"
-from transformers import pipeline
+from typing import List, Optional
+from core.model_registry import get_model_registry
+from core.cache import cache_enabled, get_cache
+from . import label_embedding, embedding_heads  # Register the embedding-based models
+from .embeddings import encode_texts
+from .inference_backends import backend_for, build_pipeline
+from .preprocess import preprocess_texts
+from .features import TicketFeatures, ensure_embeddings
+
+CLASSIFIER_MODES = ("zero_shot", "label_embedding", "shared_embedding")
 
 class AdvancedClassifier:
     """
@@ -9,37 +18,123 @@ class AdvancedClassifier:
     Since we can't train a deep model during a short hackathon easily without data, 
     we use zero-shot classification for category, and sentiment analysis pipeline 
     as a proxy for the urgency score regression S in [0, 1].
+
+    Category classification has three modes (CLASSIFIER_MODE):
+    - "zero_shot": BART-large-MNLI, one NLI forward pass per candidate label.
+    - "label_embedding": one MiniLM pass plus a dot product against label prototypes.
+    - "shared_embedding": one MiniLM pass feeding trained category and urgency heads,
+      so neither BART nor DistilBERT runs at all.
+    The embedding modes reuse an embedding already computed for the ticket (see TicketFeatures).
     """
-    def __init__(self):
-        # We use a zero-shot classifier for routing our tickets (Billing, Technical, Legal)
-        self.classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+    def __init__(self, mode: Optional[str] = None):
+        self.mode = mode or os.getenv("CLASSIFIER_MODE", "zero_shot")
+        if self.mode not in CLASSIFIER_MODES:
+            raise ValueError(f"Unknown CLASSIFIER_MODE '{self.mode}', expected one of {CLASSIFIER_MODES}")
+
+        self.candidate_labels = ["Billing", "Technical", "Legal"]
+        self.sentiment_analyzer = None
+
+        if self.mode == "shared_embedding":
+            self.classifier = get_model_registry().get("embedding_heads")
+            return
+
+        # Pipelines run on the backend chosen per model (fp32 / int8 / onnx, see inference_backends.py)
+        if self.mode == "zero_shot":
+            # We use a zero-shot classifier for routing our tickets (Billing, Technical, Legal)
+            self.classifier = build_pipeline("zero-shot-classification", "facebook/bart-large-mnli",
+                                             backend_for("zero_shot"))
+        else:
+            # BART is never loaded in this mode
+            self.classifier = get_model_registry().get("label_embedding")
         
         # We use a sentiment analysis pipeline as a proxy for the urgency regression model.
         # "Negative" sentiment implies higher urgency in a support context usually.
-        self.sentiment_analyzer = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
+        self.sentiment_analyzer = build_pipeline("sentiment-analysis", "distilbert-base-uncased-finetuned-sst-2-english",
+                                                 backend_for("sentiment"))
 
-        self.candidate_labels = ["Billing", "Technical", "Legal"]
+    @property
+    def uses_embeddings(self) -> bool:
+        """Whether this mode consumes the shared MiniLM ticket embedding."""
+        return self.mode != "zero_shot"
 
     def analyze_ticket(self, text: str) -> dict:
         """
         Returns a dictionary with category and urgency score S in [0, 1].
         """
+        return self.analyze_features([TicketFeatures(text)])[0]
+
+    def analyze_batch(self, texts: List[str]) -> List[dict]:
+        """
+        Batched version of analyze_ticket: both pipelines run once over the
+        padded batch, which on CPU costs little more than a single ticket.
+        """
+        return self.analyze_features([TicketFeatures(text) for text in texts])
+
+    def analyze_features(self, features: List[TicketFeatures]) -> List[dict]:
+        """
+        Analyze a batch of per-request feature contexts. In the embedding modes,
+        tickets that were already embedded (e.g. for deduplication) are not re-encoded.
+        Results are cached by normalized text, so repeated tickets skip the models entirely.
+        """
+        if not features:
+            return []
+        if not cache_enabled():
+            return self._analyze_uncached(features)
+        by_text = {f.text: f for f in features}
+        results = get_cache(f"analysis:{self.mode}").get_or_compute(
+            [f.text for f in features],
+            lambda texts: self._analyze_uncached([by_text[t] for t in texts])
+        )
+        # Callers may annotate their result; never hand out the cached dict itself
+        return [dict(r) for r in results]
+
+    def _analyze_uncached(self, features: List[TicketFeatures]) -> List[dict]:
+        texts = [f.text for f in features]
+        # The models see each ticket cut to the token budget (head + tail of long stack traces)
+        model_inputs = preprocess_texts(texts)
+
         # 1. Classification
-        clf_result = self.classifier(text, self.candidate_labels)
-        # The first label is the highest scoring one
-        category = clf_result["labels"][0]
-        
+        if self.uses_embeddings:
+            embeddings = ensure_embeddings(features)
+            clf_results = self.classifier.classify_embeddings(embeddings)
+        else:
+            clf_results = self.classify_categories(model_inputs)
+
         # 2. Urgency Regression Score S in [0, 1]
+        if self.mode == "shared_embedding":
+            urgency_scores = self.classifier.urgency_scores(embeddings)
+        else:
+            sent_results = self.sentiment_analyzer(model_inputs, batch_size=len(texts))
+            urgency_scores = [self._sentiment_to_urgency(r) for r in sent_results]
+
+        return [
+            self._build_result(text, clf_result, urgency_score)
+            for text, clf_result, urgency_score in zip(texts, clf_results, urgency_scores)
+        ]
+
+    def classify_categories(self, texts: List[str]) -> List[dict]:
+        """Category scores for a batch, as {"labels": [...], "scores": [...]} best first."""
+        if self.uses_embeddings:
+            return self.classifier.classify_embeddings(encode_texts(texts))
+        clf_results = self.classifier(texts, self.candidate_labels, batch_size=len(texts))
+        # The zero-shot pipeline returns a bare dict for a single input
+        if isinstance(clf_results, dict):
+            clf_results = [clf_results]
+        return clf_results
+
+    @staticmethod
+    def _sentiment_to_urgency(sent_result: dict) -> float:
         # DistilBERT Sentiment returns {"label": "NEGATIVE"/"POSITIVE", "score": 0.99...}
         # If NEGATIVE, we use the score as high urgency. If POSITIVE, we use 1 - score.
-        sent_result = self.sentiment_analyzer(text)[0]
-        
         if sent_result["label"] == "NEGATIVE":
             # high urgency
-            urgency_score = sent_result["score"]
-        else:
-            # low urgency
-            urgency_score = 1.0 - sent_result["score"]
+            return sent_result["score"]
+        # low urgency
+        return 1.0 - sent_result["score"]
+
+    def _build_result(self, text: str, clf_result: dict, urgency_score: float) -> dict:
+        # The first label is the highest scoring one
+        category = clf_result["labels"][0]
 
         # To respect the hackathon constraint, let's bump the score artificially
         # if there are severe keywords, just in case the sentiment model is too polite.
@@ -52,11 +147,8 @@ class AdvancedClassifier:
             "urgency_score": float(urgency_score) # Ensure it's a native float for JSON serialization
         }
 
-# Instantiate a global instance to be loaded once in the worker
-_classifier_instance = None
+# Loaded once per process, on first use or during background warm-up
+get_model_registry().register("advanced", AdvancedClassifier)
 
 def get_classifier():
-    global _classifier_instance
-    if _classifier_instance is None:
-        _classifier_instance = AdvancedClassifier()
-    return _classifier_instance
+    return get_model_registry().get("advanced")
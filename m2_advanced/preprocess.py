@@ -0,0 +1,44 @@
+import os
+import re
+from typing import List
+
+# Words and individual punctuation marks. Subword tokenizers produce at least one token
+# per piece, so this is a cheap, tokenizer-free lower bound on the model's token count.
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_STACK_FRAME = re.compile(r'^\s*(at [\w.$<>]+\(|File ".*", line \d+)', re.MULTILINE)
+ELLIPSIS = " [...] "
+
+def token_budget() -> int:
+    return int(os.getenv("PREPROCESS_TOKEN_BUDGET", "256"))
+
+def count_tokens(text: str) -> int:
+    return sum(1 for _ in _TOKEN_PATTERN.finditer(text))
+
+def looks_like_stack_trace(text: str) -> bool:
+    return len(_STACK_FRAME.findall(text)) >= 3
+
+def truncate_text(text: str, budget: int = None) -> str:
+    """
+    Keep at most `budget` tokens of a ticket: the head (what the customer wrote, the
+    first frames) and the tail (for stack traces, the innermost frames and the final
+    exception line), with " [...] " in between. Short tickets are returned unchanged,
+    as is everything when the budget is 0.
+    """
+    budget = token_budget() if budget is None else budget
+    spans = [m.span() for m in _TOKEN_PATTERN.finditer(text)]
+    if budget <= 0 or len(spans) <= budget:
+        return text
+    # Stack traces carry the useful part (the exception) at the end, so keep more tail
+    head = max(1, budget // 2 if looks_like_stack_trace(text) else (budget * 3) // 4)
+    # The marker's own tokens count towards the budget, so truncating twice is a no-op
+    tail = budget - head - count_tokens(ELLIPSIS)
+    if tail <= 0:
+        head, tail = budget, 0
+    truncated = text[:spans[head - 1][1]]
+    if tail > 0:
+        truncated += ELLIPSIS + text[spans[-tail][0]:]
+    return truncated
+
+def preprocess_texts(texts: List[str], budget: int = None) -> List[str]:
+    """Model inputs for a batch: each ticket cut to the token budget."""
+    return [truncate_text(text, budget) for text in texts]
@@ -1,17 +1,36 @@
 import os
-import redis
+import uuid
+import asyncio
+import redis.asyncio as redis
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
-from .celery_worker import process_ticket_task
+from .celery_worker import process_ticket_task, process_ticket_batch_task
+from .batch_consumer import PENDING_KEY, encode_ticket, scheduled_key
+from .batcher import get_batcher
+from core.cache import get_cache_stats
+from core.circuit_breaker import get_circuit_breaker
 
 router = APIRouter(prefix="/advanced", tags=["Milestone 2 - The Intelligent Queue"])
 
 # Connect to Redis for tracking atomic locks
-# Using a connection pool for efficiency
+# Using the asyncio client (with its connection pool) so lock checks never block the event loop
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 redis_client = redis.from_url(REDIS_URL, decode_responses=True)
 
+# Delete a lock only while it still holds our token, never a duplicate request's lock
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# "single": one Celery message per ticket; "batch": tickets go onto a Redis list drained
+# in batches by process_ticket_batch_task (see batch_consumer.py)
+TICKET_CONSUMER = os.getenv("TICKET_CONSUMER", "single")
+
 class AdvancedTicketRequest(BaseModel):
     ticket_id: str  # Client-provided ID to act as idempotency key
     text: str
@@ -35,7 +54,26 @@ async def process_ticket_async(request: AdvancedTicketRequest):
     # This guarantees that if 10+ requests hit the exact same millisecond, 
     # only ONE will successfully set the key and return True. 
     # We add an expiration time of 300 seconds (5 minutes) so locks don't stay forever.
-    acquired_lock = redis_client.set(lock_key, "locked", nx=True, ex=300)
+    # Guarded by the "redis" circuit breaker: if Redis is slow or down we answer 503
+    # right away instead of piling requests up behind it.
+    lock_token = uuid.uuid4().hex
+
+    async def acquire_lock():
+        return await redis_client.set(lock_key, lock_token, nx=True, ex=300)
+
+    async def lock_unavailable():
+        # The breaker may have cut the SET short after it reached Redis: drop our lock
+        # (best effort) so the "retry shortly" doesn't get a 409 for the next 300s
+        try:
+            await asyncio.wait_for(redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, lock_token), timeout=1.0)
+        except Exception as e:
+            print(f"Could not release idempotency lock {lock_key} ({e!r})")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Idempotency lock service unavailable, retry shortly."
+        )
+
+    acquired_lock, _ = await get_circuit_breaker("redis").call_async(acquire_lock, lock_unavailable)
 
     if not acquired_lock:
         # Atomic lock failed: Another duplicate request is already being processed.
@@ -46,14 +84,32 @@ async def process_ticket_async(request: AdvancedTicketRequest):
         )
 
     # If lock acquired safely, we push the job to the celery background queue
-    process_ticket_task.delay(
-        request.ticket_id,
-        request.text,
-        request.user_id
-    )
+    # (publishing to the broker is blocking I/O, so it runs in the threadpool)
+    if TICKET_CONSUMER == "batch":
+        # Push first, then claim the flag: a drain finishing meanwhile either sees the ticket or frees the flag
+        await redis_client.rpush(PENDING_KEY, encode_ticket(request.ticket_id, request.text, request.user_id))
+        if await redis_client.set(scheduled_key(PENDING_KEY), 1, nx=True, ex=60):
+            await run_in_threadpool(process_ticket_batch_task.delay)
+    else:
+        await run_in_threadpool(
+            process_ticket_task.delay,
+            request.ticket_id,
+            request.text,
+            request.user_id
+        )
     
     return AdvancedTicketResponse(
         message="Ticket accepted for processing.",
         ticket_id=request.ticket_id,
         status="enqueued"
     )
+
+@router.get("/batcher/stats")
+async def get_batcher_stats():
+    """Micro-batcher batch-size histogram and queue wait, for tuning N/T."""
+    return get_batcher().get_stats()
+
+@router.get("/cache/stats")
+async def get_cache_stats_endpoint():
+    """Hit/miss counters of the embedding and model-output caches."""
+    return get_cache_stats()
@@ -1,5 +1,6 @@
 import httpx
 import asyncio
+from core.circuit_breaker import get_circuit_breaker
 
 async def trigger_webhook(ticket_id: str, urgency_score: float, category: str):
     """
@@ -16,12 +17,16 @@ async def trigger_webhook(ticket_id: str, urgency_score: float, category: str):
     }
     
     # We use httpx for async HTTP requests
-    try:
+    async def send():
         async with httpx.AsyncClient() as client:
             # We mock the post request to avoid failing if URL is not real
             # Uncomment for real usage:
             # response = await client.post(webhook_url, json=payload)
             # print(f"Webhook triggered: {response.status_code}")
             print(f"Mock Webhook triggered successfully for Ticket {ticket_id} (Score: {urgency_score:.2f})")
-    except Exception as e:
-        print(f"Failed to trigger webhook: {e}")
+
+    async def skip():
+        print(f"Failed to trigger webhook for Ticket {ticket_id} (webhook slow, failing or circuit open)")
+
+    # The "webhook" circuit breaker stops a dead endpoint from stalling every urgent ticket
+    await get_circuit_breaker("webhook").call_async(send, skip)
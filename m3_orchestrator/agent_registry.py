@@ -0,0 +1,280 @@
+import csv
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+def _skill(value) -> float:
+    # Shortest repr of the float32, so 0.9 reads back as 0.9 rather than 0.8999999761581543
+    return float(str(np.float32(value)))
+
+class Agent:
+    """
+    A support agent. Built standalone (e.g. to pass to SkillBasedRouter.add_agent); once
+    registered it is a read-only view of its AgentRegistry row. Capacity then changes
+    only through the router (route_ticket/route_batch/release_capacity), which keeps its
+    heap index, the capacity store and the WAL in step with the arrays.
+    """
+    __slots__ = ("agent_id", "name", "_skill_vector", "_current_capacity", "_max_capacity", "_registry", "_row")
+
+    def __init__(self, agent_id: str, name: str, skill_vector: Dict[str, float],
+                 current_capacity: int, max_capacity: int = 5):
+        self.agent_id = agent_id
+        self.name = name
+        self._skill_vector = dict(skill_vector)  # e.g., {"Technical": 0.9, "Billing": 0.1, "Legal": 0.0}
+        self._current_capacity = current_capacity  # Number of tickets they can still handle
+        self._max_capacity = max_capacity
+        self._registry: Optional["AgentRegistry"] = None
+        self._row = -1
+
+    @property
+    def skill_vector(self) -> Dict[str, float]:
+        if self._registry is None:
+            return self._skill_vector
+        return self._registry.skill_vector(self._row)
+
+    @property
+    def current_capacity(self) -> int:
+        if self._registry is None:
+            return self._current_capacity
+        return int(self._registry.capacity[self._row])
+
+    @current_capacity.setter
+    def current_capacity(self, value: int):
+        if self._registry is not None:
+            raise AttributeError(f"Agent {self.agent_id!r} is registered: change its capacity through the router")
+        self._current_capacity = value
+
+    @property
+    def max_capacity(self) -> int:
+        if self._registry is None:
+            return self._max_capacity
+        return int(self._registry.max_capacity[self._row])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "agent_id": self.agent_id,
+            "name": self.name,
+            "skill_vector": self.skill_vector,
+            "current_capacity": self.current_capacity,
+            "max_capacity": self.max_capacity,
+        }
+
+    def __repr__(self):
+        return f"Agent({self.agent_id!r}, {self.name!r}, {self.skill_vector!r}, {self.current_capacity}, {self.max_capacity})"
+
+class AgentRegistry:
+    """
+    Columnar agent store: ids and names in lists, skills in an (agents x categories)
+    float32 matrix, remaining and max capacity in int32 arrays, one row per agent in
+    registration order. Scoring every agent for a category is one array expression, and
+    an agent costs a few dozen bytes of arrays plus its id and name strings.
+    Behaves as a read-only mapping of agent_id -> Agent view.
+    """
+    def __init__(self, categories: Sequence[str] = (), initial_rows: int = 64):
+        self.categories: List[str] = list(categories)
+        self._columns = {category: i for i, category in enumerate(self.categories)}
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self._rows: Dict[str, int] = {}
+        # Grown by doubling; only the first len(self) rows are live
+        self._skills = np.zeros((initial_rows, len(self.categories)), dtype=np.float32)
+        self._capacity = np.zeros(initial_rows, dtype=np.int32)
+        self._max_capacity = np.zeros(initial_rows, dtype=np.int32)
+
+    # --- array views of the live rows ---
+
+    @property
+    def skills(self) -> np.ndarray:
+        return self._skills[:len(self.ids)]
+
+    @property
+    def capacity(self) -> np.ndarray:
+        return self._capacity[:len(self.ids)]
+
+    @property
+    def max_capacity(self) -> np.ndarray:
+        return self._max_capacity[:len(self.ids)]
+
+    @property
+    def nbytes(self) -> int:
+        return self.skills.nbytes + self.capacity.nbytes + self.max_capacity.nbytes
+
+    # --- mapping interface ---
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, agent_id):
+        return agent_id in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.ids))
+
+    def __getitem__(self, agent_id: str) -> Agent:
+        return self.view(self._rows[agent_id])
+
+    def get(self, agent_id: str, default=None) -> Optional[Agent]:
+        row = self._rows.get(agent_id)
+        return default if row is None else self.view(row)
+
+    def keys(self) -> List[str]:
+        return list(self.ids)
+
+    def values(self) -> Iterator[Agent]:
+        return (self.view(row) for row in range(len(self.ids)))
+
+    def items(self) -> Iterator[Tuple[str, Agent]]:
+        return ((agent_id, self.view(row)) for row, agent_id in enumerate(list(self.ids)))
+
+    def row(self, agent_id: str) -> int:
+        return self._rows[agent_id]
+
+    def view(self, row: int) -> Agent:
+        agent = Agent.__new__(Agent)
+        agent.agent_id = self.ids[row]
+        agent.name = self.names[row]
+        agent._registry = self
+        agent._row = row
+        return agent
+
+    def skill_vector(self, row: int) -> Dict[str, float]:
+        return {category: _skill(value) for category, value in zip(self.categories, self._skills[row])}
+
+    # --- columns ---
+
+    def column(self, category: str) -> Optional[int]:
+        return self._columns.get(category)
+
+    def skill_columns(self, categories: Sequence[str]) -> np.ndarray:
+        """(agents x len(categories)) skills; zeros for a category no agent has."""
+        out = np.zeros((len(self.ids), len(categories)), dtype=np.float32)
+        for i, category in enumerate(categories):
+            column = self._columns.get(category)
+            if column is not None:
+                out[:, i] = self._skills[:len(self.ids), column]
+        return out
+
+    def capacity_factor(self) -> np.ndarray:
+        """Remaining / max capacity per agent (0 where max is 0), as float64."""
+        max_capacity = self.max_capacity
+        return np.divide(self.capacity, max_capacity, out=np.zeros(len(self.ids)), where=max_capacity > 0)
+
+    def scores(self, category: str) -> np.ndarray:
+        """skill x capacity factor of every agent for `category`."""
+        column = self._columns.get(category)
+        if column is None:
+            return np.zeros(len(self.ids))
+        return self.skills[:, column].astype(np.float64) * self.capacity_factor()
+
+    def _add_columns(self, categories: Iterable[str]):
+        new = [c for c in dict.fromkeys(categories) if c not in self._columns]
+        if not new:
+            return
+        for category in new:
+            self._columns[category] = len(self.categories)
+            self.categories.append(category)
+        self._skills = np.hstack([self._skills, np.zeros((len(self._skills), len(new)), dtype=np.float32)])
+
+    def _reserve(self, rows: int):
+        if rows <= len(self._capacity):
+            return
+        size = max(rows, 2 * len(self._capacity))
+        skills = np.zeros((size, len(self.categories)), dtype=np.float32)
+        skills[:len(self._skills)] = self._skills
+        self._skills = skills
+        self._capacity = np.resize(self._capacity, size)
+        self._max_capacity = np.resize(self._max_capacity, size)
+
+    # --- writes ---
+
+    def add(self, agent: Agent) -> int:
+        """Add or replace an agent; `agent` becomes a view of its row. Returns the row."""
+        skills, capacity, max_capacity = agent.skill_vector, agent.current_capacity, agent.max_capacity
+        self._add_columns(skills)
+        row = self._rows.get(agent.agent_id)
+        if row is None:
+            row = len(self.ids)
+            self._reserve(row + 1)
+            self.ids.append(agent.agent_id)
+            self.names.append(agent.name)
+            self._rows[agent.agent_id] = row
+        else:
+            self.names[row] = agent.name
+        self._skills[row] = 0.0
+        for category, value in skills.items():
+            self._skills[row, self._columns[category]] = value
+        self._capacity[row] = capacity
+        self._max_capacity[row] = max_capacity
+        agent._registry, agent._row = self, row
+        return row
+
+    def add_many(self, records: Sequence[Dict[str, Any]]) -> List[int]:
+        """Bulk add of agent dicts (Agent.to_dict() layout), filling the arrays in one pass."""
+        self._add_columns(c for record in records for c in record["skill_vector"])
+        rows = []
+        new = sum(1 for record in records if record["agent_id"] not in self._rows)
+        self._reserve(len(self.ids) + new)
+        for record in records:
+            row = self._rows.get(record["agent_id"])
+            if row is None:
+                row = len(self.ids)
+                self.ids.append(record["agent_id"])
+                self.names.append(record["name"])
+                self._rows[record["agent_id"]] = row
+            else:
+                self.names[row] = record["name"]
+            rows.append(row)
+        rows_array = np.array(rows, dtype=np.int64)
+        skills = np.zeros((len(records), len(self.categories)), dtype=np.float32)
+        for i, record in enumerate(records):
+            for category, value in record["skill_vector"].items():
+                skills[i, self._columns[category]] = value
+        self._skills[rows_array] = skills
+        self._max_capacity[rows_array] = [record.get("max_capacity", 5) for record in records]
+        self._capacity[rows_array] = [record.get("current_capacity", record.get("max_capacity", 5)) for record in records]
+        return rows
+
+    def clear(self):
+        self.ids, self.names, self._rows = [], [], {}
+        self._capacity[:] = 0
+        self._max_capacity[:] = 0
+        self._skills[:] = 0.0
+
+def load_roster(path: str) -> List[Dict[str, Any]]:
+    """
+    Agent records from a roster file.
+    - .jsonl: one object per line with agent_id, name, skill_vector (or skills),
+      max_capacity and optionally current_capacity.
+    - .csv: columns agent_id, name, max_capacity, optionally current_capacity; every
+      other column is a category and holds that skill.
+    current_capacity defaults to max_capacity (an agent starting their shift).
+    """
+    records = []
+    if path.endswith(".csv"):
+        fixed = {"agent_id", "name", "max_capacity", "current_capacity"}
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                max_capacity = int(row.get("max_capacity") or 5)
+                records.append({
+                    "agent_id": row["agent_id"],
+                    "name": row.get("name") or row["agent_id"],
+                    "skill_vector": {k: float(v) for k, v in row.items() if k not in fixed and v not in (None, "")},
+                    "max_capacity": max_capacity,
+                    "current_capacity": int(row.get("current_capacity") or max_capacity),
+                })
+    else:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                max_capacity = int(item.get("max_capacity", 5))
+                records.append({
+                    "agent_id": item["agent_id"],
+                    "name": item.get("name", item["agent_id"]),
+                    "skill_vector": item.get("skill_vector", item.get("skills", {})),
+                    "max_capacity": max_capacity,
+                    "current_capacity": int(item.get("current_capacity", max_capacity)),
+                })
+    return records
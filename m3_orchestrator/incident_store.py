@@ -0,0 +1,182 @@
+import itertools
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import numpy as np
+
+@dataclass
+class MasterIncident:
+    incident_id: str
+    first_seen: float
+    last_seen: float
+    member_count: int = 0
+    # Sum of member embeddings (unit vectors); its direction is the centroid
+    embedding_sum: Optional[np.ndarray] = None
+    sample_ticket_ids: List[str] = field(default_factory=list)
+    row: int = -1  # Row in the store's centroid matrix
+
+    @property
+    def centroid(self) -> Optional[np.ndarray]:
+        """L2-normalized running mean of the member embeddings."""
+        if self.embedding_sum is None:
+            return None
+        return self.embedding_sum / max(float(np.linalg.norm(self.embedding_sum)), 1e-12)
+
+    def to_summary(self) -> Dict:
+        return {
+            "incident_id": self.incident_id,
+            "member_count": self.member_count,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "sample_ticket_ids": list(self.sample_ticket_ids)
+        }
+
+class IncidentStore:
+    """
+    Bounded, expiring store of master incidents.
+    - Incidents expire `incident_ttl` seconds after their last member.
+    - The ticket -> incident index only keeps tickets for `membership_ttl`
+      seconds (the dedup window), since older tickets can no longer be matched.
+    Both maps are insertion/recency-ordered, so eviction pops from the front
+    and memory stays flat however long the process runs. Callers serialize access.
+    """
+    def __init__(self, incident_ttl: float = 3600,
+                 membership_ttl: float = 300,
+                 max_incidents: int = 10000,
+                 max_samples: int = 5):
+        self.incident_ttl = incident_ttl
+        self.membership_ttl = membership_ttl
+        self.max_incidents = max_incidents
+        self.max_samples = max_samples
+
+        # incident_id -> MasterIncident, least recently updated first
+        self._incidents: "OrderedDict[str, MasterIncident]" = OrderedDict()
+        # ticket_id -> (incident_id, timestamp), oldest first
+        self._ticket_index: "OrderedDict[str, tuple]" = OrderedDict()
+
+        # Centroids of live incidents, one row each, so matching a ticket against
+        # every incident is a single matrix-vector product. Freed rows are zeroed.
+        self._centroids: Optional[np.ndarray] = None
+        self._row_ids: List[Optional[str]] = []
+        self._free_rows: List[int] = []
+
+        self.total_created = 0
+        self.total_suppressed = 0
+        self.total_expired = 0
+
+    def __len__(self):
+        return len(self._incidents)
+
+    def _new_incident_id(self, now: float) -> str:
+        incident_id = f"MASTER-{int(now)}"
+        if incident_id in self._incidents:
+            incident_id = f"{incident_id}-{self.total_created}"
+        return incident_id
+
+    def create(self, now: float) -> MasterIncident:
+        """Open a new incident (members are added with add_member)."""
+        incident = MasterIncident(self._new_incident_id(now), first_seen=now, last_seen=now)
+        self._incidents[incident.incident_id] = incident
+        self.total_created += 1
+        # Hard cap in case TTL alone isn't enough (e.g. thousands of distinct storms)
+        while len(self._incidents) > self.max_incidents:
+            self._remove_oldest()
+        return incident
+
+    def _remove_oldest(self):
+        _, incident = self._incidents.popitem(last=False)
+        if incident.row >= 0:
+            self._centroids[incident.row] = 0.0
+            self._row_ids[incident.row] = None
+            self._free_rows.append(incident.row)
+        self.total_expired += 1
+
+    def _store_centroid(self, incident: MasterIncident):
+        centroid = incident.centroid
+        if self._centroids is None:
+            self._centroids = np.zeros((16, centroid.shape[0]), dtype=np.float32)
+        if incident.row < 0:
+            if self._free_rows:
+                incident.row = self._free_rows.pop()
+                self._row_ids[incident.row] = incident.incident_id
+            else:
+                incident.row = len(self._row_ids)
+                self._row_ids.append(incident.incident_id)
+                if incident.row >= len(self._centroids):
+                    grown = np.zeros((2 * len(self._centroids), self._centroids.shape[1]), dtype=np.float32)
+                    grown[:len(self._centroids)] = self._centroids
+                    self._centroids = grown
+        self._centroids[incident.row] = centroid
+
+    def match_centroid(self, embedding: np.ndarray, threshold: float, active_since: float) -> Optional[str]:
+        """
+        The incident whose centroid is most similar to `embedding` (above `threshold`),
+        considering only incidents that received a ticket since `active_since`.
+        Cost is O(#incidents), independent of how many tickets are in the window.
+        """
+        if not self._row_ids:
+            return None
+        similarities = self._centroids[:len(self._row_ids)] @ embedding
+        for row in np.argsort(-similarities):
+            if similarities[row] <= threshold:
+                break
+            incident = self._incidents.get(self._row_ids[row])
+            if incident is not None and incident.last_seen >= active_since:
+                return incident.incident_id
+        return None
+
+    def add_member(self, incident_id: str, ticket_id: str, embedding: np.ndarray, now: float):
+        """Record a suppressed ticket under an incident and update its centroid."""
+        incident = self._incidents[incident_id]
+        incident.member_count += 1
+        incident.last_seen = now
+        if incident.embedding_sum is None:
+            incident.embedding_sum = np.array(embedding, dtype=np.float32)
+        else:
+            incident.embedding_sum += embedding
+        if len(incident.sample_ticket_ids) < self.max_samples:
+            incident.sample_ticket_ids.append(ticket_id)
+        self._store_centroid(incident)
+        self._incidents.move_to_end(incident_id)
+        self._ticket_index[ticket_id] = (incident_id, now)
+        self.total_suppressed += 1
+
+    def incident_for_ticket(self, ticket_id: str) -> Optional[str]:
+        entry = self._ticket_index.get(ticket_id)
+        if entry is None or entry[0] not in self._incidents:
+            return None
+        return entry[0]
+
+    def get(self, incident_id: str) -> Optional[MasterIncident]:
+        return self._incidents.get(incident_id)
+
+    def active_incidents(self) -> List[MasterIncident]:
+        return list(self._incidents.values())
+
+    def evict_expired(self, now: float):
+        """Drop expired incidents and ticket memberships (amortized O(1) per entry)."""
+        while self._incidents:
+            incident = next(iter(self._incidents.values()))
+            if now - incident.last_seen <= self.incident_ttl:
+                break
+            self._remove_oldest()
+        while self._ticket_index:
+            _, (_, timestamp) = next(iter(self._ticket_index.items()))
+            if now - timestamp <= self.membership_ttl:
+                break
+            self._ticket_index.popitem(last=False)
+
+    def summary(self) -> Dict:
+        """Constant-time counters for dashboards."""
+        return {
+            "active_incidents": len(self._incidents),
+            "tracked_tickets": len(self._ticket_index),
+            "total_created": self.total_created,
+            "total_suppressed": self.total_suppressed,
+            "total_expired": self.total_expired
+        }
+
+    def list_incidents(self, offset: int = 0, limit: int = 50) -> List[Dict]:
+        """A page of incident summaries, most recently active first."""
+        page = itertools.islice(reversed(self._incidents.values()), offset, offset + limit)
+        return [incident.to_summary() for incident in page]
@@ -0,0 +1,79 @@
+from typing import List, Optional, Sequence, Tuple
+
+# Take one slot if the agent has any: remaining capacity, or -1
+ACQUIRE_SCRIPT = """
+local capacity = tonumber(redis.call('HGET', KEYS[1], 'capacity'))
+if capacity == nil or capacity <= 0 then
+    return -1
+end
+return redis.call('HINCRBY', KEYS[1], 'capacity', -1)
+"""
+
+# Give back ARGV[1] slots without going over max_capacity: new capacity, or -1 for an unknown agent
+RELEASE_SCRIPT = """
+local capacity = tonumber(redis.call('HGET', KEYS[1], 'capacity'))
+local max_capacity = tonumber(redis.call('HGET', KEYS[1], 'max_capacity'))
+if capacity == nil or max_capacity == nil then
+    return -1
+end
+capacity = math.min(capacity + tonumber(ARGV[1]), max_capacity)
+redis.call('HSET', KEYS[1], 'capacity', capacity)
+return capacity
+"""
+
+class RedisCapacityStore:
+    """
+    Agent capacities shared by every API replica, one Redis hash per agent
+    ("<prefix>:<agent_id>" with fields capacity and max_capacity).
+    - acquire: a Lua check-and-decrement, so two replicas can never both take an
+      agent's last slot.
+    - release: a Lua increment bounded by max_capacity.
+    - register and read: pipelined, one round trip for any number of agents.
+    Calls are blocking and raise redis.RedisError; SkillBasedRouter falls back to its
+    in-memory capacities when they do.
+    """
+    def __init__(self, redis_client, prefix: str = "agents:capacity"):
+        self.redis = redis_client
+        self.prefix = prefix
+        self._acquire = redis_client.register_script(ACQUIRE_SCRIPT)
+        self._release = redis_client.register_script(RELEASE_SCRIPT)
+
+    def _key(self, agent_id: str) -> str:
+        return f"{self.prefix}:{agent_id}"
+
+    def register(self, agents: Sequence[Tuple[str, int, int]]) -> List[int]:
+        """
+        Create the hashes of (agent_id, current_capacity, max_capacity) agents. An agent
+        another replica already registered keeps its live capacity (only max_capacity is
+        updated). Returns the capacities now in Redis.
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        for agent_id, capacity, max_capacity in agents:
+            key = self._key(agent_id)
+            pipe.hsetnx(key, "capacity", capacity)
+            pipe.hset(key, "max_capacity", max_capacity)
+            pipe.hget(key, "capacity")
+        results = pipe.execute()
+        return [int(value) for value in results[2::3]]
+
+    def acquire(self, agent_id: str) -> int:
+        """Take one slot: the remaining capacity, or -1 if the agent has none."""
+        return int(self._acquire(keys=[self._key(agent_id)]))
+
+    def acquire_many(self, agent_ids: Sequence[str]) -> List[int]:
+        """acquire() for each id (repeats take several slots), pipelined; each one is atomic."""
+        pipe = self.redis.pipeline(transaction=False)
+        for agent_id in agent_ids:
+            self._acquire(keys=[self._key(agent_id)], client=pipe)
+        return [int(value) for value in pipe.execute()]
+
+    def release(self, agent_id: str, count: int = 1) -> int:
+        """Give back `count` slots, capped at max_capacity: the new capacity, or -1 if unregistered."""
+        return int(self._release(keys=[self._key(agent_id)], args=[count]))
+
+    def read(self, agent_ids: Sequence[str]) -> List[Optional[int]]:
+        """Current capacities (None for an agent with no hash), pipelined."""
+        pipe = self.redis.pipeline(transaction=False)
+        for agent_id in agent_ids:
+            pipe.hget(self._key(agent_id), "capacity")
+        return [None if value is None else int(value) for value in pipe.execute()]
@@ -1,21 +1,27 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional, List
 import uuid
 
+from core.executor import get_inference_executor
+from core.model_registry import get_model_registry
 from .semantic_dedup import get_deduplicator
-from .circuit_breaker import get_circuit_breaker
+from .circuit_breaker import get_circuit_breaker, get_circuit_states, hedge_delay_from_env
 from .skill_router import get_skill_router
-from m1_mvr.ml_baseline import BaselineClassifier, check_urgency
-from m2_advanced.ml_transformers import get_classifier
+from .routing_scheduler import get_routing_scheduler
+from m1_mvr.ml_baseline import get_baseline_classifier, check_urgency
+from m2_advanced.batcher import get_batcher
+from m2_advanced.features import TicketFeatures, extract_features
 
 router = APIRouter(prefix="/orchestrator", tags=["Milestone 3 - Autonomous Orchestrator"])
 
-# Initialize components
-baseline_classifier = BaselineClassifier()
+# Initialize components (models inside them are loaded lazily via the model registry)
 deduplicator = get_deduplicator()
-circuit_breaker = get_circuit_breaker()
+circuit_breaker = get_circuit_breaker("transformer")
+embedding_breaker = get_circuit_breaker("embedding")
 skill_router = get_skill_router()
+# ROUTING_MODE=batch buffers tickets into assignment windows (see RoutingScheduler)
+routing_scheduler = get_routing_scheduler()
 
 class OrchestratorTicketRequest(BaseModel):
     text: str
@@ -31,6 +37,22 @@ class OrchestratorTicketResponse(BaseModel):
     assigned_agent: Optional[dict]
     status: str
 
+async def embed_ticket(text: str) -> TicketFeatures:
+    """
+    Embed a ticket behind the embedding circuit breaker. When the embedder is slow or
+    failing, the ticket goes on without an embedding (dedup is skipped for it).
+    """
+    executor = get_inference_executor()
+    if not get_model_registry().is_loaded("embedder"):
+        # The first call loads the model; don't count the load time against the breaker
+        return await executor.run(extract_features, text)
+
+    async def without_embedding():
+        return TicketFeatures(text)
+
+    features, _ = await embedding_breaker.call_async(lambda: executor.run(extract_features, text), without_embedding)
+    return features
+
 @router.post("/ticket", response_model=OrchestratorTicketResponse)
 async def process_ticket_orchestrator(request: OrchestratorTicketRequest):
     """
@@ -40,10 +62,17 @@ async def process_ticket_orchestrator(request: OrchestratorTicketRequest):
     - Skill-based routing (constraint optimization)
     """
     ticket_id = str(uuid.uuid4())
+    executor = get_inference_executor()
     
-    # Step 1: Semantic Deduplication
-    dedup_result = deduplicator.check_ticket(ticket_id, request.text)
-    
+    # Step 0: Embed the ticket once; dedup and the embedding-based classifier modes share it
+    features = await embed_ticket(request.text)
+
+    # Step 1: Semantic Deduplication (runs on the inference thread pool)
+    if features.embedding is not None:
+        dedup_result = await executor.run(deduplicator.check_ticket, ticket_id, request.text, features.embedding)
+    else:
+        dedup_result = {"is_duplicate": False, "master_incident_id": None}
+
     if dedup_result["is_duplicate"]:
         # This is part of a ticket storm, suppress individual alert
         return OrchestratorTicketResponse(
@@ -59,27 +88,33 @@ async def process_ticket_orchestrator(request: OrchestratorTicketRequest):
     
     # Step 2: ML Classification with Circuit Breaker
     def primary_model():
-        """Transformer model (potentially slow)"""
-        advanced_classifier = get_classifier()
-        return advanced_classifier.analyze_ticket(request.text)
+        """Transformer model (potentially slow), micro-batched with concurrent requests"""
+        return get_batcher().analyze_async(features)
     
-    def fallback_model():
+    def baseline_model():
         """Baseline model (fast and reliable)"""
-        category = baseline_classifier.predict_category(request.text)
+        category = get_baseline_classifier().predict_category(request.text)
         urgency = check_urgency(request.text)
         return {
             "category": category,
             "urgency_score": 0.9 if urgency else 0.3
         }
     
-    # Circuit breaker automatically chooses model based on latency
-    ml_result, model_used = circuit_breaker.call(primary_model, fallback_model)
+    def fallback_model():
+        return executor.run(baseline_model)
+
+    # Circuit breaker automatically chooses model based on latency. The primary is awaited
+    # on the event loop (no executor thread is parked on the batcher), and abandoned at the
+    # latency threshold; with CIRCUIT_HEDGE_DELAY_MS the baseline races it after that delay.
+    ml_result, model_used = await circuit_breaker.call_async(primary_model, fallback_model,
+                                                             hedge_delay=hedge_delay_from_env())
     
     category = ml_result["category"]
     urgency_score = ml_result["urgency_score"]
     
-    # Step 3: Skill-Based Routing
-    assignment = skill_router.route_ticket(ticket_id, category, urgency_score)
+    # Step 3: Skill-Based Routing (on the event loop; on a worker thread with the Redis capacity store).
+    # Greedy by default; in batch mode this waits for the ticket's assignment window.
+    assignment = await routing_scheduler.route(ticket_id, category, urgency_score)
     
     return OrchestratorTicketResponse(
         ticket_id=ticket_id,
@@ -95,23 +130,40 @@ async def process_ticket_orchestrator(request: OrchestratorTicketRequest):
 @router.get("/agents")
 async def get_agents():
     """Get status of all agents."""
-    return {"agents": skill_router.get_agent_status()}
+    return {"agents": await skill_router.call(skill_router.get_agent_status)}
+
+@router.get("/routing/stats")
+async def get_routing_stats():
+    """Routing mode, batch sizes, added latency and match quality against greedy routing."""
+    return routing_scheduler.get_stats()
 
 @router.post("/agents/{agent_id}/release")
 async def release_agent_capacity(agent_id: str, count: int = 1):
     """Release agent capacity when they complete tickets."""
-    skill_router.release_capacity(agent_id, count)
+    await skill_router.call(skill_router.release_capacity, agent_id, count)
     return {"message": f"Released {count} capacity for agent {agent_id}"}
 
 @router.get("/circuit-breaker/status")
 async def get_circuit_status():
-    """Get circuit breaker status."""
-    return circuit_breaker.get_state()
+    """Classifier circuit breaker status, plus every protected backend under "backends"."""
+    return {**circuit_breaker.get_state(), "backends": get_circuit_states()}
 
 @router.get("/master-incidents")
-async def get_master_incidents():
-    """Get all active master incidents."""
+async def get_master_incidents(offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=500)):
+    """Summary counters plus one page of active master incidents (most recent first)."""
+    page = deduplicator.list_incidents(offset, limit)
     return {
-        "master_incidents": deduplicator.master_incidents,
-        "recent_ticket_count": len(deduplicator.recent_tickets)
+        "summary": deduplicator.get_incident_summary(),
+        "master_incidents": {incident["incident_id"]: incident for incident in page},
+        "offset": offset,
+        "limit": limit,
+        "recent_ticket_count": len(deduplicator)
     }
+
+@router.get("/master-incidents/{incident_id}")
+async def get_master_incident(incident_id: str):
+    """Details of a single master incident."""
+    incident = deduplicator.get_incident(incident_id)
+    if incident is None:
+        raise HTTPException(status_code=404, detail=f"Master incident {incident_id} not found")
+    return incident
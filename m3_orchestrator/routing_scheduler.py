@@ -0,0 +1,180 @@
+import os
+import time
+import asyncio
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+ROUTING_MODES = ("greedy", "batch")
+
+class RoutingScheduler:
+    """
+    Decides when tickets are handed to the SkillBasedRouter.
+    - "greedy": each ticket goes straight to route_ticket (best agent right now).
+    - "batch": tickets are buffered for up to `window_ms`, or until `max_batch` are
+      waiting, then assigned together by route_batch, which maximizes the batch's total
+      match score. Tickets with urgency_score >= `urgent_threshold` skip the window and
+      are routed greedily at once.
+    Router calls run on the event loop, or on a worker thread through the router's
+    call() when it does blocking I/O (a Redis capacity store). With `compare_greedy`, each
+    batch is also scored as greedy routing would have assigned it (nothing is assigned
+    for that), for the quality metrics.
+    """
+    def __init__(self, skill_router,
+                 mode: str = "greedy",
+                 window_ms: float = 200,
+                 max_batch: int = 64,
+                 urgent_threshold: float = 0.8,
+                 compare_greedy: bool = True):
+        if mode not in ROUTING_MODES:
+            raise ValueError(f"Unknown routing mode '{mode}', expected one of {ROUTING_MODES}")
+        self.skill_router = skill_router
+        self.mode = mode
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.urgent_threshold = urgent_threshold
+        self.compare_greedy = compare_greedy
+
+        # (ticket, future, enqueue time) waiting for the next batch
+        self._pending: List[tuple] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Batches being assigned on a worker thread (referenced so they aren't collected)
+        self._flushes = set()
+
+        self.tickets_immediate = 0
+        self.tickets_batched = 0
+        self.batches = 0
+        self.unassigned = 0
+        self.assigned = 0
+        self.match_score = 0.0
+        self.batch_match_score = 0.0
+        self.greedy_match_score = 0.0  # Greedy routing of the same batches
+        self.added_latency_ms = deque(maxlen=1000)  # Recent samples
+
+    async def route(self, ticket_id: str, category: str, urgency_score: float) -> Optional[Dict[str, Any]]:
+        """The ticket's assignment, or None if no agent has capacity."""
+        if self.mode == "greedy" or urgency_score >= self.urgent_threshold:
+            self.tickets_immediate += 1
+            assignment = await self.skill_router.call(self.skill_router.route_ticket, ticket_id, category, urgency_score)
+            self._count(assignment)
+            return assignment
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(({"ticket_id": ticket_id, "category": category, "urgency_score": urgency_score},
+                              future, time.perf_counter()))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self.flush)
+        return await future
+
+    def _count(self, assignment: Optional[Dict[str, Any]]):
+        if assignment is None:
+            self.unassigned += 1
+        else:
+            self.assigned += 1
+            self.match_score += assignment["match_score"]
+
+    def flush(self):
+        """Assign everything buffered now."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        # A caller that went away (cancelled, timed out) must not take an agent's capacity
+        batch = [entry for entry in self._pending if not entry[1].done()]
+        self._pending = []
+        if not batch:
+            return
+        if self.skill_router.blocking_io:
+            task = asyncio.get_running_loop().create_task(self._flush_async(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+            return
+        try:
+            outcome = self._route_batch(batch)
+        except Exception as e:
+            self._fail(batch, e)
+            return
+        self._settle(batch, *outcome)
+
+    async def _flush_async(self, batch: List[tuple]):
+        try:
+            outcome = await self.skill_router.call(self._route_batch, batch)
+        except Exception as e:
+            self._fail(batch, e)
+            return
+        self._settle(batch, *outcome)
+
+    def _route_batch(self, batch: List[tuple]) -> tuple:
+        tickets = [ticket for ticket, _, _ in batch]
+        greedy = self.skill_router.greedy_match_score(tickets) if self.compare_greedy else None
+        return greedy, self.skill_router.route_batch(tickets)
+
+    def _fail(self, batch: List[tuple], e: Exception):
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(e)
+
+    def _settle(self, batch: List[tuple], greedy: Optional[float], result: Dict[str, List]):
+        assignments = {a["ticket_id"]: a for a in result["assignments"]}
+        now = time.perf_counter()
+        for ticket, future, enqueued_at in batch:
+            assignment = assignments.get(ticket["ticket_id"])
+            self._count(assignment)
+            self.added_latency_ms.append((now - enqueued_at) * 1000)
+            # Cancelled while a worker thread assigned the batch: the agent keeps the ticket
+            # until it is released as usual
+            if not future.done():
+                future.set_result(assignment)
+
+        self.batches += 1
+        self.tickets_batched += len(batch)
+        if greedy is not None:
+            self.greedy_match_score += greedy
+            self.batch_match_score += sum(a["match_score"] for a in result["assignments"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        latency = np.array(self.added_latency_ms) if self.added_latency_ms else np.zeros(1)
+        stats = {
+            "mode": self.mode,
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "urgent_threshold": self.urgent_threshold,
+            "tickets_immediate": self.tickets_immediate,
+            "tickets_batched": self.tickets_batched,
+            "batches": self.batches,
+            "mean_batch_size": round(self.tickets_batched / self.batches, 2) if self.batches else 0.0,
+            "pending": len(self._pending),
+            "assigned": self.assigned,
+            "unassigned": self.unassigned,
+            "mean_match_score": round(self.match_score / self.assigned, 4) if self.assigned else 0.0,
+            "added_latency_ms": {q: round(float(np.percentile(latency, int(q[1:]))), 1) for q in ("p50", "p95", "p99")},
+        }
+        if self.compare_greedy and self.batches:
+            stats["batch_vs_greedy"] = {
+                "batch_match_score": round(self.batch_match_score, 3),
+                "greedy_match_score": round(self.greedy_match_score, 3),
+                "gain_pct": round((self.batch_match_score / self.greedy_match_score - 1) * 100, 2)
+                            if self.greedy_match_score else None,
+            }
+        return stats
+
+# Global instance
+_routing_scheduler = None
+
+def get_routing_scheduler():
+    """ROUTING_MODE=greedy (default) or batch; ROUTING_WINDOW_MS, ROUTING_MAX_BATCH, ROUTING_URGENT_THRESHOLD."""
+    global _routing_scheduler
+    if _routing_scheduler is None:
+        from .skill_router import get_skill_router
+        _routing_scheduler = RoutingScheduler(
+            get_skill_router(),
+            mode=os.getenv("ROUTING_MODE", "greedy"),
+            window_ms=float(os.getenv("ROUTING_WINDOW_MS", "200")),
+            max_batch=int(os.getenv("ROUTING_MAX_BATCH", "64")),
+            urgent_threshold=float(os.getenv("ROUTING_URGENT_THRESHOLD", "0.8")),
+            compare_greedy=os.getenv("ROUTING_COMPARE_GREEDY", "true").lower() == "true",
+        )
+    return _routing_scheduler
@@ -1,87 +1,140 @@
+import os
 import time
-from typing import List, Dict
-from collections import deque
-from sentence_transformers import SentenceTransformer
+import threading
+from typing import Dict, List, Optional
 import numpy as np
+from m2_advanced.embeddings import get_embedder, encode_texts
+from .vector_index import create_index
+from .incident_store import IncidentStore
 
 class SemanticDeduplicator:
     """
     Detects ticket storms using sentence embeddings and cosine similarity.
     If similarity > 0.9 for more than 10 tickets in 5 minutes, creates a Master Incident.
+
+    The recent-ticket window lives in a pluggable vector index (see vector_index.py):
+    "exact" brute force over a float32 ring buffer, or "lsh" random-hyperplane
+    hashing for very large windows during major outages.
+    Each master incident keeps a running centroid; once a storm is detected, its
+    later tickets are matched against the centroids without scanning the window.
     """
-    def __init__(self, similarity_threshold: float = 0.9, 
-                 ticket_threshold: int = 10, 
-                 time_window: int = 300):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')  # Lightweight model
+    def __init__(self, similarity_threshold: float = 0.9,
+                 ticket_threshold: int = 10,
+                 time_window: int = 300,
+                 max_window: int = 10000,
+                 index_backend: str = "exact",
+                 incident_ttl: float = 3600,
+                 match_centroids: bool = True):
         self.similarity_threshold = similarity_threshold
         self.ticket_threshold = ticket_threshold
         self.time_window = time_window  # 5 minutes in seconds
-        
-        # Store recent tickets with timestamps
-        self.recent_tickets = deque(maxlen=100)
-        self.master_incidents = {}
-        
-    def _cosine_similarity(self, vec_a: np.ndarray, vec_b: np.ndarray) -> float:
-        """Calculate cosine similarity between two vectors."""
-        return float(np.dot(vec_a, vec_b) / (np.linalg.norm(vec_a) * np.linalg.norm(vec_b)))
-    
-    def _clean_old_tickets(self):
-        """Remove tickets older than the time window."""
-        current_time = time.time()
-        while self.recent_tickets and (current_time - self.recent_tickets[0]['timestamp']) > self.time_window:
-            self.recent_tickets.popleft()
-    
-    def check_ticket(self, ticket_id: str, text: str) -> Dict:
+        self.max_window = max_window  # Oldest tickets are overwritten beyond this
+        # Compare new tickets against active incident centroids before the window scan
+        self.match_centroids = match_centroids
+
+        # Window of recent tickets
+        self.index = create_index(index_backend, capacity=max_window)
+        # Master incidents expire an hour after their last ticket; ticket memberships
+        # only need to outlive the dedup window
+        self.incidents = IncidentStore(incident_ttl=incident_ttl, membership_ttl=time_window)
+
+        # check_ticket runs on the inference thread pool; the window is shared state
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        """The shared embedding model, loaded on first use."""
+        return get_embedder()
+
+    def __len__(self):
+        """Number of tickets currently in the window."""
+        return len(self.index)
+
+    def get_incident_summary(self) -> Dict:
+        with self._lock:
+            self.incidents.evict_expired(time.time())
+            return self.incidents.summary()
+
+    def list_incidents(self, offset: int = 0, limit: int = 50) -> List[Dict]:
+        with self._lock:
+            return self.incidents.list_incidents(offset, limit)
+
+    def get_incident(self, incident_id: str) -> Optional[Dict]:
+        with self._lock:
+            incident = self.incidents.get(incident_id)
+            return incident.to_summary() if incident else None
+
+    def check_ticket(self, ticket_id: str, text: str, embedding: Optional[np.ndarray] = None,
+                     timestamp: Optional[float] = None) -> Dict:
         """
         Check if this ticket is part of a storm.
+        Pass `embedding` when the ticket was already embedded for this request.
         Returns: {
             "is_duplicate": bool,
             "master_incident_id": str or None,
             "similar_count": int
         }
         """
-        self._clean_old_tickets()
-        
-        current_time = time.time()
-        embedding = self.model.encode(text)
-        
-        # Check similarity with recent tickets
-        similar_tickets = []
-        for ticket in self.recent_tickets:
-            similarity = self._cosine_similarity(embedding, ticket['embedding'])
-            if similarity > self.similarity_threshold:
-                similar_tickets.append(ticket)
-        
+        # Encoding is the slow part and is safe to run concurrently
+        if embedding is None:
+            embedding = encode_texts([text])[0]
+
+        # Normalize once so every window comparison is a plain dot product
+        embedding = np.asarray(embedding, dtype=np.float32)
+        embedding = embedding / max(float(np.linalg.norm(embedding)), 1e-12)
+
+        with self._lock:
+            return self._check_embedding(ticket_id, embedding, time.time() if timestamp is None else timestamp)
+
+    def _check_embedding(self, ticket_id: str, embedding: np.ndarray, current_time: float) -> Dict:
+        """Compare an embedded ticket against the window and record it. Caller holds the lock."""
+        # Remove tickets older than the time window, and expired incidents
+        self.index.evict_before(current_time - self.time_window)
+        self.incidents.evict_expired(current_time)
+
+        # During a storm most tickets belong to an incident that is still active:
+        # matching against incident centroids is O(#incidents) instead of O(#tickets)
+        if self.match_centroids:
+            master_id = self.incidents.match_centroid(embedding, self.similarity_threshold,
+                                                      active_since=current_time - self.time_window)
+            if master_id:
+                self.index.add(ticket_id, embedding, current_time)
+                self.incidents.add_member(master_id, ticket_id, embedding, current_time)
+                return {
+                    "is_duplicate": True,
+                    "master_incident_id": master_id,
+                    "similar_count": self.incidents.get(master_id).member_count,
+                    "action": "suppress_alert"
+                }
+
+        # No active incident matches: check similarity with recent tickets
+        similar_tickets = self.index.range_query(embedding, self.similarity_threshold)
+
         # Add current ticket to recent tickets
-        self.recent_tickets.append({
-            'ticket_id': ticket_id,
-            'text': text,
-            'embedding': embedding,
-            'timestamp': current_time
-        })
-        
+        self.index.add(ticket_id, embedding, current_time)
+
         # Check if we have a ticket storm
         if len(similar_tickets) >= self.ticket_threshold:
             # Create or find master incident
             master_id = None
-            for ticket in similar_tickets:
-                if ticket['ticket_id'] in self.master_incidents:
-                    master_id = self.master_incidents[ticket['ticket_id']]
+            for similar_id in similar_tickets:
+                master_id = self.incidents.incident_for_ticket(similar_id)
+                if master_id:
                     break
-            
+
             if not master_id:
-                master_id = f"MASTER-{int(current_time)}"
-                
+                master_id = self.incidents.create(current_time).incident_id
+
             # Register this ticket under the master incident
-            self.master_incidents[ticket_id] = master_id
-            
+            self.incidents.add_member(master_id, ticket_id, embedding, current_time)
+
             return {
                 "is_duplicate": True,
                 "master_incident_id": master_id,
                 "similar_count": len(similar_tickets),
                 "action": "suppress_alert"
             }
-        
+
         return {
             "is_duplicate": False,
             "master_incident_id": None,
@@ -95,5 +148,10 @@ _deduplicator = None
 def get_deduplicator():
     global _deduplicator
     if _deduplicator is None:
-        _deduplicator = SemanticDeduplicator()
+        _deduplicator = SemanticDeduplicator(
+            max_window=int(os.getenv("DEDUP_MAX_WINDOW", "10000")),
+            index_backend=os.getenv("DEDUP_INDEX", "exact"),
+            incident_ttl=float(os.getenv("INCIDENT_TTL_SECONDS", "3600")),
+            match_centroids=os.getenv("DEDUP_MATCH_CENTROIDS", "true").lower() == "true"
+        )
     return _deduplicator
@@ -1,26 +1,282 @@
+import os
+import time
+import heapq
+import functools
+import threading
 import numpy as np
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 from scipy.optimize import linear_sum_assignment
+from starlette.concurrency import run_in_threadpool
 
-@dataclass
-class Agent:
-    agent_id: str
-    name: str
-    skill_vector: Dict[str, float]  # e.g., {"Technical": 0.9, "Billing": 0.1, "Legal": 0.0}
-    current_capacity: int  # Number of tickets they can still handle
-    max_capacity: int = 5
+from core.circuit_breaker import get_circuit_breaker
+from core.wal import open_wal
+from .agent_registry import Agent, AgentRegistry, load_roster
+
+def _locked(method):
+    """
+    Hold the router's lock for the call (with blocking I/O, methods run on worker threads),
+    then wait for the WAL events it appended outside the lock, so concurrent calls share an fsync.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            result = method(self, *args, **kwargs)
+            sequence, self._wal_sequence = self._wal_sequence, 0
+        if sequence:
+            self.wal.commit(sequence)
+        return result
+    return wrapper
 
 class SkillBasedRouter:
     """
     Maintains a stateful registry of agents with skill vectors.
     Routes tickets to the best available agent using constraint optimization.
+    With attach_wal(), agents and their capacities survive a restart. With
+    attach_capacity_store(), capacities are shared by every replica through Redis. Either
+    can make the router do blocking I/O (see blocking_io), so async callers go through
+    call() and its methods are serialized by a lock.
+
+    Agents live in a columnar AgentRegistry (skill matrix + capacity arrays); the
+    internals work on registry rows and hand out Agent views at the API boundary.
+    route_ticket() uses a max-heap per category of available agents keyed on
+    skill x capacity factor (the urgency weight is the same for every agent, so it
+    doesn't change the ranking). A capacity change pushes the agent's new entry into
+    each heap and bumps its version; outdated entries are skipped when they surface
+    and a heap is rebuilt once they outnumber live ones. Routing is O(log A) amortized.
     """
     def __init__(self):
-        self.agents: Dict[str, Agent] = {}
         self.categories = ["Technical", "Billing", "Legal"]
+        self.agents = AgentRegistry(self.categories)
+        # Optional core.wal.WriteAheadLog of agent and capacity changes
+        self.wal = None
+        # Last WAL event appended by the running call, committed once it releases the lock
+        self._wal_sequence = 0
+        # Optional RedisCapacityStore; the local capacities are then a cache of it
+        self.capacity_store = None
+        self.capacity_breaker = None
+        self.capacity_sync_seconds = 1.0
+        self.capacity_errors = 0
+        # Category -> monotonic time its candidate rows were last read from the store
+        self._synced_at: Dict[str, float] = {}
+        self._lock = threading.RLock()
         self._initialize_agents()
+        self._reset_index()
+
+    def _reset_index(self):
+        # category -> heap of (-skill x capacity factor, row, version); the row is the
+        # registration order, which breaks ties as the linear scan did
+        self._heaps: Dict[str, List[tuple]] = {}
+        # Row -> version; entries with an older version are outdated
+        self._versions: List[int] = [0] * len(self.agents)
+
+    def _index_score(self, row: int, category: str) -> float:
+        column = self.agents.column(category)
+        max_capacity = self.agents._max_capacity.item(row)
+        if column is None or max_capacity <= 0:
+            return 0.0
+        return self.agents._skills.item(row, column) * (self.agents._capacity.item(row) / max_capacity)
+
+    def _build_heap(self, category: str) -> List[tuple]:
+        rows = np.flatnonzero(self.agents.capacity > 0)
+        scores = self.agents.scores(category)[rows]
+        versions = self._versions
+        heap = [(-score, row, versions[row]) for score, row in zip(scores.tolist(), rows.tolist())]
+        heapq.heapify(heap)
+        return heap
+
+    def _reindex(self, rows: Iterable[int]):
+        """Rows whose capacity or skills changed: push fresh heap entries, outdating the old ones."""
+        agents, versions = self.agents, self._versions
+        n_agents = len(agents.ids)
+        if len(versions) < n_agents:
+            versions.extend([0] * (n_agents - len(versions)))
+        for row in rows:
+            versions[row] += 1
+            capacity, max_capacity = agents._capacity.item(row), agents._max_capacity.item(row)
+            if capacity <= 0:
+                continue
+            factor = capacity / max_capacity if max_capacity > 0 else 0.0
+            skills = agents._skills[row].tolist()
+            for category, heap in self._heaps.items():
+                column = agents.column(category)
+                score = skills[column] * factor if column is not None else 0.0
+                heapq.heappush(heap, (-score, row, versions[row]))
+        for category, heap in self._heaps.items():
+            if len(heap) > 2 * n_agents + 64:
+                self._heaps[category] = self._build_heap(category)
+
+    def _best_available(self, category: str) -> Optional[int]:
+        """Row of the best agent with capacity for `category`, or None."""
+        heap = self._heaps.get(category)
+        if heap is None:
+            heap = self._heaps[category] = self._build_heap(category)
+        while heap:
+            _, row, version = heap[0]
+            if self._versions[row] == version:
+                return row
+            heapq.heappop(heap)
+        return None
+
+    @property
+    def blocking_io(self) -> bool:
+        """True when routing calls wait on the network (a capacity store) or the disk (a WAL with fsync="always")."""
+        return self.capacity_store is not None or (self.wal is not None and self.wal.fsync == "always")
+
+    async def call(self, func, *args):
+        """Run `func` (one of this router's methods) off the event loop if it does blocking I/O."""
+        if self.blocking_io:
+            return await run_in_threadpool(func, *args)
+        return func(*args)
+
+    def attach_wal(self, wal):
+        """Replay `wal` into the registry, then log every agent and capacity change to it."""
+        wal.open(self._restore, self._snapshot_state)
+        self.wal = wal
+
+    def _snapshot_state(self) -> List[Dict[str, Any]]:
+        return [agent.to_dict() for agent in self.agents.values()]
+
+    def _restore(self, state: Optional[List[Dict[str, Any]]], events: Iterable[Tuple[str, Any]]):
+        if state is not None:
+            self.agents.clear()
+            self.agents.add_many(state)
+        for event_type, payload in events:
+            if event_type == "agent":
+                self.agents.add_many([payload])
+            elif event_type == "capacity":
+                # Absolute values, so replaying an event the snapshot already has is harmless
+                for agent_id, capacity in payload.items():
+                    if agent_id in self.agents:
+                        self.agents.capacity[self.agents.row(agent_id)] = capacity
+        self._reset_index()
+
+    def _log_capacity(self, rows: List[int]):
+        if self.wal is not None and rows:
+            self._wal_sequence = self.wal.append("capacity", {self.agents.ids[row]: int(self.agents.capacity[row]) for row in rows})
     
+    @_locked
+    def attach_capacity_store(self, store, sync_seconds: float = 1.0, breaker=None):
+        """
+        Share agent capacities through `store` (a RedisCapacityStore). Assignments take a
+        slot with its atomic check-and-decrement, so replicas never over-assign an agent.
+        Local capacities and the heap index still pick the candidate; the agents a ticket's
+        category can go to are refreshed from Redis every `sync_seconds` and whenever they
+        show nobody available. Store calls go through `breaker` (default: the "redis"
+        circuit breaker); while it is open, capacities are kept in memory.
+        """
+        self.capacity_store = store
+        self.capacity_breaker = breaker or get_circuit_breaker("redis")
+        self.capacity_sync_seconds = sync_seconds
+        self._register(range(len(self.agents)))
+
+    def _capacity_failed(self, e: Exception):
+        self.capacity_errors += 1
+        print(f"Capacity store failed ({e}), using in-memory capacities")
+
+    def _store_call(self, method, *args):
+        """`method` of the capacity store behind the breaker: its result, or None if it failed or the circuit is open."""
+        outcome = []
+
+        def primary():
+            try:
+                outcome.append(method(*args))
+            except Exception as e:
+                self._capacity_failed(e)
+                raise
+            return outcome[0]
+
+        # A call that succeeded but was slow still trips the breaker; its result is kept,
+        # since e.g. the slot it acquired is already taken in Redis
+        result, _ = self.capacity_breaker.call(primary, lambda: outcome[0] if outcome else None)
+        return result
+
+    def _set_capacities(self, rows: List[int], capacities: List[int]):
+        changed = []
+        for row, capacity in zip(rows, capacities):
+            if self.agents._capacity.item(row) != capacity:
+                self.agents._capacity[row] = capacity
+                changed.append(row)
+        self._reindex(changed)
+
+    def _register(self, rows: Iterable[int]):
+        if self.capacity_store is None:
+            return
+        rows = list(rows)
+        agents = self.agents
+        capacities = self._store_call(self.capacity_store.register,
+            [(agents.ids[row], agents._capacity.item(row), agents._max_capacity.item(row)) for row in rows])
+        if capacities is not None:
+            self._set_capacities(rows, capacities)
+
+    @_locked
+    def sync_capacity(self, rows: Optional[Sequence[int]] = None):
+        """Refresh the local capacities of `rows` (default: every agent) from the capacity store, in one pipelined read."""
+        if self.capacity_store is None:
+            return
+        if rows is None:
+            rows = range(len(self.agents))
+            now = time.monotonic()
+            self._synced_at = {category: now for category in self.agents.categories}
+        rows = list(rows)
+        capacities = self._store_call(self.capacity_store.read, [self.agents.ids[row] for row in rows])
+        if capacities is None:
+            return
+        known = [(row, capacity) for row, capacity in zip(rows, capacities) if capacity is not None]
+        self._set_capacities([row for row, _ in known], [capacity for _, capacity in known])
+        missing = [row for row, capacity in zip(rows, capacities) if capacity is None]
+        if missing:
+            # Hashes lost (e.g. Redis restarted empty): register them again
+            self._register(missing)
+
+    def _candidate_rows(self, categories: Sequence[str]) -> List[int]:
+        """Rows of the agents with some skill in `categories`, i.e. those their tickets can go to."""
+        return np.flatnonzero((self.agents.skill_columns(categories) > 0).any(axis=1)).tolist()
+
+    def _maybe_sync(self, categories: Sequence[str], max_age: float):
+        """Refresh the candidate rows of `categories` not read in the last `max_age` seconds."""
+        if self.capacity_store is None:
+            return
+        now = time.monotonic()
+        stale = [c for c in categories if now - self._synced_at.get(c, 0.0) >= max_age]
+        if stale:
+            for category in stale:
+                self._synced_at[category] = now
+            self.sync_capacity(self._candidate_rows(stale))
+
+    def _take(self, row: int) -> int:
+        """Take one slot of `row`: its remaining capacity, or -1 if it had none left (e.g. another replica took it)."""
+        if self.capacity_store is not None:
+            remaining = self._store_call(self.capacity_store.acquire, self.agents.ids[row])
+            if remaining is not None:
+                self.agents._capacity[row] = max(remaining, 0)
+                self._reindex([row])
+                return remaining
+        if self.agents._capacity.item(row) <= 0:
+            return -1
+        self.agents._capacity[row] -= 1
+        self._reindex([row])
+        return self.agents._capacity.item(row)
+
+    def _take_many(self, rows: List[int]) -> List[int]:
+        """_take() for each row (repeats take several slots), in one round trip to the capacity store."""
+        remaining = None
+        if self.capacity_store is not None:
+            remaining = self._store_call(self.capacity_store.acquire_many, [self.agents.ids[row] for row in rows])
+        if remaining is None:
+            remaining = []
+            for row in rows:
+                if self.agents._capacity.item(row) <= 0:
+                    remaining.append(-1)
+                    continue
+                self.agents._capacity[row] -= 1
+                remaining.append(self.agents._capacity.item(row))
+        else:
+            # Slots of one agent are taken in order, so its last result is its capacity now
+            for row, left in zip(rows, remaining):
+                self.agents._capacity[row] = max(left, 0)
+        self._reindex(sorted(set(rows)))
+        return remaining
+
     def _initialize_agents(self):
         """Initialize some sample agents with different skill profiles."""
         sample_agents = [
@@ -32,11 +288,28 @@ class SkillBasedRouter:
             Agent("agent_6", "Frank", {"Technical": 0.5, "Billing": 0.3, "Legal": 0.2}, 5),
         ]
         for agent in sample_agents:
-            self.agents[agent.agent_id] = agent
+            self.agents.add(agent)
     
+    @_locked
     def add_agent(self, agent: Agent):
         """Add or update an agent in the registry."""
-        self.agents[agent.agent_id] = agent
+        row = self.agents.add(agent)
+        self._reindex([row])
+        self._register([row])
+        if self.wal is not None:
+            self._wal_sequence = self.wal.append("agent", agent.to_dict())
+    
+    @_locked
+    def load_agents(self, path: str) -> int:
+        """Add or update every agent of a CSV/JSONL roster (see load_roster). Returns the count."""
+        records = load_roster(path)
+        rows = self.agents.add_many(records)
+        self._reindex(rows)
+        self._register(rows)
+        if self.wal is not None and records:
+            self._wal_sequence = self.wal.append_many(("agent", record) for record in records)
+        print(f"Loaded {len(records)} agents from {path}")
+        return len(records)
     
     def get_agent(self, agent_id: str) -> Optional[Agent]:
         """Get agent by ID."""
@@ -47,116 +320,193 @@ class SkillBasedRouter:
         Calculate how well an agent matches a ticket.
         Score = skill_match * capacity_factor * urgency_weight
         """
-        skill_match = agent.skill_vector.get(category, 0.0)
-        
-        # Capacity factor: prefer agents with more available capacity
-        capacity_factor = agent.current_capacity / agent.max_capacity if agent.max_capacity > 0 else 0
+        # Skill match x capacity factor (prefer agents with more available capacity)
+        base_score = self._index_score(self.agents.row(agent.agent_id), category)
         
         # Urgency weight: urgent tickets get priority matching
         urgency_weight = 1.0 + (0.5 * urgency_score)
         
         # Combined score
-        score = skill_match * capacity_factor * urgency_weight
+        score = base_score * urgency_weight
         return score
     
+    @_locked
     def route_ticket(self, ticket_id: str, category: str, urgency_score: float) -> Optional[Dict]:
         """
         Route a single ticket to the best available agent.
         Returns agent assignment or None if no agent available.
         """
-        available_agents = [a for a in self.agents.values() if a.current_capacity > 0]
-        
-        if not available_agents:
-            return None
+        self._maybe_sync([category], self.capacity_sync_seconds)
+        row = self._best_available(category)
+        if row is None and self.capacity_store is not None:
+            # Other replicas may have released capacity since the last sync
+            self._maybe_sync([category], self.capacity_sync_seconds / 10)
+            row = self._best_available(category)
         
-        # Calculate scores for all available agents
-        best_agent = None
-        best_score = -1
-        
-        for agent in available_agents:
-            score = self._calculate_match_score(agent, category, urgency_score)
-            if score > best_score:
-                best_score = score
-                best_agent = agent
-        
-        if best_agent:
+        while row is not None:
+            best_score = self._index_score(row, category) * (1.0 + 0.5 * urgency_score)
             # Assign ticket and reduce capacity
-            best_agent.current_capacity -= 1
+            remaining = self._take(row)
+            if remaining < 0:
+                # Another replica took the last slot: try the next best agent
+                row = self._best_available(category)
+                continue
+            self._log_capacity([row])
             return {
                 "ticket_id": ticket_id,
-                "agent_id": best_agent.agent_id,
-                "agent_name": best_agent.name,
+                "agent_id": self.agents.ids[row],
+                "agent_name": self.agents.names[row],
                 "match_score": best_score,
-                "agent_remaining_capacity": best_agent.current_capacity
+                "agent_remaining_capacity": remaining
             }
         
         return None
     
-    def route_batch(self, tickets: List[Dict]) -> List[Dict]:
+    @_locked
+    def route_batch(self, tickets: List[Dict]) -> Dict[str, List]:
         """
         Route multiple tickets using constraint optimization (Hungarian algorithm).
         tickets: [{"ticket_id": str, "category": str, "urgency_score": float}, ...]
+        Each agent is replicated into one column per unit of remaining capacity, the
+        k-th column scored with the capacity factor left after k assignments, so an
+        agent can take several tickets of a batch. Returns {"assignments": [...],
+        "unassigned": [ticket_id, ...]} (unassigned once total capacity runs out).
         """
-        available_agents = [a for a in self.agents.values() if a.current_capacity > 0]
+        self._maybe_sync(sorted({t["category"] for t in tickets}), self.capacity_sync_seconds)
+        available = np.flatnonzero(self.agents.capacity > 0)
+        
+        if not len(available) or not tickets:
+            return {"assignments": [], "unassigned": [t["ticket_id"] for t in tickets]}
         
-        if not available_agents or not tickets:
-            return []
+        # Skill matrix (agents x categories in this batch)
+        categories = sorted({t["category"] for t in tickets})
+        skills = self.agents.skill_columns(categories)[available].astype(np.float64)
+        capacity = self.agents.capacity[available]
+        max_capacity = self.agents.max_capacity[available].astype(np.float64)
         
-        # Build cost matrix (we want to maximize, so use negative scores)
-        n_tickets = len(tickets)
-        n_agents = len(available_agents)
-        cost_matrix = np.zeros((n_tickets, n_agents))
+        # One column per capacity slot; no agent can use more slots than there are tickets
+        slots = np.minimum(capacity, len(tickets))
+        slot_agent = np.repeat(np.arange(len(available)), slots)
+        slot_index = np.arange(len(slot_agent)) - np.repeat(np.cumsum(slots) - slots, slots)
+        slot_capacity = capacity[slot_agent] - slot_index
+        slot_max = max_capacity[slot_agent]
+        slot_factor = np.divide(slot_capacity, slot_max, out=np.zeros(len(slot_agent)), where=slot_max > 0)
         
-        for i, ticket in enumerate(tickets):
-            for j, agent in enumerate(available_agents):
-                score = self._calculate_match_score(
-                    agent, 
-                    ticket["category"], 
-                    ticket.get("urgency_score", 0.5)
-                )
-                cost_matrix[i, j] = -score  # Negative because we minimize cost
+        # Per category, every ticket ranks the slots the same way (the urgency weight only
+        # scales its row), and an optimal assignment never leaves a better slot free, so a
+        # ticket lands in one of its category's top len(tickets) slots: drop the rest
+        slot_values = skills[slot_agent] * slot_factor[:, None]
+        if len(slot_agent) > len(tickets):
+            keep = np.zeros(len(slot_agent), dtype=bool)
+            for c in range(len(categories)):
+                keep[np.argpartition(-slot_values[:, c], len(tickets) - 1)[:len(tickets)]] = True
+            slot_agent, slot_values = slot_agent[keep], slot_values[keep]
+        
+        # Score matrix (tickets x slots): skill_match * capacity_factor * urgency_weight
+        ticket_category = np.array([categories.index(t["category"]) for t in tickets])
+        urgency_weight = 1.0 + 0.5 * np.array([t.get("urgency_score", 0.5) for t in tickets])
+        scores = slot_values[:, ticket_category].T * urgency_weight[:, None]
         
         # Solve assignment problem
-        row_ind, col_ind = linear_sum_assignment(cost_matrix)
+        row_ind, col_ind = linear_sum_assignment(scores, maximize=True)
+        
+        # Take the slots (a ticket whose slot another replica took stays unassigned)
+        rows = available[slot_agent[col_ind]].tolist()
+        remaining = self._take_many(rows)
         
         # Build assignments
         assignments = []
-        for ticket_idx, agent_idx in zip(row_ind, col_ind):
-            ticket = tickets[ticket_idx]
-            agent = available_agents[agent_idx]
-            
-            if agent.current_capacity > 0:
-                agent.current_capacity -= 1
-                assignments.append({
-                    "ticket_id": ticket["ticket_id"],
-                    "agent_id": agent.agent_id,
-                    "agent_name": agent.name,
-                    "match_score": -cost_matrix[ticket_idx, agent_idx],
-                    "agent_remaining_capacity": agent.current_capacity
-                })
+        assigned_rows = set()
+        for ticket_idx, slot, row, left in zip(row_ind, col_ind, rows, remaining):
+            if left < 0:
+                continue
+            assigned_rows.add(int(ticket_idx))
+            assignments.append({
+                "ticket_id": tickets[ticket_idx]["ticket_id"],
+                "agent_id": self.agents.ids[row],
+                "agent_name": self.agents.names[row],
+                "match_score": float(scores[ticket_idx, slot]),
+                "agent_remaining_capacity": left
+            })
         
-        return assignments
+        unassigned = [t["ticket_id"] for i, t in enumerate(tickets) if i not in assigned_rows]
+        assigned = sorted(set(rows))
+        self._log_capacity(assigned)
+        return {"assignments": assignments, "unassigned": unassigned}
+    
+    @_locked
+    def greedy_match_score(self, tickets: List[Dict]) -> float:
+        """Total match score route_ticket would reach on `tickets`, in order, without assigning anything."""
+        available = np.flatnonzero(self.agents.capacity > 0)
+        if not len(available) or not tickets:
+            return 0.0
+        categories = sorted({t["category"] for t in tickets})
+        skills = self.agents.skill_columns(categories)[available].astype(np.float64)
+        capacity = self.agents.capacity[available].astype(np.float64)
+        max_capacity = self.agents.max_capacity[available].astype(np.float64)
+        total = 0.0
+        for ticket in tickets:
+            factor = np.divide(capacity, max_capacity, out=np.zeros(len(capacity)), where=max_capacity > 0)
+            scores = np.where(capacity > 0, skills[:, categories.index(ticket["category"])] * factor, -1.0)
+            best = int(np.argmax(scores))
+            if scores[best] < 0:
+                break
+            total += scores[best] * (1.0 + 0.5 * ticket.get("urgency_score", 0.5))
+            capacity[best] -= 1
+        return total
     
+    @_locked
     def release_capacity(self, agent_id: str, count: int = 1):
         """Release capacity when an agent completes a ticket."""
-        agent = self.agents.get(agent_id)
-        if agent:
-            agent.current_capacity = min(agent.current_capacity + count, agent.max_capacity)
+        if agent_id in self.agents:
+            row = self.agents.row(agent_id)
+            capacity = -1
+            if self.capacity_store is not None:
+                released = self._store_call(self.capacity_store.release, agent_id, count)
+                if released is not None:
+                    capacity = released
+            if capacity < 0:
+                capacity = min(self.agents._capacity.item(row) + count, self.agents._max_capacity.item(row))
+            self.agents._capacity[row] = capacity
+            self._reindex([row])
+            self._log_capacity([row])
     
+    @_locked
     def get_agent_status(self) -> List[Dict]:
         """Get status of all agents."""
+        self.sync_capacity()
+        capacity = self.agents.capacity.tolist()
+        max_capacity = self.agents.max_capacity.tolist()
         return [
             {
-                "agent_id": a.agent_id,
-                "name": a.name,
-                "skills": a.skill_vector,
-                "current_capacity": a.current_capacity,
-                "max_capacity": a.max_capacity,
-                "utilization": 1 - (a.current_capacity / a.max_capacity)
+                "agent_id": agent_id,
+                "name": self.agents.names[row],
+                "skills": self.agents.skill_vector(row),
+                "current_capacity": capacity[row],
+                "max_capacity": max_capacity[row],
+                "utilization": 1 - (capacity[row] / max_capacity[row])
             }
-            for a in self.agents.values()
+            for row, agent_id in enumerate(self.agents.ids)
         ]
 
+def _capacity_store():
+    """
+    AGENT_CAPACITY_BACKEND=memory (default, per process) or redis (AGENT_CAPACITY_REDIS_URL,
+    else REDIS_URL). If Redis can't be reached at startup, capacities stay in memory.
+    """
+    if os.getenv("AGENT_CAPACITY_BACKEND", "memory") != "redis":
+        return None
+    import redis
+    from .redis_capacity import RedisCapacityStore
+    url = os.getenv("AGENT_CAPACITY_REDIS_URL") or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    client = redis.Redis.from_url(url, socket_timeout=0.1)
+    try:
+        client.ping()
+    except redis.RedisError as e:
+        print(f"Agent capacity store unavailable ({e}), using in-memory capacities")
+        return None
+    return RedisCapacityStore(client, prefix=os.getenv("AGENT_CAPACITY_KEY", "agents:capacity"))
+
 # Global instance
 _skill_router = None
 
@@ -164,4 +514,11 @@ def get_skill_router():
     global _skill_router
     if _skill_router is None:
         _skill_router = SkillBasedRouter()
+        # WAL_DIR set: capacities are logged and replayed on startup
+        wal = open_wal("agents")
+        if wal is not None:
+            _skill_router.attach_wal(wal)
+        store = _capacity_store()
+        if store is not None:
+            _skill_router.attach_capacity_store(store, float(os.getenv("AGENT_CAPACITY_SYNC_SECONDS", "1.0")))
     return _skill_router
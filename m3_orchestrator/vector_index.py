@@ -0,0 +1,141 @@
+import numpy as np
+from typing import Dict, List, Optional, Set
+
+class BruteForceIndex:
+    """
+    Exact index over a time-ordered window of L2-normalized embeddings.
+    Storage is a preallocated ring buffer: an (capacity x dim) float32 matrix
+    with parallel timestamp and id arrays. A range query is one matrix-vector
+    product over the occupied slots; deleting by time advances the start pointer.
+    """
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        # Allocated on first insert, once the embedding dim is known
+        self._embeddings: Optional[np.ndarray] = None
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._ids = np.empty(capacity, dtype=object)
+        self._start = 0  # Slot of the oldest entry
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _segments(self) -> List[slice]:
+        """The occupied part of the ring as at most two contiguous slices, oldest first."""
+        end = self._start + self._size
+        if end <= self.capacity:
+            return [slice(self._start, end)]
+        return [slice(self._start, self.capacity), slice(0, end - self.capacity)]
+
+    def _drop_oldest(self, count: int):
+        """Advance the start pointer past the `count` oldest entries."""
+        slots = (self._start + np.arange(count)) % self.capacity
+        self._on_remove(slots)
+        self._ids[slots] = None
+        self._start = (self._start + count) % self.capacity
+        self._size -= count
+
+    def add(self, item_id: str, embedding: np.ndarray, timestamp: float):
+        """Insert a normalized embedding; overwrites the oldest entry when full."""
+        if self._embeddings is None:
+            self._embeddings = np.zeros((self.capacity, embedding.shape[0]), dtype=np.float32)
+        if self._size == self.capacity:
+            self._drop_oldest(1)
+        slot = (self._start + self._size) % self.capacity
+        self._embeddings[slot] = embedding
+        self._timestamps[slot] = timestamp
+        self._ids[slot] = item_id
+        self._size += 1
+        self._on_insert(slot, embedding)
+
+    def evict_before(self, cutoff: float) -> int:
+        """Delete every entry with timestamp < cutoff (entries are in time order)."""
+        evicted = 0
+        for segment in self._segments():
+            stale = int(np.searchsorted(self._timestamps[segment], cutoff, side="left"))
+            evicted += stale
+            if stale < segment.stop - segment.start:
+                break
+        if evicted:
+            self._drop_oldest(evicted)
+        return evicted
+
+    def range_query(self, embedding: np.ndarray, threshold: float) -> List[str]:
+        """Ids of entries with cosine similarity > threshold, oldest first."""
+        if self._size == 0:
+            return []
+        hits = []
+        for segment in self._segments():
+            similarities = self._embeddings[segment] @ embedding
+            hits.extend(self._ids[segment][np.flatnonzero(similarities > threshold)])
+        return hits
+
+    # Hooks for subclasses that maintain extra structures over the slots
+    def _on_insert(self, slot: int, embedding: np.ndarray):
+        pass
+
+    def _on_remove(self, slots: np.ndarray):
+        pass
+
+class LSHIndex(BruteForceIndex):
+    """
+    Approximate index using random-hyperplane LSH (SimHash) over the same ring buffer.
+    Each of `num_tables` tables hashes an embedding to `num_bits` sign bits; a query
+    only verifies the slots sharing a bucket with it in at least one table, so
+    the cost scales with the number of near neighbours rather than the window size.
+    Verification is exact, so results never contain false positives; recall is
+    below 1 for pairs close to the threshold (more tables = higher recall, more bits
+    = fewer candidates).
+    """
+    def __init__(self, capacity: int = 10000, num_tables: int = 12, num_bits: int = 10, seed: int = 0):
+        super().__init__(capacity)
+        self.num_tables = num_tables
+        self.num_bits = num_bits
+        self._rng = np.random.default_rng(seed)
+        self._planes: Optional[np.ndarray] = None  # (dim x tables*bits)
+        self._powers = (1 << np.arange(num_bits)).astype(np.int64)
+        self._codes = np.zeros((capacity, num_tables), dtype=np.int64)
+        self._buckets: List[Dict[int, Set[int]]] = [{} for _ in range(num_tables)]
+
+    def _hash(self, embedding: np.ndarray) -> np.ndarray:
+        if self._planes is None:
+            self._planes = self._rng.standard_normal((embedding.shape[0], self.num_tables * self.num_bits)).astype(np.float32)
+        bits = (embedding @ self._planes > 0).reshape(self.num_tables, self.num_bits)
+        return bits.astype(np.int64) @ self._powers
+
+    def _on_insert(self, slot: int, embedding: np.ndarray):
+        codes = self._hash(embedding)
+        self._codes[slot] = codes
+        for table, code in zip(self._buckets, codes.tolist()):
+            table.setdefault(code, set()).add(slot)
+
+    def _on_remove(self, slots: np.ndarray):
+        for slot in slots.tolist():
+            for table, code in zip(self._buckets, self._codes[slot].tolist()):
+                bucket = table[code]
+                bucket.discard(slot)
+                if not bucket:
+                    del table[code]
+
+    def range_query(self, embedding: np.ndarray, threshold: float) -> List[str]:
+        if self._size == 0:
+            return []
+        candidates: Set[int] = set()
+        for table, code in zip(self._buckets, self._hash(embedding).tolist()):
+            candidates.update(table.get(code, ()))
+        if not candidates:
+            return []
+        # Oldest first, to match the exact index
+        slots = np.array(sorted(candidates, key=lambda s: (s - self._start) % self.capacity))
+        similarities = self._embeddings[slots] @ embedding
+        return list(self._ids[slots[similarities > threshold]])
+
+INDEX_BACKENDS = {
+    "exact": BruteForceIndex,
+    "lsh": LSHIndex,
+}
+
+def create_index(backend: str = "exact", capacity: int = 10000, **kwargs):
+    if backend not in INDEX_BACKENDS:
+        raise ValueError(f"Unknown index backend '{backend}', expected one of {list(INDEX_BACKENDS)}")
+    return INDEX_BACKENDS[backend](capacity=capacity, **kwargs)
@@ -1,15 +1,29 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from m1_mvr.router import router as mvr_router
 from m2_advanced.router import router as advanced_router
 from m3_orchestrator.router import router as orchestrator_router
+from core.model_registry import get_model_registry, warmup_models_from_env
+from core.executor import ExecutorSaturated, get_inference_executor, shutdown_inference_executor
+from core.wal import close_wals
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Models load in the background so the server binds (and /health/live answers) immediately.
+    # Set WARMUP_MODELS, e.g. "baseline,embedder,advanced", to pick what this deployment preloads.
+    get_model_registry().warm_up(warmup_models_from_env())
+    yield
+    shutdown_inference_executor()
+    close_wals()
 
 app = FastAPI(
     title="Smart-Support Ticket Routing Engine",
     description="Hackathon Challenge: High-throughput, intelligent routing engine for SaaS support tickets.",
-    version="3.0.0"
+    version="3.0.0",
+    lifespan=lifespan
 )
 
 # Setup templates
@@ -20,6 +34,15 @@ app.include_router(mvr_router)
 app.include_router(advanced_router)
 app.include_router(orchestrator_router)
 
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    """Back-pressure: shed load with 429 instead of queueing unboundedly behind slow models."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"}
+    )
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Serve the frontend UI"""
@@ -27,7 +50,30 @@ async def home(request: Request):
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok", "message": "Ticket Routing Engine is running"}
+    registry = get_model_registry()
+    return {
+        "status": "ok",
+        "message": "Ticket Routing Engine is running",
+        "live": True,
+        "ready": registry.is_ready(),
+        "models": registry.get_status(),
+        "inference_executor": get_inference_executor().get_stats()
+    }
+
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness: the process is up and serving requests."""
+    return {"live": True}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: every model requested for warm-up has finished loading."""
+    registry = get_model_registry()
+    ready = registry.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "models": registry.get_status()}
+    )
 
 if __name__ == "__main__":
     import uvicorn
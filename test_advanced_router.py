@@ -0,0 +1,37 @@
+import asyncio
+import fakeredis
+import pytest
+from fastapi import HTTPException
+
+import m2_advanced.router as advanced_router
+from core.circuit_breaker import CircuitBreaker
+
+class SlowRedis(fakeredis.aioredis.FakeRedis):
+    """SET lands in Redis, then the reply takes longer than the breaker deadline."""
+    async def set(self, *args, **kwargs):
+        result = await super().set(*args, **kwargs)
+        await asyncio.sleep(1)
+        return result
+
+def request(ticket_id):
+    return advanced_router.AdvancedTicketRequest(ticket_id=ticket_id, text="Server down", user_id="u1")
+
+def post(monkeypatch, client, ticket_id):
+    pytest.importorskip("lupa")
+    monkeypatch.setattr(advanced_router, "redis_client", client)
+    breaker = CircuitBreaker(name="redis", latency_threshold=0.1)
+    monkeypatch.setattr(advanced_router, "get_circuit_breaker", lambda name: breaker)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(advanced_router.process_ticket_async(request(ticket_id)))
+    return error.value.status_code
+
+def test_timed_out_lock_is_released_for_the_retry(monkeypatch):
+    client = SlowRedis(decode_responses=True)
+    assert post(monkeypatch, client, "t1") == 503
+    assert asyncio.run(client.exists("lock:ticket:t1")) == 0
+
+def test_fallback_leaves_a_duplicates_lock_alone(monkeypatch):
+    client = SlowRedis(decode_responses=True)
+    asyncio.run(fakeredis.aioredis.FakeRedis.set(client, "lock:ticket:t2", "other-request", ex=300))
+    assert post(monkeypatch, client, "t2") == 503
+    assert asyncio.run(client.get("lock:ticket:t2")) == "other-request"
@@ -0,0 +1,104 @@
+import json
+import time
+import asyncio
+import threading
+import fakeredis
+import pytest
+from m2_advanced.batch_consumer import BatchConsumer
+
+def make_consumer(seen_batches, webhooks=None, **kwargs):
+    def classify(texts):
+        seen_batches.append(list(texts))
+        return [{"category": "Technical", "urgency_score": 0.95 if "down" in text else 0.2} for text in texts]
+
+    async def webhook(ticket_id, urgency_score, category):
+        await asyncio.sleep(0.1)
+        webhooks.append(ticket_id)
+
+    return BatchConsumer(fakeredis.FakeRedis(), classify, webhook_fn=webhook, **kwargs)
+
+def test_batches_are_capped_and_results_written():
+    seen_batches = []
+    consumer = make_consumer(seen_batches, max_batch=3, max_wait_ms=20)
+    for i in range(5):
+        consumer.enqueue(f"t{i}", f"ticket {i}", "u1")
+    assert [r["ticket_id"] for r in consumer.drain()] == ["t0", "t1", "t2"]
+    assert [r["ticket_id"] for r in consumer.drain()] == ["t3", "t4"]
+    assert seen_batches == [["ticket 0", "ticket 1", "ticket 2"], ["ticket 3", "ticket 4"]]
+    stored = json.loads(consumer.redis.get("advanced:result:t4"))
+    assert stored["category"] == "Technical" and stored["status"] == "processed"
+    assert 0 < consumer.redis.ttl("advanced:result:t4") <= 86400
+
+def test_pull_waits_for_the_batch_to_fill():
+    consumer = make_consumer([], max_batch=4, max_wait_ms=50)
+    # Nothing pending: empty once the wait runs out
+    assert consumer.drain() == []
+
+    consumer.max_wait = 2
+    consumer.enqueue("first", "a", "u1")
+    threading.Timer(0.05, lambda: [consumer.enqueue(f"late{i}", "b", "u1") for i in range(3)]).start()
+    start = time.monotonic()
+    assert [r["ticket_id"] for r in consumer.drain()] == ["first", "late0", "late1", "late2"]
+    # Full batch: returned before the wait ran out
+    assert time.monotonic() - start < 1
+
+def test_webhooks_fire_concurrently():
+    webhooks = []
+    consumer = make_consumer([], webhooks, max_batch=10, max_wait_ms=0)
+    for i in range(5):
+        consumer.enqueue(f"urgent{i}", "server is down", "u1")
+    consumer.enqueue("calm", "question about invoices", "u1")
+    start = time.monotonic()
+    consumer.drain()
+    assert sorted(webhooks) == [f"urgent{i}" for i in range(5)]
+    assert time.monotonic() - start < 0.4  # Five 0.1s webhooks in parallel
+
+def test_handoff_schedules_one_drain_while_tickets_wait():
+    consumer = make_consumer([], max_batch=2, max_wait_ms=0)
+    scheduled = []
+    for i in range(3):
+        consumer.enqueue(f"t{i}", "text", "u1")
+    consumer.redis.set(consumer.scheduled_key, 1)  # The producer's claim
+    consumer.drain(schedule=lambda: scheduled.append(1))
+    assert scheduled == [1] and consumer.redis.get(consumer.scheduled_key)
+    consumer.drain(schedule=lambda: scheduled.append(1))
+    # Queue empty: the flag is released so the next producer schedules a drain
+    assert scheduled == [1] and consumer.redis.get(consumer.scheduled_key) is None
+
+def test_failed_batch_goes_back_on_the_list():
+    consumer = make_consumer([], max_batch=2, max_wait_ms=0)
+    healthy = consumer.classify_fn
+    scheduled = []
+
+    def broken(texts):
+        raise RuntimeError("model crashed")
+
+    for i in range(3):
+        consumer.enqueue(f"t{i}", f"ticket {i}", "u1")
+    consumer.classify_fn = broken
+    consumer.redis.set(consumer.scheduled_key, 1)
+    with pytest.raises(RuntimeError):
+        consumer.drain(schedule=lambda: scheduled.append(1))
+    # Nothing lost, order kept, and a drain is scheduled to retry
+    pending = [json.loads(item)["ticket_id"] for item in consumer.redis.lrange(consumer.pending_key, 0, -1)]
+    assert pending == ["t0", "t1", "t2"]
+    assert scheduled and consumer.redis.get(consumer.scheduled_key)
+    assert consumer.redis.get("advanced:result:t0") is None
+
+    consumer.classify_fn = healthy
+    assert [r["ticket_id"] for r in consumer.drain()] == ["t0", "t1"]
+
+def test_failed_pull_keeps_tickets_and_frees_the_flag():
+    consumer = make_consumer([], max_batch=4, max_wait_ms=1000)
+    consumer.enqueue("t0", "ticket", "u1")
+    consumer.redis.set(consumer.scheduled_key, 1)
+
+    def lost_connection(*args, **kwargs):
+        raise ConnectionError("redis went away")
+
+    consumer.redis.blpop = lost_connection
+    with pytest.raises(ConnectionError):
+        consumer.drain(schedule=lambda: None)
+    assert consumer.redis.llen(consumer.pending_key) == 1
+    # The queue is not empty, so the handoff re-claimed the flag for a new drain
+    assert consumer.redis.get(consumer.scheduled_key)
@@ -0,0 +1,58 @@
+import asyncio
+from m2_advanced.batcher import MicroBatcher
+
+def test_concurrent_submissions_share_a_batch():
+    seen_batches = []
+    batcher = MicroBatcher(lambda items: seen_batches.append(list(items)) or [i * 2 for i in items],
+                           max_batch_size=8, max_wait_ms=200)
+
+    futures = [batcher.submit(i) for i in range(5)]
+    assert [f.result(timeout=5) for f in futures] == [0, 2, 4, 6, 8]
+    assert seen_batches == [[0, 1, 2, 3, 4]]
+
+    stats = batcher.get_stats()
+    assert stats["batch_size_histogram"] == {"5": 1}
+    assert stats["items"] == 5
+
+def test_batches_are_capped_at_max_size():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=4, max_wait_ms=200)
+    futures = [batcher.submit(i) for i in range(10)]
+    assert [f.result(timeout=5) for f in futures] == list(range(10))
+    assert max(int(size) for size in batcher.get_stats()["batch_size_histogram"]) <= 4
+
+def test_async_callers_and_errors_fan_out():
+    def failing(items):
+        raise RuntimeError("model crashed")
+
+    batcher = MicroBatcher(failing, max_batch_size=4, max_wait_ms=50)
+
+    async def scenario():
+        results = await asyncio.gather(
+            batcher.analyze_async("a"), batcher.analyze_async("b"), return_exceptions=True
+        )
+        return results
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+def test_short_result_lists_fail_every_caller():
+    # e.g. a pipeline that collapses its input into one bare dict
+    batcher = MicroBatcher(lambda items: [{"label": "x"}], max_batch_size=4, max_wait_ms=100)
+    futures = [batcher.submit(i) for i in range(3)]
+    for future in futures:
+        assert isinstance(future.exception(timeout=5), RuntimeError)
+
+def test_batches_group_items_by_length_bucket():
+    seen_batches = []
+    batcher = MicroBatcher(lambda items: seen_batches.append(list(items)) or items,
+                           max_batch_size=8, max_wait_ms=200,
+                           length_fn=len, length_buckets=[10, 100])
+
+    items = ["short", "x" * 500, "tiny", "y" * 50, "ok", "z" * 400]
+    futures = [batcher.submit(item) for item in items]
+    assert [f.result(timeout=5) for f in futures] == items
+    assert sorted(seen_batches, key=len) == [["y" * 50], ["x" * 500, "z" * 400], ["short", "tiny", "ok"]]
+
+    stats = batcher.get_stats()
+    assert stats["tokens_processed"] == sum(len(item) for item in items)
+    assert stats["padding_efficiency"] > 0.8
@@ -0,0 +1,58 @@
+import fakeredis
+import numpy as np
+from core.cache import ContentCache, normalize_text, encode_embedding, decode_embedding
+
+def test_normalized_text_shares_an_entry():
+    assert normalize_text("  The API is\nreturning 500  ") == "the api is returning 500"
+    cache = ContentCache("test")
+    calls = []
+    compute = lambda texts: calls.append(list(texts)) or [t.upper() for t in texts]
+
+    first = cache.get_or_compute(["API down", "api   DOWN", "Billing"], compute)
+    assert calls == [["API down", "Billing"]]  # repeats within a batch computed once
+    assert first == ["API DOWN", "API DOWN", "BILLING"]
+
+    cache.get_or_compute(["api down"], compute)
+    assert len(calls) == 1
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 3
+
+def test_lru_and_ttl_eviction():
+    cache = ContentCache("test", max_entries=2, ttl=0.0)
+    cache.set_many(["a", "b", "c"], [1, 2, 3])
+    assert len(cache) == 2
+    assert cache.get_stats()["evictions"] == 1
+    # ttl=0: everything has already expired
+    assert cache.get_many(["b", "c"]) == [None, None]
+
+    cache = ContentCache("test", max_entries=2)
+    cache.set_many(["a", "b"], [1, 2])
+    cache.get_many(["a"])  # a becomes most recently used
+    cache.set_many(["c"], [3])
+    assert cache.get_many(["a", "b", "c"]) == [1, None, 3]
+
+def test_redis_tier_is_shared_between_replicas():
+    server = fakeredis.FakeServer()
+    replica_a = ContentCache("embedding", redis_client=fakeredis.FakeRedis(server=server),
+                             encode=encode_embedding, decode=decode_embedding)
+    replica_b = ContentCache("embedding", redis_client=fakeredis.FakeRedis(server=server),
+                             encode=encode_embedding, decode=decode_embedding)
+    vector = np.array([0.6, 0.8], dtype=np.float32)
+    replica_a.set_many(["The API is down"], [vector])
+
+    (cached,) = replica_b.get_many(["the api is down"])
+    assert np.array_equal(cached, vector)
+    assert replica_b.get_stats()["redis_hits"] == 1
+
+class BrokenRedis:
+    def mget(self, keys):
+        raise ConnectionError("redis unavailable")
+
+    def pipeline(self, transaction=False):
+        raise ConnectionError("redis unavailable")
+
+def test_redis_errors_degrade_to_local_cache():
+    cache = ContentCache("test", redis_client=BrokenRedis())
+    assert cache.get_or_compute(["x"], lambda texts: [len(t) for t in texts]) == [1]
+    assert cache.get_many(["x"]) == [1]
+    assert cache.get_stats()["redis_errors"] == 2
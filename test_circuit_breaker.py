@@ -0,0 +1,132 @@
+import time
+import threading
+import asyncio
+from m3_orchestrator.circuit_breaker import CircuitBreaker, CircuitState, RollingWindow
+
+def after(seconds, value):
+    async def run():
+        await asyncio.sleep(seconds)
+        return value
+    return run
+
+def test_slow_primary_is_abandoned_at_the_deadline():
+    breaker = CircuitBreaker(latency_threshold=0.05)
+    start = time.monotonic()
+    result = asyncio.run(breaker.call_async(after(1.0, "primary"), after(0.0, "fallback")))
+    elapsed = time.monotonic() - start
+
+    assert result == ("fallback", "baseline")
+    assert elapsed < 0.5  # Not primary time + fallback time
+    assert breaker.failure_count == 1 and breaker.timeout_count == 1
+
+def test_fast_primary_wins_and_counts_as_success():
+    breaker = CircuitBreaker(latency_threshold=0.5)
+    breaker.failure_count = 2
+    assert asyncio.run(breaker.call_async(after(0.0, "primary"), after(0.0, "fallback"))) == ("primary", "transformer")
+    assert breaker.failure_count == 0
+
+def test_hedged_call_returns_the_first_result():
+    async def scenario():
+        breaker = CircuitBreaker(latency_threshold=0.2)
+        hedged = await breaker.call_async(after(0.15, "primary"), after(0.0, "fallback"), hedge_delay=0.02)
+        # The losing primary still finishes before the deadline and is recorded as a success
+        await asyncio.sleep(0.2)
+        return breaker, hedged
+
+    breaker, hedged = asyncio.run(scenario())
+    assert hedged == ("fallback", "baseline")
+    assert breaker.hedge_count == 1 and breaker.hedge_wins == 1
+    assert breaker.failure_count == 0
+
+def test_failures_open_the_circuit_and_skip_the_primary():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+
+    async def failing():
+        raise RuntimeError("model crashed")
+
+    calls = []
+    async def primary():
+        calls.append(1)
+        return "primary"
+
+    for _ in range(2):
+        assert asyncio.run(breaker.call_async(failing, after(0.0, "fallback")))[1] == "baseline"
+    assert breaker.state == CircuitState.OPEN
+    assert asyncio.run(breaker.call_async(primary, after(0.0, "fallback"))) == ("fallback", "baseline")
+    assert calls == []
+
+def test_rolling_window_percentiles_and_expiry():
+    window = RollingWindow(window_seconds=10, bucket_seconds=1)
+    for i in range(100):
+        window.record(0.010 if i < 90 else 0.400, error=i >= 95, now=100.0)
+    stats = window.snapshot(100.0)
+    assert stats["calls"] == 100 and stats["errors"] == 5
+    assert 8 <= stats["p50_ms"] <= 12
+    assert 300 <= stats["p99_ms"] <= 450
+    # Buckets older than the window no longer count
+    assert window.snapshot(111.0)["calls"] == 0
+
+def test_error_rate_trips_without_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=0, min_calls=10, error_rate_threshold=0.5)
+    for i in range(20):
+        breaker.record(0.01, ok=i % 2 == 0)  # Alternating: never 2 failures in a row
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.get_state()["trip_reason"].startswith("error rate")
+
+def test_latency_percentile_trips_on_slow_successes():
+    breaker = CircuitBreaker(latency_threshold=0.5, failure_threshold=0, min_calls=10, latency_slo=0.1)
+    for _ in range(10):
+        breaker.record(0.3, ok=True)
+    assert breaker.state == CircuitState.OPEN
+    assert "p95" in breaker.trip_reason
+
+def test_half_open_limits_concurrent_probes():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0, half_open_max_probes=1)
+    breaker.record(0.01, ok=False)
+    assert breaker.state == CircuitState.OPEN
+
+    assert breaker.allow() is True     # First caller becomes the probe
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow() is False    # Others get the fallback while it is in flight
+    breaker.record(0.01, ok=True, probe=True)
+    assert breaker.allow() is True
+    breaker.record(0.01, ok=True, probe=True)
+    assert breaker.state == CircuitState.CLOSED
+
+def test_cancelled_half_open_call_frees_its_probe():
+    async def scenario():
+        breaker = CircuitBreaker(latency_threshold=1.0, failure_threshold=1, recovery_timeout=0)
+        breaker.record(0.01, ok=False)
+        started = []
+
+        async def slow_primary():
+            started.append(1)
+            await asyncio.sleep(5)
+
+        for hedge_delay in (None, 0.01):
+            await asyncio.sleep(0.01)
+            call = asyncio.ensure_future(breaker.call_async(slow_primary, after(5, "fallback"), hedge_delay=hedge_delay))
+            await asyncio.sleep(0.05)
+            assert breaker.state == CircuitState.HALF_OPEN
+            call.cancel()
+            await asyncio.gather(call, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        # Primary and hedge were cancelled, not orphaned
+        orphans = [t for t in asyncio.all_tasks() if t is not asyncio.current_task() and not t.done()]
+        # The slot was freed: the next call is a probe again, not an instant fallback
+        result = await breaker.call_async(after(0.0, "primary"), after(0.0, "fallback"))
+        return started, result, orphans
+
+    started, result, orphans = asyncio.run(scenario())
+    assert len(started) == 2 and orphans == []
+    assert result == ("primary", "transformer")
+
+def test_breaker_is_thread_safe():
+    breaker = CircuitBreaker(failure_threshold=0, min_calls=10**9)
+    threads = [threading.Thread(target=lambda: [breaker.call(lambda: 1, lambda: 0) for _ in range(500)])
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert breaker.get_state()["window"]["calls"] == 4000
@@ -0,0 +1,52 @@
+import numpy as np
+from core.model_registry import get_model_registry
+from m2_advanced.embedding_heads import EmbeddingHeads, LinearHead, _load_embedding_heads
+from m2_advanced.features import TicketFeatures
+from m2_advanced.ml_transformers import AdvancedClassifier
+
+def toy_heads():
+    # Three well-separated clusters, with the last dimension marking urgency
+    X = np.array([
+        [1, 0, 0, 0], [0.9, 0.1, 0, 1],
+        [0, 1, 0, 0], [0.1, 0.9, 0, 1],
+        [0, 0, 1, 0], [0, 0.1, 0.9, 1],
+    ], dtype=np.float32)
+    categories = ["Billing", "Billing", "Technical", "Technical", "Legal", "Legal"]
+    urgency = ["normal", "urgent"] * 3
+    return EmbeddingHeads(
+        LinearHead(["Billing", "Technical", "Legal"], 4).fit(X, categories),
+        LinearHead(["normal", "urgent"], 4).fit(X, urgency)
+    )
+
+def test_linear_heads_learn_categories_and_urgency():
+    heads = toy_heads()
+    results = heads.classify_embeddings(np.array([[1, 0, 0, 0], [0, 0, 1, 1]], dtype=np.float32))
+    assert [r["labels"][0] for r in results] == ["Billing", "Legal"]
+    normal, urgent = heads.urgency_scores(np.array([[0, 1, 0, 0], [0, 1, 0, 1]], dtype=np.float32))
+    assert urgent > 0.5 > normal
+
+def test_heads_round_trip_through_npz(tmp_path):
+    heads = toy_heads()
+    path = str(tmp_path / "heads.npz")
+    heads.save(path)
+    loaded = EmbeddingHeads.load(path)
+    X = np.eye(4, dtype=np.float32)
+    assert np.allclose(heads.category_head.predict_proba(X), loaded.category_head.predict_proba(X))
+    assert loaded.urgency_head.labels == ["normal", "urgent"]
+
+def test_shared_embedding_mode_reuses_precomputed_embeddings():
+    registry = get_model_registry()
+    registry.register("embedding_heads", toy_heads)
+    try:
+        classifier = AdvancedClassifier(mode="shared_embedding")
+        # Embeddings are already attached, so no encoder pass is needed
+        features = [
+            TicketFeatures("invoice question", np.array([1, 0, 0, 0], dtype=np.float32)),
+            TicketFeatures("login fails", np.array([0, 1, 0, 1], dtype=np.float32)),
+        ]
+        results = classifier.analyze_features(features)
+        assert [r["category"] for r in results] == ["Billing", "Technical"]
+        assert results[1]["urgency_score"] > results[0]["urgency_score"]
+    finally:
+        registry.unload("embedding_heads")
+        registry.register("embedding_heads", _load_embedding_heads)
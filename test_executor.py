@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import pytest
+from core.executor import InferenceExecutor, ExecutorSaturated
+from m1_mvr.ml_baseline import classify_baseline
+
+def test_executor_rejects_when_saturated():
+    executor = InferenceExecutor(thread_workers=1, max_pending=2)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(lambda: None)
+        release.set()
+        await asyncio.gather(*blocked)
+        # Capacity is returned once the blocked calls finish
+        assert await executor.run(lambda: 42) == 42
+
+    asyncio.run(scenario())
+    assert executor.get_stats()["rejected"] == 1
+    executor.shutdown()
+
+def test_cancelled_calls_hold_their_slot_until_the_work_finishes():
+    executor = InferenceExecutor(thread_workers=2, max_pending=2)
+    release = threading.Event()
+
+    async def scenario():
+        # Two running calls, both abandoned by their callers (e.g. a deadline)
+        for _ in range(2):
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(executor.run(release.wait), timeout=0.05)
+        # Their work is still running in the pool, so there is no room for more
+        assert executor.get_stats()["pending"] == 2
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(lambda: None)
+        release.set()
+        await asyncio.sleep(0.05)
+        assert executor.get_stats()["pending"] == 0
+        assert await executor.run(lambda: 42) == 42
+
+    asyncio.run(scenario())
+    executor.shutdown()
+
+def test_executor_runs_baseline_in_process_pool():
+    executor = InferenceExecutor(thread_workers=1, process_workers=1)
+
+    async def scenario():
+        return await executor.run(classify_baseline, "My credit card was charged twice.", pool="process")
+
+    assert asyncio.run(scenario()) == "Billing"
+    executor.shutdown()
@@ -0,0 +1,18 @@
+import pytest
+from m2_advanced.inference_backends import backend_for
+
+def test_backend_is_chosen_per_model(monkeypatch):
+    monkeypatch.delenv("INFERENCE_BACKEND", raising=False)
+    monkeypatch.delenv("INFERENCE_BACKEND_SENTIMENT", raising=False)
+    monkeypatch.setenv("INFERENCE_BACKEND_EMBEDDER", "onnx")
+    assert backend_for("embedder") == "onnx"
+    assert backend_for("sentiment") == "fp32"
+
+    monkeypatch.setenv("INFERENCE_BACKEND", "int8")
+    assert backend_for("sentiment") == "int8"
+    assert backend_for("embedder") == "onnx"
+
+def test_unknown_backend_is_rejected(monkeypatch):
+    monkeypatch.setenv("INFERENCE_BACKEND_ZERO_SHOT", "fp16")
+    with pytest.raises(ValueError):
+        backend_for("zero_shot")
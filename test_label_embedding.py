@@ -0,0 +1,25 @@
+import numpy as np
+from m2_advanced.label_embedding import LabelEmbeddingClassifier
+
+VOCAB = ["invoice", "charged", "payment", "error", "crash", "api", "contract", "gdpr", "legal"]
+
+def bag_of_words(texts):
+    """Tiny deterministic encoder so the classifier math can be tested without MiniLM."""
+    return np.array([[text.lower().count(word) for word in VOCAB] for text in texts], dtype=np.float32)
+
+def make_classifier():
+    return LabelEmbeddingClassifier(
+        bag_of_words,
+        label_descriptions={"Billing": "invoice payment", "Technical": "error crash api", "Legal": "contract gdpr legal"},
+        exemplars={"Billing": ["I was charged twice"]}
+    )
+
+def test_label_embedding_picks_closest_prototype():
+    classifier = make_classifier()
+    results = classifier.classify(["My invoice looks wrong", "The api keeps throwing an error", "Send the contract"])
+    assert [r["labels"][0] for r in results] == ["Billing", "Technical", "Legal"]
+
+def test_label_embedding_scores_are_probabilities():
+    result = make_classifier().classify(["The api crashed"])[0]
+    assert abs(sum(result["scores"]) - 1.0) < 1e-5
+    assert result["scores"] == sorted(result["scores"], reverse=True)
@@ -0,0 +1,37 @@
+from fastapi.testclient import TestClient
+from core.model_registry import ModelRegistry, get_model_registry
+from main import app
+
+def test_registry_loads_lazily_and_once():
+    registry = ModelRegistry()
+    calls = []
+    registry.register("dummy", lambda: calls.append(1) or object())
+
+    assert not registry.is_loaded("dummy")
+    assert registry.get_status()["dummy"]["state"] == "registered"
+
+    first = registry.get("dummy")
+    second = registry.get("dummy")
+    assert first is second
+    assert len(calls) == 1
+    assert registry.get_status()["dummy"]["state"] == "ready"
+
+def test_registry_warm_up_reports_readiness():
+    registry = ModelRegistry()
+    registry.register("dummy", object)
+    registry.warm_up(["dummy"]).join(timeout=5)
+    assert registry.is_ready()
+
+def test_importing_app_does_not_load_transformer_models():
+    registry = get_model_registry()
+    assert not registry.is_loaded("advanced")
+    assert not registry.is_loaded("embedder")
+
+def test_health_reports_liveness_and_models():
+    client = TestClient(app)
+    response = client.get("/health")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["live"] is True
+    assert "advanced" in data["models"]
+    assert client.get("/health/live").json() == {"live": True}
@@ -1,8 +1,16 @@
+import pytest
 from fastapi.testclient import TestClient
 from main import app
+from m1_mvr.router import queue_manager
 
 client = TestClient(app)
 
+@pytest.fixture(autouse=True)
+def empty_queue():
+    # The MVR queue is module-level state shared by every test
+    queue_manager.clear()
+    yield
+
 def test_mvr_classification_billing():
     response = client.post("/mvr/ticket", json={
         "text": "I need help with my invoice.",
@@ -41,3 +49,24 @@ def test_mvr_queue_order():
     data = response.json()
     assert data["user_id"] == "user999"
     assert data["urgency"] is True
+
+def test_mvr_batch_classification():
+    response = client.post("/mvr/tickets:batch", json={"tickets": [
+        {"text": "I need help with my invoice.", "user_id": "user1"},
+        {"text": "The API is returning 500 errors, fix it ASAP!", "user_id": "user2"},
+        {"text": "Our legal team wants to review the contract.", "user_id": "user3"},
+    ]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 3
+    assert [t["category"] for t in data["tickets"]] == ["Billing", "Technical", "Legal"]
+    assert [t["urgency"] for t in data["tickets"]] == [False, True, False]
+    assert len(queue_manager) == 3
+
+def test_mvr_batch_respects_priority():
+    client.post("/mvr/tickets:batch", json={"tickets": [
+        {"text": "General question about terms", "user_id": "normal"},
+        {"text": "Emergency! Server is down", "user_id": "urgent"},
+    ]})
+    assert client.get("/mvr/queue/next").json()["user_id"] == "urgent"
+    assert client.get("/mvr/queue/next").json()["user_id"] == "normal"
@@ -0,0 +1,19 @@
+from m2_advanced.preprocess import count_tokens, truncate_text, ELLIPSIS
+
+STACK_TRACE = "Checkout fails for every customer:\n" + "\n".join(
+    f'  File "shop/cart.py", line {i}, in step_{i}' for i in range(300)
+) + "\nKeyError: 'currency'"
+
+def test_short_tickets_are_unchanged():
+    text = "I was charged twice for my subscription."
+    assert truncate_text(text, budget=64) == text
+    assert truncate_text(STACK_TRACE, budget=0) == STACK_TRACE
+
+def test_stack_traces_keep_head_and_tail_within_budget():
+    truncated = truncate_text(STACK_TRACE, budget=64)
+    assert count_tokens(truncated) == 64
+    assert truncated.startswith("Checkout fails for every customer")
+    assert truncated.endswith("KeyError: 'currency'")
+    assert ELLIPSIS in truncated
+    # Already within budget, so truncating again changes nothing
+    assert truncate_text(truncated, budget=64) == truncated
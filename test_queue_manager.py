@@ -0,0 +1,89 @@
+import time
+import threading
+from m1_mvr.queue_manager import TicketQueueManager
+from m1_mvr.sla import SLAPolicy
+
+def ticket(ticket_id, category="Technical"):
+    return {"ticket_id": ticket_id, "category": category}
+
+def test_continuous_priorities_and_fifo_across_shards():
+    queue = TicketQueueManager()
+    queue.add_ticket("low", 0.2, ticket("low", "Billing"))
+    queue.add_ticket("first_high", 0.9, ticket("first_high", "Legal"))
+    queue.add_ticket("mid", 0.5, ticket("mid"))
+    queue.add_ticket("second_high", 0.9, ticket("second_high", "Billing"))
+    queue.add_ticket("urgent_bool", True, ticket("urgent_bool"))
+
+    order = [queue.get_next_ticket()["ticket_id"] for _ in range(5)]
+    assert order == ["urgent_bool", "first_high", "second_high", "mid", "low"]
+    assert queue.get_next_ticket() is None
+
+def test_pop_n_and_bulk_insert():
+    queue = TicketQueueManager()
+    queue.add_tickets((f"t{i}", i / 10, ticket(f"t{i}", ["Billing", "Legal"][i % 2])) for i in range(10))
+    assert queue.get_stats()["shards"] == {"Billing": 5, "Legal": 5}
+    assert [t["ticket_id"] for t in queue.pop_n(3)] == ["t9", "t8", "t7"]
+    assert len(queue.pop_n(100)) == 7
+    assert queue.pop_n(5) == []
+
+def test_blocking_pop_waits_for_a_producer():
+    queue = TicketQueueManager()
+    start = time.monotonic()
+    assert queue.get_next_ticket(block=True, timeout=0.05) is None
+    assert time.monotonic() - start >= 0.04
+
+    threading.Timer(0.05, lambda: queue.add_ticket("late", False, ticket("late"))).start()
+    assert queue.get_next_ticket(block=True, timeout=5)["ticket_id"] == "late"
+
+def test_concurrent_producers_and_consumers_lose_nothing():
+    queue = TicketQueueManager()
+    consumed = []
+    consumed_lock = threading.Lock()
+
+    def produce(worker):
+        for i in range(500):
+            queue.add_ticket(f"{worker}-{i}", (i % 7) / 7, ticket(f"{worker}-{i}", ["Billing", "Technical", "Legal"][i % 3]))
+
+    def consume():
+        while True:
+            batch = queue.pop_n(16, block=True, timeout=0.2)
+            if not batch:
+                return
+            with consumed_lock:
+                consumed.extend(t["ticket_id"] for t in batch)
+
+    threads = [threading.Thread(target=produce, args=(w,)) for w in range(4)]
+    threads += [threading.Thread(target=consume) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(consumed) == 2000 and len(set(consumed)) == 2000
+    assert len(queue) == 0
+
+def test_sla_scheduling_serves_old_normal_tickets_before_new_urgent_ones():
+    policy = SLAPolicy({"Technical": 3600}, urgent_fraction=0.1)
+    queue = TicketQueueManager(scheduling="sla", sla_policy=policy)
+    now = time.time()
+    # Waiting 58 minutes of its 60: due before a fresh urgent ticket (6 minute SLA)
+    queue.add_ticket("old_normal", 0.0, {**ticket("old_normal"), "enqueued_at": now - 3480})
+    queue.add_ticket("new_urgent", 1.0, {**ticket("new_urgent"), "enqueued_at": now})
+    queue.add_ticket("new_normal", 0.0, {**ticket("new_normal"), "enqueued_at": now})
+
+    popped = queue.pop_n(3)
+    assert [t["ticket_id"] for t in popped] == ["old_normal", "new_urgent", "new_normal"]
+    assert popped[1]["sla_deadline"] == now + 360
+
+def test_update_urgency_reorders_without_duplicates():
+    queue = TicketQueueManager()
+    for i in range(5):
+        queue.add_ticket(f"t{i}", 0.5, ticket(f"t{i}"))
+    assert queue.update_urgency("t3", 0.9)
+    assert queue.update_urgency("t4", 0.1)
+    assert not queue.update_urgency("missing", 1.0)
+    assert len(queue) == 5
+
+    assert queue.get_next_ticket()["ticket_id"] == "t3"
+    assert [t["ticket_id"] for t in queue.pop_n(10)] == ["t0", "t1", "t2", "t4"]
+    assert len(queue) == 0 and queue.get_next_ticket() is None
+    assert not queue.update_urgency("t3", 1.0)
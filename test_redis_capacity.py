@@ -0,0 +1,140 @@
+import random
+import asyncio
+import threading
+import fakeredis
+import pytest
+from core.circuit_breaker import CircuitBreaker
+from m3_orchestrator.redis_capacity import RedisCapacityStore
+from m3_orchestrator.routing_scheduler import RoutingScheduler
+from m3_orchestrator.skill_router import SkillBasedRouter
+
+CATEGORIES = ["Technical", "Billing", "Legal"]
+
+def replica(server, sync_seconds=1.0, store=None):
+    router = SkillBasedRouter()
+    store = store or RedisCapacityStore(fakeredis.FakeRedis(server=server))
+    router.attach_capacity_store(store, sync_seconds, breaker=CircuitBreaker(name="redis", latency_threshold=1.0))
+    return router
+
+def redis_capacities(server):
+    store = RedisCapacityStore(fakeredis.FakeRedis(server=server))
+    return dict(zip([f"agent_{i}" for i in range(1, 7)], store.read([f"agent_{i}" for i in range(1, 7)])))
+
+def test_replicas_never_over_assign():
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    replicas = [replica(server), replica(server)]
+    rng = random.Random(0)
+    assigned = [replicas[i % 2].route_ticket(f"t{i}", rng.choice(CATEGORIES), rng.random()) for i in range(40)]
+    # Six agents with capacity 5 between both replicas
+    assert sum(a is not None for a in assigned) == 30
+    assert set(redis_capacities(server).values()) == {0}
+
+def test_concurrent_replicas_take_each_slot_once():
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    replicas = [replica(server, sync_seconds=0) for _ in range(4)]
+    counts = [0] * len(replicas)
+
+    def route_many(i):
+        for n in range(20):
+            if replicas[i].route_ticket(f"r{i}-{n}", "Technical", 0.5) is not None:
+                counts[i] += 1
+
+    threads = [threading.Thread(target=route_many, args=(i,)) for i in range(len(replicas))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(counts) == 30
+
+def test_batch_on_a_stale_replica_leaves_taken_slots_unassigned():
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    replica_a, replica_b = replica(server), replica(server)
+    tickets = [{"ticket_id": f"t{i}", "category": CATEGORIES[i % 3], "urgency_score": 0.5} for i in range(30)]
+    assert len(replica_a.route_batch(tickets)["assignments"]) == 30
+    # replica_b still believes every agent is free until its next sync
+    result = replica_b.route_batch([{"ticket_id": "late", "category": "Billing"}])
+    assert result == {"assignments": [], "unassigned": ["late"]}
+
+def test_release_is_bounded_and_shared():
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    replica_a, replica_b = replica(server), replica(server)
+    assert replica_a.route_ticket("t1", "Legal", 0.9)["agent_id"] == "agent_5"
+    replica_b.release_capacity("agent_5", 3)
+    assert redis_capacities(server)["agent_5"] == 5
+    replica_a.route_ticket("t2", "Legal", 0.9)
+    status = {a["agent_id"]: a["current_capacity"] for a in replica_b.get_agent_status()}
+    assert status["agent_5"] == 4
+
+def test_a_new_replica_keeps_live_capacities():
+    server = fakeredis.FakeServer()
+    replica(server)
+    client = fakeredis.FakeRedis(server=server)
+    client.hset("agents:capacity:agent_1", "capacity", 2)
+    # Registration doesn't reset an agent another replica is using; status reads Redis
+    late = replica(server)
+    status = {a["agent_id"]: a["current_capacity"] for a in late.get_agent_status()}
+    assert status["agent_1"] == 2 and status["agent_2"] == 5
+    client.hset("agents:capacity:agent_2", "capacity", 0)
+    assert {a["agent_id"]: a["current_capacity"] for a in late.get_agent_status()}["agent_2"] == 0
+
+def test_falls_back_to_memory_when_redis_is_down():
+    server = fakeredis.FakeServer()
+    router = replica(server)
+    server.connected = False
+    assignment = router.route_ticket("t1", "Technical", 0.5)
+    assert assignment["agent_id"] == "agent_1" and assignment["agent_remaining_capacity"] == 4
+    router.release_capacity("agent_1")
+    assert router.get_agent("agent_1").current_capacity == 5
+    assert router.capacity_errors >= 2
+
+def test_open_breaker_stops_calling_redis():
+    server = fakeredis.FakeServer()
+    router = replica(server)
+    server.connected = False
+    for i in range(6):
+        router.route_ticket(f"t{i}", "Technical", 0.5)
+    # Three failures in a row open the circuit; later calls don't wait on Redis
+    assert router.capacity_breaker.state.value == "open"
+    assert router.capacity_errors == 3
+    assert sum(router.agents.capacity) == 30 - 6
+
+class RecordingStore(RedisCapacityStore):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads, self.threads = [], set()
+
+    def read(self, agent_ids):
+        self.reads.append(list(agent_ids))
+        self.threads.add(threading.get_ident())
+        return super().read(agent_ids)
+
+def test_routing_syncs_only_the_category_candidates():
+    pytest.importorskip("lupa")
+    store = RecordingStore(fakeredis.FakeRedis(server=fakeredis.FakeServer()))
+    router = replica(None, sync_seconds=0, store=store)
+    router.route_ticket("t1", "Legal", 0.5)
+    # Only agents with some Legal skill are read on the hot path
+    assert store.reads == [["agent_4", "agent_5", "agent_6"]]
+    router.get_agent_status()
+    assert len(store.reads[-1]) == 6
+
+def test_scheduler_keeps_capacity_store_calls_off_the_event_loop():
+    pytest.importorskip("lupa")
+    store = RecordingStore(fakeredis.FakeRedis(server=fakeredis.FakeServer()))
+    router = replica(None, sync_seconds=0, store=store)
+    assert router.blocking_io
+    for mode in ("greedy", "batch"):
+        scheduler = RoutingScheduler(router, mode=mode, window_ms=10, max_batch=4)
+
+        async def scenario():
+            store.threads.clear()
+            assignments = await asyncio.gather(*(scheduler.route(f"{mode}{i}", "Billing", 0.3) for i in range(4)))
+            return assignments, threading.get_ident()
+
+        assignments, loop_thread = asyncio.run(scenario())
+        assert all(assignments)
+        assert store.threads and loop_thread not in store.threads
@@ -0,0 +1,42 @@
+import threading
+import fakeredis
+from m1_mvr.redis_queue import RedisTicketQueueManager
+
+def make_queue(server=None):
+    return RedisTicketQueueManager(fakeredis.FakeRedis(server=server or fakeredis.FakeServer()))
+
+def ticket(ticket_id, category="Technical"):
+    return {"ticket_id": ticket_id, "category": category}
+
+def test_priority_then_fifo_order():
+    queue = make_queue()
+    queue.add_ticket("normal_1", False, ticket("normal_1"))
+    queue.add_ticket("mid", 0.6, ticket("mid", "Billing"))
+    queue.add_ticket("urgent", True, ticket("urgent"))
+    queue.add_ticket("normal_2", False, ticket("normal_2", "Legal"))
+
+    assert len(queue) == 4
+    assert [queue.get_next_ticket()["ticket_id"] for _ in range(4)] == ["urgent", "mid", "normal_1", "normal_2"]
+    assert queue.get_next_ticket() is None
+
+def test_bulk_enqueue_and_pop_n_keep_order():
+    queue = make_queue()
+    queue.chunk_size = 3  # Several pipelined ZADDs
+    queue.add_tickets((f"t{i}", i % 2 == 0, ticket(f"t{i}")) for i in range(10))
+    assert len(queue) == 10
+    popped = [t["ticket_id"] for t in queue.pop_n(6)]
+    assert popped == ["t0", "t2", "t4", "t6", "t8", "t1"]
+    assert len(queue.pop_n(100)) == 4
+
+def test_replicas_share_one_queue():
+    server = fakeredis.FakeServer()
+    replica_a, replica_b = make_queue(server), make_queue(server)
+    replica_a.add_ticket("from_a", True, ticket("from_a"))
+    assert replica_b.get_next_ticket()["ticket_id"] == "from_a"
+    assert len(replica_a) == 0
+
+def test_blocking_pop():
+    queue = make_queue()
+    assert queue.get_next_ticket(block=True, timeout=0.05) is None
+    threading.Timer(0.05, lambda: queue.add_ticket("late", False, ticket("late"))).start()
+    assert queue.pop_n(5, block=True, timeout=5)[0]["ticket_id"] == "late"
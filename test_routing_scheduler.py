@@ -0,0 +1,58 @@
+import asyncio
+from m3_orchestrator.skill_router import SkillBasedRouter
+from m3_orchestrator.routing_scheduler import RoutingScheduler
+
+CATEGORIES = ["Technical", "Billing", "Legal"]
+
+def route_all(scheduler, tickets):
+    async def scenario():
+        return await asyncio.gather(*(scheduler.route(*ticket) for ticket in tickets))
+    return asyncio.run(scenario())
+
+def test_batch_mode_assigns_concurrent_tickets_together():
+    scheduler = RoutingScheduler(SkillBasedRouter(), mode="batch", window_ms=20, max_batch=100)
+    tickets = [(f"t{i}", CATEGORIES[i % 3], 0.3) for i in range(12)]
+    assignments = route_all(scheduler, tickets)
+
+    assert [a["ticket_id"] for a in assignments] == [t[0] for t in tickets]
+    stats = scheduler.get_stats()
+    assert stats["batches"] == 1 and stats["tickets_batched"] == 12
+    assert stats["added_latency_ms"]["p50"] >= 15
+    assert stats["batch_vs_greedy"]["batch_match_score"] >= stats["batch_vs_greedy"]["greedy_match_score"] - 1e-9
+
+def test_full_batches_flush_without_waiting_for_the_window():
+    scheduler = RoutingScheduler(SkillBasedRouter(), mode="batch", window_ms=10000, max_batch=4)
+    assignments = route_all(scheduler, [(f"t{i}", "Technical", 0.3) for i in range(8)])
+    assert all(assignments)
+    assert scheduler.get_stats()["batches"] == 2
+
+def test_urgent_tickets_skip_the_window_and_exhausted_capacity_is_reported():
+    scheduler = RoutingScheduler(SkillBasedRouter(), mode="batch", window_ms=10000, max_batch=40, urgent_threshold=0.8)
+    urgent = route_all(scheduler, [("urgent", "Legal", 0.9)])[0]
+    assert urgent["agent_id"] == "agent_5"
+    assert scheduler.get_stats()["tickets_immediate"] == 1
+
+    # 29 units of capacity left for 40 tickets
+    assignments = route_all(scheduler, [(f"t{i}", "Billing", 0.3) for i in range(40)])
+    assert sum(a is not None for a in assignments) == 29
+    assert scheduler.get_stats()["unassigned"] == 11
+
+def test_greedy_mode_routes_immediately():
+    scheduler = RoutingScheduler(SkillBasedRouter())
+    assert route_all(scheduler, [("t1", "Billing", 0.3)])[0]["agent_id"] == "agent_3"
+    assert scheduler.get_stats()["batches"] == 0
+
+def test_cancelled_callers_take_no_capacity():
+    router = SkillBasedRouter()
+    scheduler = RoutingScheduler(router, mode="batch", window_ms=20, max_batch=100)
+
+    async def scenario():
+        gone = asyncio.ensure_future(scheduler.route("gone", "Legal", 0.3))
+        kept = asyncio.ensure_future(scheduler.route("kept", "Legal", 0.3))
+        await asyncio.sleep(0)
+        gone.cancel()
+        return await kept
+
+    assert asyncio.run(scenario())["agent_id"] == "agent_5"
+    assert scheduler.get_stats()["tickets_batched"] == 1
+    assert sum(router.agents.capacity) == 30 - 1
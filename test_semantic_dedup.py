@@ -0,0 +1,101 @@
+import numpy as np
+from m3_orchestrator.semantic_dedup import SemanticDeduplicator
+
+def unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+def test_storm_creates_and_reuses_master_incident():
+    dedup = SemanticDeduplicator(ticket_threshold=3)
+    storm = unit([1.0, 0.05, 0.0])
+    results = [dedup.check_ticket(f"t{i}", "", embedding=storm, timestamp=1000.0 + i) for i in range(6)]
+
+    assert [r["is_duplicate"] for r in results] == [False, False, False, True, True, True]
+    assert len({r["master_incident_id"] for r in results[3:]}) == 1
+
+    unrelated = dedup.check_ticket("other", "", embedding=unit([0.0, 1.0, 0.0]), timestamp=1010.0)
+    assert unrelated["is_duplicate"] is False
+    assert unrelated["similar_count"] == 0
+
+def test_window_evicts_by_time():
+    dedup = SemanticDeduplicator(ticket_threshold=2, time_window=300)
+    vector = unit([1.0, 0.0])
+    for i in range(3):
+        dedup.check_ticket(f"old{i}", "", embedding=vector, timestamp=0.0 + i)
+    assert len(dedup) == 3
+
+    result = dedup.check_ticket("new", "", embedding=vector, timestamp=1000.0)
+    assert result["similar_count"] == 0
+    assert len(dedup) == 1
+
+def test_ring_buffer_wraps_and_overwrites_oldest():
+    dedup = SemanticDeduplicator(ticket_threshold=100, max_window=4)
+    a, b = unit([1.0, 0.0]), unit([0.0, 1.0])
+    for i in range(3):
+        dedup.check_ticket(f"a{i}", "", embedding=a, timestamp=float(i))
+    for i in range(3):
+        dedup.check_ticket(f"b{i}", "", embedding=b, timestamp=10.0 + i)
+
+    # Only the newest 4 tickets (a2, b0, b1, b2) remain
+    assert len(dedup) == 4
+    assert dedup.check_ticket("probe_a", "", embedding=a, timestamp=20.0)["similar_count"] == 1
+    assert dedup.check_ticket("probe_b", "", embedding=b, timestamp=21.0)["similar_count"] == 3
+
+def test_incident_store_tracks_members_and_expires():
+    dedup = SemanticDeduplicator(ticket_threshold=2, time_window=300, incident_ttl=600)
+    storm = unit([1.0, 0.0, 0.0])
+    for i in range(5):
+        dedup.check_ticket(f"t{i}", "", embedding=storm, timestamp=100.0 + i)
+
+    summary = dedup.incidents.summary()
+    assert summary["active_incidents"] == 1
+    assert summary["total_suppressed"] == 3
+    incident = dedup.list_incidents()[0]
+    assert incident["member_count"] == 3
+    assert incident["first_seen"] == 102.0 and incident["last_seen"] == 104.0
+    assert np.allclose(dedup.incidents.get(incident["incident_id"]).centroid, storm)
+
+    # Well past the dedup window and the incident TTL, everything is evicted
+    dedup.check_ticket("later", "", embedding=unit([0.0, 1.0, 0.0]), timestamp=2000.0)
+    summary = dedup.incidents.summary()
+    assert summary["active_incidents"] == 0
+    assert summary["tracked_tickets"] == 0
+    assert summary["total_expired"] == 1
+
+def test_incident_listing_is_paginated():
+    dedup = SemanticDeduplicator(ticket_threshold=1, time_window=1)
+    for i in range(5):
+        # Each pair of tickets far apart in time forms its own incident
+        vector = unit([1.0, float(i)])
+        dedup.check_ticket(f"a{i}", "", embedding=vector, timestamp=10.0 * i)
+        dedup.check_ticket(f"b{i}", "", embedding=vector, timestamp=10.0 * i + 0.5)
+
+    assert len(dedup.incidents) == 5
+    page = dedup.list_incidents(offset=1, limit=2)
+    assert [p["sample_ticket_ids"] for p in page] == [["b3"], ["b2"]]
+
+def test_active_incident_matched_by_centroid_without_window_scan():
+    dedup = SemanticDeduplicator(ticket_threshold=2, time_window=300)
+    storm = unit([1.0, 0.02, 0.0])
+    for i in range(3):
+        dedup.check_ticket(f"t{i}", "", embedding=storm, timestamp=100.0 + i)
+    master_id = dedup.list_incidents()[0]["incident_id"]
+
+    def no_scan(*args):
+        raise AssertionError("window scanned")
+    dedup.index.range_query = no_scan
+    result = dedup.check_ticket("t3", "", embedding=unit([1.0, 0.0, 0.01]), timestamp=110.0)
+    assert result["is_duplicate"] is True
+    assert result["master_incident_id"] == master_id
+    assert dedup.incidents.get(master_id).member_count == 2
+
+def test_centroid_match_requires_recent_incident_activity():
+    dedup = SemanticDeduplicator(ticket_threshold=2, time_window=300, incident_ttl=3600)
+    storm = unit([1.0, 0.0])
+    for i in range(3):
+        dedup.check_ticket(f"t{i}", "", embedding=storm, timestamp=100.0 + i)
+
+    # The incident is still stored, but the storm has been quiet for longer than the window
+    result = dedup.check_ticket("late", "", embedding=storm, timestamp=1000.0)
+    assert result["is_duplicate"] is False
+    assert len(dedup.incidents) == 1
@@ -0,0 +1,112 @@
+import random
+import pytest
+from m3_orchestrator.skill_router import Agent, SkillBasedRouter
+
+CATEGORIES = ["Technical", "Billing", "Legal"]
+
+def linear_best(router, category, urgency_score):
+    """The original route_ticket scan: the highest score over agents with capacity."""
+    scores = [router._calculate_match_score(agent, category, urgency_score)
+              for agent in router.agents.values() if agent.current_capacity > 0]
+    return max(scores) if scores else None
+
+def random_router(n_agents, seed=0):
+    rng = random.Random(seed)
+    router = SkillBasedRouter()
+    for i in range(n_agents):
+        capacity = rng.randint(1, 6)
+        router.add_agent(Agent(f"extra_{i}", f"Agent {i}", {c: round(rng.random(), 1) for c in CATEGORIES},
+                               rng.randint(0, capacity), capacity))
+    return router
+
+def test_indexed_route_ticket_matches_linear_scan():
+    router = random_router(200)
+    rng = random.Random(1)
+    for i in range(2000):
+        if rng.random() < 0.4:
+            router.release_capacity(rng.choice(list(router.agents)), rng.randint(1, 2))
+            continue
+        category = rng.choice(CATEGORIES + ["Unknown"])
+        expected = linear_best(router, category, 0.5)
+        assignment = router.route_ticket(f"t{i}", category, 0.5)
+        if expected is None:
+            assert assignment is None
+        else:
+            # Same score; the agent can differ only between float-level ties
+            assert assignment["match_score"] == pytest.approx(expected, abs=1e-12)
+    # Outdated entries are compacted away
+    assert all(len(heap) <= 2 * len(router.agents) + 64 for heap in router._heaps.values())
+
+def test_route_ticket_returns_none_when_everyone_is_busy():
+    router = SkillBasedRouter()
+    assigned = [router.route_ticket(f"t{i}", "Legal", 0.9) for i in range(31)]
+    assert all(assigned[:30]) and assigned[30] is None
+    router.release_capacity("agent_5")
+    assert router.route_ticket("late", "Legal", 0.9)["agent_id"] == "agent_5"
+
+def test_route_batch_uses_every_unit_of_capacity():
+    router = SkillBasedRouter()  # 6 agents x capacity 5
+    tickets = [{"ticket_id": f"t{i}", "category": CATEGORIES[i % 3], "urgency_score": (i % 10) / 10} for i in range(32)]
+    result = router.route_batch(tickets)
+
+    assert len(result["assignments"]) == 30
+    assert len(result["unassigned"]) == 2
+    assigned = {a["ticket_id"] for a in result["assignments"]}
+    assert assigned.isdisjoint(result["unassigned"]) and len(assigned | set(result["unassigned"])) == 32
+    assert all(a["current_capacity"] == 0 for a in router.get_agent_status())
+
+def test_route_batch_beats_greedy_on_total_score():
+    greedy, batch = random_router(50, seed=3), random_router(50, seed=3)
+    rng = random.Random(4)
+    tickets = [{"ticket_id": f"t{i}", "category": rng.choice(CATEGORIES), "urgency_score": rng.random()} for i in range(120)]
+    greedy_total = sum(a["match_score"] for a in
+                       filter(None, (greedy.route_ticket(t["ticket_id"], t["category"], t["urgency_score"]) for t in tickets)))
+    result = batch.route_batch(tickets)
+    assert sum(a["match_score"] for a in result["assignments"]) >= greedy_total - 1e-9
+    for agent_id, agent in batch.agents.items():
+        assert 0 <= agent.current_capacity
+    # The heap index follows batch assignments
+    best = batch._best_available("Technical")
+    assert best is None or batch.agents.capacity[best] > 0
+
+def test_agent_views_read_the_registry():
+    router = SkillBasedRouter()
+    alice = router.get_agent("agent_1")
+    assert alice.skill_vector == {"Technical": 0.9, "Billing": 0.1, "Legal": 0.0}
+    router.route_batch([{"ticket_id": f"t{i}", "category": "Technical", "urgency_score": 0.5} for i in range(2)])
+    assert alice.current_capacity == router.agents.capacity[router.agents.row("agent_1")] == 4
+    # Writes would bypass the heap index: views are read-only
+    with pytest.raises(AttributeError):
+        alice.current_capacity = 0
+    assert alice.current_capacity == 4
+    # A new category becomes a new skill column
+    router.add_agent(Agent("agent_7", "Grace", {"Security": 0.7}, 2, 4))
+    assert router.route_ticket("t3", "Security", 0.0)["agent_id"] == "agent_7"
+    assert router.get_agent("agent_1").skill_vector["Security"] == 0.0
+
+def test_load_agents_from_csv_and_jsonl_rosters(tmp_path):
+    csv_path = tmp_path / "roster.csv"
+    csv_path.write_text("agent_id,name,max_capacity,current_capacity,Technical,Billing,Legal\n"
+                        "a1,Ann,4,,0.2,0.95,0.1\n"
+                        "agent_1,Alice,5,1,0.95,0.0,0.0\n")
+    jsonl_path = tmp_path / "roster.jsonl"
+    jsonl_path.write_text('{"agent_id": "a2", "name": "Ben", "skills": {"Legal": 1.0}, "max_capacity": 3}\n')
+
+    router = SkillBasedRouter()
+    assert router.load_agents(str(csv_path)) == 2
+    assert router.load_agents(str(jsonl_path)) == 1
+    assert len(router.agents) == 8
+    assert router.get_agent("a1").current_capacity == 4
+    assert router.get_agent("agent_1").current_capacity == 1
+    assert router.route_ticket("t1", "Legal", 0.5)["agent_id"] == "a2"
+    assert router.route_ticket("t2", "Billing", 0.5)["agent_id"] == "a1"
+
+def test_exhausted_agents_are_never_taken_below_zero():
+    router = SkillBasedRouter()
+    row = router.agents.row("agent_5")
+    for _ in range(5):
+        assert router._take(row) >= 0
+    assert router._take(row) == -1
+    assert router._take_many([row, row]) == [-1, -1]
+    assert router.agents.capacity[row] == 0
+    assert router.route_ticket("t1", "Legal", 0.5)["agent_id"] != "agent_5"
@@ -0,0 +1,38 @@
+import numpy as np
+from m3_orchestrator.vector_index import BruteForceIndex, LSHIndex
+
+def clustered_vectors(rng, clusters=5, per_cluster=40, dim=64, noise=0.15):
+    centers = rng.standard_normal((clusters, dim))
+    points = np.repeat(centers, per_cluster, axis=0)
+    points += noise * np.linalg.norm(centers[0]) / np.sqrt(dim) * rng.standard_normal(points.shape)
+    points = points.astype(np.float32)
+    return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+def test_lsh_matches_exact_without_false_positives():
+    rng = np.random.default_rng(1)
+    vectors = clustered_vectors(rng)
+    exact, lsh = BruteForceIndex(capacity=500), LSHIndex(capacity=500, num_tables=16, num_bits=8)
+    for i, vector in enumerate(vectors):
+        exact.add(f"t{i}", vector, float(i))
+        lsh.add(f"t{i}", vector, float(i))
+
+    found = expected = 0
+    for query in vectors[::10]:
+        truth = set(exact.range_query(query, 0.9))
+        approx = set(lsh.range_query(query, 0.9))
+        assert approx <= truth
+        found += len(approx)
+        expected += len(truth)
+    assert found / expected > 0.9
+
+def test_lsh_eviction_cleans_buckets():
+    lsh = LSHIndex(capacity=4, num_tables=4, num_bits=4)
+    vector = np.ones(8, dtype=np.float32) / np.sqrt(8)
+    for i in range(6):
+        lsh.add(f"t{i}", vector, float(i))
+    # Capacity overwrite keeps the newest four
+    assert lsh.range_query(vector, 0.9) == ["t2", "t3", "t4", "t5"]
+
+    assert lsh.evict_before(4.0) == 2
+    assert lsh.range_query(vector, 0.9) == ["t4", "t5"]
+    assert sum(len(bucket) for table in lsh._buckets for bucket in table.values()) == 2 * 4
@@ -0,0 +1,171 @@
+import os
+import threading
+from core.wal import WriteAheadLog, encode_frame, decode_frames
+from m1_mvr.queue_manager import TicketQueueManager
+from m3_orchestrator.skill_router import SkillBasedRouter
+
+def ticket(ticket_id, category="Technical"):
+    return {"ticket_id": ticket_id, "category": category}
+
+def crash(wal):
+    """Simulate a crash: stop the flusher without the final write (buffered events are lost)."""
+    wal._closed.set()
+    wal._thread.join()
+    wal._file.close()
+
+def test_frames_round_trip_and_stop_at_a_torn_tail():
+    buffer = encode_frame(1, "push", ["a", 0.5, {"x": 1}]) + encode_frame(2, "pop", "a")
+    assert [(seq, kind, data) for _, seq, kind, data in decode_frames(buffer)] == [
+        (1, "push", ["a", 0.5, {"x": 1}]), (2, "pop", "a")]
+    # Truncated and bit-flipped frames are not replayed
+    assert len(list(decode_frames(buffer[:-3]))) == 1
+    corrupt = bytearray(buffer)
+    corrupt[-1] ^= 0xFF
+    assert len(list(decode_frames(bytes(corrupt)))) == 1
+
+def test_queue_survives_a_crash(tmp_path):
+    queue = TicketQueueManager()
+    queue.attach_wal(WriteAheadLog(str(tmp_path), fsync="always"))
+    queue.add_tickets((f"t{i}", i / 10, ticket(f"t{i}", ["Billing", "Legal"][i % 2])) for i in range(10))
+    queue.add_ticket("urgent", True, ticket("urgent"))
+    assert queue.get_next_ticket()["ticket_id"] == "urgent"
+    assert [t["ticket_id"] for t in queue.pop_n(2)] == ["t9", "t8"]
+    crash(queue.wal)
+
+    restored = TicketQueueManager()
+    restored.attach_wal(WriteAheadLog(str(tmp_path)))
+    assert restored.wal.recovered_events == 14
+    assert [t["ticket_id"] for t in restored.pop_n(100)] == [f"t{i}" for i in range(7, -1, -1)]
+    restored.wal.close()
+
+def test_rescored_tickets_survive_a_crash(tmp_path):
+    queue = TicketQueueManager()
+    queue.attach_wal(WriteAheadLog(str(tmp_path), fsync="always"))
+    queue.add_tickets((f"t{i}", i / 10, ticket(f"t{i}", ["Billing", "Legal"][i % 2])) for i in range(10))
+    queue.add_ticket("urgent", True, ticket("urgent"))
+    assert queue.update_urgency("t0", 0.95)
+    assert queue.get_next_ticket()["ticket_id"] == "urgent"
+    assert [t["ticket_id"] for t in queue.pop_n(2)] == ["t0", "t9"]
+    assert queue.update_urgency("t1", 0.85)
+    crash(queue.wal)
+
+    restored = TicketQueueManager()
+    restored.attach_wal(WriteAheadLog(str(tmp_path)))
+    assert restored.wal.recovered_events == 16
+    assert [t["ticket_id"] for t in restored.pop_n(100)] == ["t1"] + [f"t{i}" for i in range(8, 1, -1)]
+    restored.wal.close()
+
+def test_re_added_ticket_keeps_its_last_push_after_a_restart(tmp_path):
+    queue = TicketQueueManager()
+    queue.attach_wal(WriteAheadLog(str(tmp_path), fsync="always"))
+    queue.add_ticket("a", 0.1, {**ticket("a"), "text": "first"})
+    queue.add_ticket("b", 0.5, ticket("b"))
+    queue.add_ticket("a", 0.9, {**ticket("a"), "text": "second"})
+    crash(queue.wal)
+
+    restored = TicketQueueManager()
+    restored.attach_wal(WriteAheadLog(str(tmp_path)))
+    popped = restored.pop_n(10)
+    assert [t["ticket_id"] for t in popped] == ["a", "b"]
+    assert popped[0]["text"] == "second"
+    restored.wal.close()
+
+def test_torn_write_is_discarded(tmp_path):
+    queue = TicketQueueManager()
+    queue.attach_wal(WriteAheadLog(str(tmp_path), fsync="always"))
+    queue.add_ticket("kept", 0.5, ticket("kept"))
+    crash(queue.wal)
+    segment = sorted(p for p in os.listdir(tmp_path) if p.startswith("wal-"))[-1]
+    with open(tmp_path / segment, "ab") as f:
+        f.write(encode_frame(99, "push", ["half", 1.0, ticket("half")])[:-5])
+
+    restored = TicketQueueManager()
+    restored.attach_wal(WriteAheadLog(str(tmp_path)))
+    assert restored.wal.torn_bytes > 0
+    assert [t["ticket_id"] for t in restored.pop_n(10)] == ["kept"]
+    restored.add_ticket("after", 0.5, ticket("after"))
+    restored.wal.close()
+
+    again = TicketQueueManager()
+    again.attach_wal(WriteAheadLog(str(tmp_path)))
+    assert [t["ticket_id"] for t in again.pop_n(10)] == ["after"]
+    again.wal.close()
+
+def test_snapshot_compacts_the_log(tmp_path):
+    queue = TicketQueueManager()
+    wal = WriteAheadLog(str(tmp_path), snapshot_every=0)
+    queue.attach_wal(wal)
+    for i in range(100):
+        queue.add_ticket(f"t{i}", 0.5, ticket(f"t{i}"))
+    queue.pop_n(90)
+    wal.snapshot()
+    queue.add_ticket("late", 0.9, ticket("late"))
+    wal.close()
+    assert len([p for p in os.listdir(tmp_path) if p.startswith("snapshot-")]) == 1
+
+    restored = TicketQueueManager()
+    restored.attach_wal(WriteAheadLog(str(tmp_path)))
+    assert restored.wal.recovered_events == 1
+    assert [t["ticket_id"] for t in restored.pop_n(100)] == ["late"] + [f"t{i}" for i in range(90, 100)]
+    restored.wal.close()
+
+def test_group_commit_shares_fsyncs(tmp_path):
+    wal = WriteAheadLog(str(tmp_path), fsync="always")
+    wal.open(lambda state, events: None, lambda: None)
+
+    def commit_many():
+        for i in range(200):
+            wal.commit(wal.append("event", i))
+
+    threads = [threading.Thread(target=commit_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert wal.get_stats()["durable_seq"] == 1600
+    assert wal.fsyncs <= 1600
+    wal.close()
+
+def test_agent_capacities_survive_a_restart(tmp_path):
+    router = SkillBasedRouter()
+    router.attach_wal(WriteAheadLog(str(tmp_path), fsync="always"))
+    router.route_ticket("t1", "Legal", 0.9)
+    router.route_batch([{"ticket_id": "t2", "category": "Billing"}, {"ticket_id": "t3", "category": "Technical"}])
+    router.release_capacity("agent_5")
+    before = {a["agent_id"]: a["current_capacity"] for a in router.get_agent_status()}
+    assert sum(before.values()) == 28
+    crash(router.wal)
+
+    restored = SkillBasedRouter()
+    restored.attach_wal(WriteAheadLog(str(tmp_path)))
+    assert {a["agent_id"]: a["current_capacity"] for a in restored.get_agent_status()} == before
+    restored.wal.close()
+
+def test_fsync_always_marks_the_owners_as_blocking(tmp_path):
+    queue = TicketQueueManager()
+    queue.attach_wal(WriteAheadLog(str(tmp_path / "batch")))
+    assert not queue.blocking_io
+    queue.wal.close()
+    queue = TicketQueueManager()
+    queue.attach_wal(WriteAheadLog(str(tmp_path / "queue"), fsync="always"))
+    assert queue.blocking_io
+    queue.wal.close()
+
+    router = SkillBasedRouter()
+    assert not router.blocking_io
+    router.attach_wal(WriteAheadLog(str(tmp_path / "agents"), fsync="always"))
+    assert router.blocking_io
+    # Routed from worker threads (as call() does), every assignment is durable on return
+    threads = [threading.Thread(target=router.route_ticket, args=(f"t{i}", "Billing", 0.3)) for i in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    before = {a["agent_id"]: a["current_capacity"] for a in router.get_agent_status()}
+    assert sum(before.values()) == 30 - 12
+    crash(router.wal)
+
+    restored = SkillBasedRouter()
+    restored.attach_wal(WriteAheadLog(str(tmp_path / "agents")))
+    assert {a["agent_id"]: a["current_capacity"] for a in restored.get_agent_status()} == before
+    restored.wal.close()